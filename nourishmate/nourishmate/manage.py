@@ -6,7 +6,9 @@ import sys
 
 def main():
     """Run administrative tasks."""
-    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nourishmate.settings')
+    # The test suite runs against its own settings module (see test_settings).
+    settings_module = 'nourishmate.test_settings' if sys.argv[1:2] == ['test'] else 'nourishmate.settings'
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
@@ -36,6 +36,46 @@ CSRF_TRUSTED_ORIGINS = ['https://nourishmate-2iim.onrender.com']
 # Spoonacular key.
 SPOONACULAR_API_KEY = os.getenv("SPOONACULAR_API_KEY")
 
+# Spoonacular HTTP client (tracker.spoonacular): (connect, read) timeouts in
+# seconds, retries with exponential backoff for GETs, and keep-alive pool size.
+SPOONACULAR_TIMEOUT = (3.05, 10)
+SPOONACULAR_RETRIES = 2
+SPOONACULAR_BACKOFF = 0.3
+SPOONACULAR_POOL_SIZE = 10
+# Seconds smart suggestions wait for per-recipe lookups; late recipes are dropped.
+SPOONACULAR_ENRICH_DEADLINE = 4.0
+# Response cache (CACHES alias) and seconds each endpoint's responses are
+# kept; endpoints not listed are always fetched.
+SPOONACULAR_CACHE = 'spoonacular'
+SPOONACULAR_CACHE_TTLS = {
+    "food/ingredients/autocomplete": 60 * 60 * 24 * 7,
+    "food/ingredients/{id}/information": 60 * 60 * 24 * 7,
+    "recipes/{id}/information": 60 * 60 * 24,
+    "recipes/informationBulk": 60 * 60 * 24,
+    "recipes/complexSearch": 60 * 60,
+    "recipes/findByIngredients": 60 * 60,
+}
+# Identical calls in flight at once share one upstream request within a
+# process. Set a lock lifetime (seconds) to also share them across workers
+# for cached endpoints; needs a SPOONACULAR_CACHE backend with an atomic
+# add() (database, Redis, Memcached). Waiters poll every POLL seconds.
+SPOONACULAR_COALESCE_LOCK_TTL = 0
+SPOONACULAR_COALESCE_POLL = 0.05
+# Ingredient autocomplete (tracker.autocomplete): how many users must have
+# logged or stocked a name before it is suggested to everyone, and how often
+# each worker rebuilds its in-memory index (seconds).
+AUTOCOMPLETE_MIN_USERS = 2
+AUTOCOMPLETE_INDEX_TTL = 60 * 60
+# Seconds an ingredient's nutrient density is cached in front of the database.
+INGREDIENT_CACHE_TIMEOUT = 60 * 60 * 24
+# Serve ingredient autocomplete and nutrition from the local food database
+# only (see load_food_data), without calling Spoonacular.
+NUTRITION_OFFLINE = os.getenv("NUTRITION_OFFLINE", "0") == "1"
+# Recipe ids per recipes/informationBulk call.
+SPOONACULAR_BULK_SIZE = 50
+# How long fetched recipe titles/images are kept for saving without another call.
+RECIPE_SUMMARY_CACHE_TIMEOUT = 60 * 60 * 24
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -55,8 +95,10 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'tracker.middleware.ServerTimingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'tracker.middleware.QueryBudgetMiddleware',
 ]
 
 ROOT_URLCONF = 'nourishmate.urls'
@@ -93,6 +135,61 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    # Home snapshots, facet counts, ingredient densities and recipe summaries,
+    # shared by every worker on this host through the filesystem. Point it at
+    # Redis or Memcached when workers run on more than one host.
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv("CACHE_DIR", str(BASE_DIR / 'cache')),
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+        },
+    },
+    # Hit/miss and Spoonacular counters (tracker.metrics), kept apart so they
+    # are never culled with cached pages.
+    'metrics': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv("METRICS_CACHE_DIR", str(BASE_DIR / 'metrics_cache')),
+        'TIMEOUT': None,
+    },
+    # Spoonacular responses, shared by every worker through the filesystem.
+    # Least recently used entries are evicted past MAX_ENTRIES or MAX_BYTES.
+    'spoonacular': {
+        'BACKEND': 'tracker.cache_backends.LRUFileBasedCache',
+        'LOCATION': os.getenv("SPOONACULAR_CACHE_DIR", str(BASE_DIR / 'spoonacular_cache')),
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+            'MAX_BYTES': 100 * 1024 * 1024,
+            'CULL_FREQUENCY': 10,
+        },
+    },
+}
+
+# Seconds a cached home snapshot is kept; writes invalidate it sooner.
+DASHBOARD_CACHE_TIMEOUT = 60 * 60
+# Seconds cached food log facet counts are kept; writes invalidate them sooner.
+FACET_CACHE_TIMEOUT = 60 * 60
+
+# CACHES alias holding the shared counters.
+METRICS_CACHE = 'metrics'
+
+
+# Request instrumentation
+# Server-Timing headers on every response, and cProfile dumps for staff
+# requests with ?profile=1 plus a random PROFILE_SAMPLE_RATE share of all.
+
+SERVER_TIMING = True
+
+PROFILE_DIR = BASE_DIR / 'profiles'
+
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
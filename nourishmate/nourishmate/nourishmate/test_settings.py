@@ -0,0 +1,24 @@
+"""
+Django settings for the test suite.
+
+The project settings with every cache alias kept in process memory, so
+tests neither read nor clear the caches real workers share, and with no
+Spoonacular response cached: the suite stubs Spoonacular, and its fake
+responses must not reach the response cache. Tests that exercise the
+response cache set SPOONACULAR_CACHE_TTLS themselves.
+
+`manage.py test` selects this module; other runners need
+DJANGO_SETTINGS_MODULE=nourishmate.test_settings.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import CACHES
+
+CACHES = {
+    alias: {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': alias,
+    }
+    for alias in CACHES
+}
+
+SPOONACULAR_CACHE_TTLS = {}
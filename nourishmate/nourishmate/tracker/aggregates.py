@@ -0,0 +1,67 @@
+"""
+Nutrient aggregation shared by the dashboard, nutrition summary and recipe views.
+
+Totals are computed by the database (one SUM per nutrient in a single query,
+plus one GROUP BY over supplement slots) so memory use does not depend on
+how many FoodLog rows fall inside the requested range. Results are returned
+as NutrientVector so callers can add, scale and classify them in one step.
+"""
+from django.db.models import Count, Sum, Value, FloatField
+from django.db.models.functions import Coalesce
+
+from .nutrients import NUTRIENT_FIELDS, NutrientVector, supplement_boost
+
+
+def nutrient_sums(fields=None):
+    """
+    One SUM expression per nutrient (or per name in `fields`), keyed by
+    nutrient name, defaulting to 0.0.
+    """
+    return {
+        nutrient: Coalesce(Sum(nutrient), Value(0.0), output_field=FloatField())
+        for nutrient in (fields or NUTRIENT_FIELDS)
+    }
+
+
+def food_totals(logs):
+    """
+    Sum every nutrient over a queryset in one aggregate query.
+    Works for FoodLog and DailyNutrientRollup, which share nutrient columns.
+
+    Returns:
+        NutrientVector: totals (0.0 when the queryset is empty).
+    """
+    return NutrientVector.from_mapping(logs.order_by().aggregate(**nutrient_sums()))
+
+
+def supplement_counts(supplement_logs):
+    """
+    Count SupplementLog rows per time slot with a single GROUP BY query.
+
+    Returns:
+        dict: slot -> number of days that slot was taken.
+    """
+    rows = (
+        supplement_logs.order_by()
+        .values("time_of_day")
+        .annotate(taken=Count("id"))
+    )
+    return {row["time_of_day"]: row["taken"] for row in rows}
+
+
+def nutrient_totals(logs, supplement_logs=None):
+    """
+    Food totals for `logs` plus the boosts from `supplement_logs`, if given.
+    """
+    totals = food_totals(logs)
+    if supplement_logs is not None:
+        totals = totals + supplement_boost(supplement_counts(supplement_logs))
+    return totals
+
+
+def daily_averages(totals, start_date, end_date):
+    """
+    Average each nutrient total over the number of days in [start_date, end_date]
+    (at least one, so an empty range averages its zero totals to zero).
+    """
+    return totals / max((end_date - start_date).days + 1, 1)
@@ -0,0 +1,251 @@
+"""
+In-process ingredient autocomplete.
+
+Each worker keeps a prefix index of ingredient names in memory: the
+lower-cased names in a sorted list, searched with bisect, so a keystroke
+is answered without a database or network round trip. Suggestions are
+ranked by popularity (how often a name was logged or stocked), then
+shorter names first.
+
+The index is built from food log and pantry names, counting only names
+that at least AUTOCOMPLETE_MIN_USERS different users have entered, so one
+person's free-text entries are never suggested to others. Names and ids
+from upstream Spoonacular responses are added too. Spoonacular is asked
+only when the index has fewer matches than requested, or when one of them
+has no ingredient id yet (a logged name nobody has looked up), since a
+suggestion without an id cannot fill in nutrition. The names it returns
+are merged into the index, filling in the ids of names already there, and
+remembered in the shared cache for other workers. The index is rebuilt
+every AUTOCOMPLETE_INDEX_TTL seconds.
+
+Stored ingredients are indexed as well, including foods loaded from a
+FoodData Central dump under their "fdc:<fdc_id>" ids, so with
+NUTRITION_OFFLINE set suggestions come from the index alone.
+"""
+import bisect
+import heapq
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Min
+from django.db.models.functions import Lower
+
+from . import spoonacular
+from .ingredients import FDC_PREFIX
+from .models import FoodLog, Ingredient, PantryItem
+
+SUGGESTION_LIMIT = 5
+
+# Shared cache key of {name: Spoonacular id} for names seen upstream.
+UPSTREAM_KEY = "autocomplete:upstream"
+
+# Most upstream names remembered in UPSTREAM_KEY.
+UPSTREAM_MAX = 20000
+
+# Sorts after every character, so prefix + _END bounds the names with that prefix.
+_END = "\U0010ffff"
+
+
+class Suggestion:
+    """
+    One indexed name, its ingredient id when known (a Spoonacular id or
+    "fdc:<fdc_id>"), and how often it has been used.
+    """
+    __slots__ = ("name", "id", "popularity")
+
+    def __init__(self, name, ingredient_id, popularity):
+        self.name = name
+        self.id = ingredient_id
+        self.popularity = popularity
+
+    def as_json(self):
+        return {"name": self.name, "id": self.id}
+
+
+class PrefixIndex:
+    """
+    Case-insensitive prefix lookup over names, ranked by popularity.
+    """
+
+    def __init__(self):
+        self._keys = []
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _merge(self, name, ingredient_id, popularity):
+        # The new key, or None when the name was already indexed (or blank).
+        name = (name or "").strip()
+        key = name.lower()
+        if not key:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            self._entries[key] = Suggestion(name, ingredient_id, popularity)
+            return key
+        entry.popularity += popularity
+        if entry.id is None:
+            entry.id = ingredient_id
+        return None
+
+    def add(self, name, ingredient_id=None, popularity=1):
+        """
+        Add a name, or add to its popularity and fill in its id if it is
+        already indexed.
+        """
+        with self._lock:
+            key = self._merge(name, ingredient_id, popularity)
+            if key is not None:
+                bisect.insort(self._keys, key)
+
+    def add_many(self, items):
+        """
+        add() each (name, ingredient_id, popularity) triple, sorting the
+        keys once at the end instead of inserting each one in place.
+        """
+        with self._lock:
+            for name, ingredient_id, popularity in items:
+                self._merge(name, ingredient_id, popularity)
+            self._keys = sorted(self._entries)
+
+    def bump(self, name):
+        """
+        Count one more use of a name that is already indexed.
+        """
+        with self._lock:
+            entry = self._entries.get((name or "").strip().lower())
+            if entry is not None:
+                entry.popularity += 1
+
+    def search(self, prefix, limit=SUGGESTION_LIMIT):
+        """
+        The `limit` most popular names starting with `prefix`.
+        """
+        key = prefix.strip().lower()
+        if not key:
+            return []
+        with self._lock:
+            start = bisect.bisect_left(self._keys, key)
+            end = bisect.bisect_left(self._keys, key + _END, start)
+            matches = [self._entries[name] for name in self._keys[start:end]]
+        return heapq.nsmallest(limit, matches, key=lambda s: (-s.popularity, len(s.name), s.name.lower()))
+
+
+def build_index():
+    """
+    A fresh index from shared food log and pantry names, stored
+    ingredients and remembered upstream names.
+    """
+    items = []
+    for model, field in ((FoodLog, "food_name"), (PantryItem, "name")):
+        rows = (
+            model.objects.annotate(key=Lower(field))
+            .values("key")
+            .annotate(name=Min(field), users=Count("user", distinct=True), uses=Count("pk"))
+            .filter(users__gte=settings.AUTOCOMPLETE_MIN_USERS)
+            .order_by()
+        )
+        items.extend((row["name"], None, row["uses"]) for row in rows)
+    for name, spoonacular_id, fdc_id in Ingredient.objects.values_list("name", "spoonacular_id", "fdc_id"):
+        ingredient_id = spoonacular_id if fdc_id is None else f"{FDC_PREFIX}{fdc_id}"
+        items.append((name, ingredient_id, 0))
+    items.extend((name, ingredient_id, 1) for name, ingredient_id in cache.get(UPSTREAM_KEY, {}).items())
+
+    index = PrefixIndex()
+    index.add_many(items)
+    return index
+
+
+_index = None
+_built_at = 0.0
+_build_lock = threading.Lock()
+
+
+def get_index():
+    """
+    This process's index, built on first use and when it is older than
+    AUTOCOMPLETE_INDEX_TTL.
+    """
+    global _index, _built_at
+    with _build_lock:
+        if _index is None or time.monotonic() - _built_at > settings.AUTOCOMPLETE_INDEX_TTL:
+            _index = build_index()
+            _built_at = time.monotonic()
+        return _index
+
+
+def reset_index():
+    """
+    Drop this process's index so the next lookup rebuilds it.
+    """
+    global _index
+    with _build_lock:
+        _index = None
+
+
+def note_use(name):
+    """
+    Count a newly logged or stocked name toward its popularity, if the
+    index is built and already holds it. New names join at the next rebuild.
+    """
+    if _index is not None:
+        _index.bump(name)
+
+
+def remember_upstream(items):
+    """
+    Merge names returned by Spoonacular into this process's index and the
+    shared cache. Concurrent workers may overwrite each other's additions;
+    those names come back the next time they are fetched.
+    """
+    index = get_index()
+    known = cache.get(UPSTREAM_KEY, {})
+    added = False
+    for item in items:
+        name, ingredient_id = item.get("name"), item.get("id")
+        if not name:
+            continue
+        index.add(name, ingredient_id)
+        if name not in known and len(known) < UPSTREAM_MAX:
+            known[name] = ingredient_id
+            added = True
+    if added:
+        cache.set(UPSTREAM_KEY, known, timeout=None)
+
+
+def suggest(query, limit=SUGGESTION_LIMIT):
+    """
+    Up to `limit` {"name", "id"} suggestions for `query`, from the index
+    when it has enough with ids (or NUTRITION_OFFLINE is set), topped up
+    and given ids from Spoonacular otherwise.
+
+    Returns:
+        The suggestions, or None when the index has no matches and the
+        upstream call failed.
+    """
+    local = [s.as_json() for s in get_index().search(query, limit)]
+    complete = len(local) >= limit and all(s["id"] is not None for s in local)
+    if complete or settings.NUTRITION_OFFLINE:
+        return local
+
+    results = spoonacular.get(
+        "/food/ingredients/autocomplete", {"query": query, "number": limit, "metaInformation": True},
+    )
+    if results is None:
+        return local or None
+    remember_upstream(results)
+
+    ids = {item["name"].lower(): item["id"] for item in results}
+    for s in local:
+        if s["id"] is None:
+            s["id"] = ids.get(s["name"].lower())
+    seen = {s["name"].lower() for s in local}
+    for item in results:
+        if item["name"].lower() not in seen:
+            local.append({"name": item["name"], "id": item["id"]})
+            seen.add(item["name"].lower())
+    return local[:limit]
@@ -0,0 +1,96 @@
+"""
+Cache backends for NourishMate.
+"""
+import os
+
+from django.core.cache.backends.filebased import FileBasedCache
+
+_MISSING = object()
+
+
+class LRUFileBasedCache(FileBasedCache):
+    """
+    File cache that evicts least recently used entries.
+
+    Django's file cache drops a random share of entries once MAX_ENTRIES is
+    reached. Here every hit bumps the file's mtime, and culling removes the
+    oldest files until both the entry count and the total size (OPTIONS
+    MAX_BYTES, unbounded by default) are back under 1 - 1/CULL_FREQUENCY of
+    their limits. Every worker pointed at the same directory shares it.
+
+    Checking the limits means a stat of every file, so it is not done on
+    every set. After each scan the backend works out how many more entries
+    fit under both limits (at the average entry size seen) and skips that
+    many sets before scanning again, never more than one cull's worth, so
+    workers writing to the same directory overshoot by little.
+    """
+
+    def __init__(self, dir, params):
+        super().__init__(dir, params)
+        self._max_bytes = params.get("OPTIONS", {}).get("MAX_BYTES")
+        # Sets that may go by before the directory is scanned again.
+        self._sets_until_scan = 0
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        if value is _MISSING:
+            return default
+        try:
+            os.utime(self._key_to_file(key, version))
+        except FileNotFoundError:
+            pass
+        return value
+
+    def _cull(self):
+        if self._sets_until_scan > 0:
+            self._sets_until_scan -= 1
+            return
+        count, total_bytes = self._scan_and_cull()
+        self._sets_until_scan = self._room(count, total_bytes)
+
+    def _room(self, count, total_bytes):
+        """
+        Sets that can go by without a scan, leaving room for the one in
+        progress: what is left under MAX_ENTRIES and, at the average entry
+        size, under MAX_BYTES, capped at the entries one cull removes.
+        """
+        room = self._max_entries - count
+        if self._max_bytes is not None:
+            if not total_bytes:
+                return 0
+            room = min(room, int((self._max_bytes - total_bytes) / (total_bytes / count)))
+        if self._cull_frequency:
+            room = min(room, self._max_entries // self._cull_frequency)
+        return max(room - 1, 0)
+
+    def _scan_and_cull(self):
+        """
+        Cull if the directory is over either limit, and return the entry
+        count and total bytes left.
+        """
+        entries = []
+        for fname in self._list_cache_files():
+            try:
+                stat = os.stat(fname)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, fname))
+        total_bytes = sum(size for _, size, _ in entries)
+        over_bytes = self._max_bytes is not None and total_bytes >= self._max_bytes
+        if len(entries) < self._max_entries and not over_bytes:
+            return len(entries), total_bytes
+        if self._cull_frequency == 0:
+            self.clear()
+            return 0, 0
+
+        keep = 1 - 1 / self._cull_frequency
+        max_entries = int(self._max_entries * keep)
+        max_bytes = self._max_bytes * keep if self._max_bytes is not None else None
+        count = len(entries)
+        for _, size, fname in sorted(entries):
+            if count <= max_entries and (max_bytes is None or total_bytes <= max_bytes):
+                break
+            self._delete(fname)
+            count -= 1
+            total_bytes -= size
+        return count, total_bytes
@@ -0,0 +1,89 @@
+"""
+Cached "today" snapshot for the home page.
+
+The snapshot (today's totals, low nutrients and which supplement slots were
+taken) is stored per user and per day in the default cache, which every
+worker shares. Signal receivers in tracker.signals delete it once a
+transaction that changes the user's FoodLog or SupplementLog rows commits.
+A request that reads while such a write is in flight may cache the old
+totals, but the commit deletes that entry again. Hit and miss counters are
+kept in the metrics cache (tracker.metrics), so `manage.py cache_stats`
+reports the numbers from every worker.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.timezone import localdate
+
+from .metrics import incr, metrics_cache
+from .models import SupplementLog
+from .nutrients import SUPPLEMENT_NUTRIENTS, TARGETS
+from .rollups import rollup_totals
+
+HITS_KEY = "dashboard:hits"
+MISSES_KEY = "dashboard:misses"
+
+
+def snapshot_key(user_id, day):
+    """
+    Cache key for one user's snapshot of `day`.
+    """
+    return f"dashboard:{user_id}:{day.isoformat()}"
+
+
+def build_snapshot(user, day):
+    """
+    Compute the snapshot from the rollup table and today's supplement logs.
+    """
+    totals = rollup_totals(user, day, day)
+    taken_slots = set(
+        SupplementLog.objects.filter(user=user, date=day)
+        .values_list("time_of_day", flat=True)
+    )
+    return {
+        "totals": totals.as_dict(),
+        "low_nutrients": totals.lows(TARGETS),
+        "taken_supplements": {slot: slot in taken_slots for slot in SUPPLEMENT_NUTRIENTS},
+    }
+
+
+def today_snapshot(user):
+    """
+    Today's snapshot for `user`, from the cache when possible.
+    """
+    day = localdate()
+    key = snapshot_key(user.pk, day)
+    snapshot = cache.get(key)
+    if snapshot is None:
+        incr(MISSES_KEY)
+        snapshot = build_snapshot(user, day)
+        cache.set(key, snapshot, settings.DASHBOARD_CACHE_TIMEOUT)
+    else:
+        incr(HITS_KEY)
+    return snapshot
+
+
+def invalidate_snapshot(user_id, day=None):
+    """
+    Drop the user's cached snapshot for `day` (default: today).
+    """
+    if user_id is not None:
+        cache.delete(snapshot_key(user_id, day or localdate()))
+
+
+def snapshot_stats():
+    """
+    Hit and miss counts since the last reset, and the hit ratio (None before any request).
+    """
+    counters = metrics_cache()
+    hits = counters.get(HITS_KEY, 0)
+    misses = counters.get(MISSES_KEY, 0)
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hits / lookups if lookups else None,
+    }
+
+
+def reset_snapshot_stats():
+    metrics_cache().delete_many([HITS_KEY, MISSES_KEY])
@@ -0,0 +1,70 @@
+"""
+Streaming FoodLog export as CSV or NDJSON.
+
+Rows are read with values_list() over QuerySet.iterator(chunk_size=...), so
+no model instances are built and only one chunk is held in memory at a time,
+however many rows are exported. Both the export view and the
+export_food_logs command consume the same line generators.
+"""
+import csv
+import json
+
+from .nutrients import NUTRIENT_FIELDS
+
+EXPORT_COLUMNS = [
+    'date_logged', 'food_name', 'quantity_amount', 'quantity_unit', 'category',
+] + NUTRIENT_FIELDS
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+CHUNK_SIZE = 2000
+
+
+class Echo:
+    """
+    File-like object whose write() returns the value, for csv.writer.
+    """
+    def write(self, value):
+        return value
+
+
+def export_rows(logs, columns=EXPORT_COLUMNS, chunk_size=CHUNK_SIZE):
+    """
+    Stream tuples of `columns` from a FoodLog queryset in date order.
+    """
+    return (
+        logs.order_by('date_logged', 'pk')
+        .values_list(*columns)
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def csv_lines(rows, columns=EXPORT_COLUMNS):
+    """
+    Yield a CSV header line, then one line per row.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def ndjson_lines(rows, columns=EXPORT_COLUMNS):
+    """
+    Yield one JSON object per row, newline-terminated.
+    """
+    for row in rows:
+        yield json.dumps(dict(zip(columns, row)), default=str) + "\n"
+
+
+def export_lines(logs, export_format, columns=EXPORT_COLUMNS, chunk_size=CHUNK_SIZE):
+    """
+    Lines of `logs` in `export_format` ("csv" or "ndjson").
+    """
+    rows = export_rows(logs, columns, chunk_size)
+    if export_format == 'ndjson':
+        return ndjson_lines(rows, columns)
+    return csv_lines(rows, columns)
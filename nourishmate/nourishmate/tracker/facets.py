@@ -0,0 +1,134 @@
+"""
+Facet counts for the food log list filters.
+
+One grouped query counts the user's logs per (category, logged this week,
+logged this month). Those few rows are cached per user and per day, and
+every facet is derived from them in Python: counts per category within the
+selected period, counts per period within the selected category, and the
+total for the current filters. The rows live in the default cache, which
+every worker shares, for up to FACET_CACHE_TIMEOUT seconds; the signal
+receivers in tracker.signals drop them once a transaction that changes the
+user's FoodLog rows commits.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import BooleanField, Count, ExpressionWrapper, Q
+from django.utils.timezone import localdate
+
+from .models import FoodLog
+
+PERIOD_CHOICES = [
+    ('week', 'This week'),
+    ('month', 'This month'),
+    ('older', 'Older'),
+]
+
+
+def period_bounds(today):
+    """
+    First day of this week (Monday) and of this month.
+    """
+    return today - timedelta(days=today.weekday()), today.replace(day=1)
+
+
+def period_range(period, today):
+    """
+    (start, end) dates for a period filter; (None, None) for "any time".
+    """
+    week_start, month_start = period_bounds(today)
+    if period == 'week':
+        return week_start, None
+    if period == 'month':
+        return month_start, None
+    if period == 'older':
+        return None, month_start - timedelta(days=1)
+    return None, None
+
+
+def facets_key(user_id, day):
+    """
+    Cache key for one user's facet rows on `day`.
+    """
+    return f"facets:{user_id}:{day.isoformat()}"
+
+
+def facet_rows(user, today):
+    """
+    (category, in_week, in_month, count) tuples from a single grouped query.
+    """
+    week_start, month_start = period_bounds(today)
+    rows = (
+        FoodLog.objects.filter(user=user)
+        .annotate(
+            in_week=ExpressionWrapper(Q(date_logged__gte=week_start), output_field=BooleanField()),
+            in_month=ExpressionWrapper(Q(date_logged__gte=month_start), output_field=BooleanField()),
+        )
+        .values('category', 'in_week', 'in_month')
+        .annotate(count=Count('pk'))
+        .order_by()
+    )
+    return [
+        (row['category'], bool(row['in_week']), bool(row['in_month']), row['count'])
+        for row in rows
+    ]
+
+
+def cached_facet_rows(user):
+    """
+    Today's facet rows for `user`, from the cache when possible.
+    """
+    today = localdate()
+    key = facets_key(user.pk, today)
+    rows = cache.get(key)
+    if rows is None:
+        rows = facet_rows(user, today)
+        cache.set(key, rows, settings.FACET_CACHE_TIMEOUT)
+    return rows
+
+
+def facet_counts(rows, category='', period=''):
+    """
+    Counts for the filter dropdowns and the total for the current filters.
+
+    Category counts respect the selected period and period counts respect the
+    selected category, so each number is what choosing that option would show.
+
+    Returns:
+        dict: categories ({value: count}), all_categories, periods
+        ({value: count}), all_periods and total.
+    """
+    periods_known = {value for value, _ in PERIOD_CHOICES}
+    categories, periods = Counter(), Counter()
+    all_categories = all_periods = total = 0
+    for row_category, in_week, in_month, count in rows:
+        in_period = {'week': in_week, 'month': in_month, 'older': not in_month}
+        period_matches = period not in periods_known or in_period[period]
+        category_matches = not category or row_category == category
+        if period_matches:
+            categories[row_category] += count
+            all_categories += count
+        if category_matches:
+            for value, flag in in_period.items():
+                if flag:
+                    periods[value] += count
+            all_periods += count
+        if period_matches and category_matches:
+            total += count
+    return {
+        'categories': dict(categories),
+        'all_categories': all_categories,
+        'periods': dict(periods),
+        'all_periods': all_periods,
+        'total': total,
+    }
+
+
+def invalidate_facets(user_id, day=None):
+    """
+    Drop the user's cached facet rows for `day` (default: today).
+    """
+    if user_id is not None:
+        cache.delete(facets_key(user_id, day or localdate()))
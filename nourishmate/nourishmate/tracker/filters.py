@@ -0,0 +1,56 @@
+"""
+Date-range and category filters shared by the HTML views, the export
+endpoint and the management commands.
+"""
+from datetime import datetime, timedelta
+
+
+def parse_day(value):
+    """
+    Parse a YYYY-MM-DD string; raises ValueError on anything else.
+    """
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def date_range(params, today, default_preset="today"):
+    """
+    Resolve the Nutrition Summary range parameters to (start, end) dates.
+
+    An explicit `start_date` and `end_date` pair wins, swapped if given the
+    wrong way round, so start is never after end; otherwise `range` picks a
+    preset ("today", "7", "30" or "month"). With no range given at all,
+    `default_preset` is used, and None means "unbounded" (None, None).
+    """
+    start_str = params.get("start_date")
+    end_str = params.get("end_date")
+    if start_str and end_str:
+        try:
+            start, end = parse_day(start_str), parse_day(end_str)
+        except ValueError:
+            pass
+        else:
+            return min(start, end), max(start, end)
+
+    preset = params.get("range") or default_preset
+    if preset is None:
+        return None, None
+    if preset == "today":
+        return today, today
+    if preset == "30":
+        return today - timedelta(days=29), today
+    if preset == "month":
+        return today.replace(day=1), today
+    return today - timedelta(days=6), today
+
+
+def filter_logs(logs, start_date=None, end_date=None, category=""):
+    """
+    Narrow a FoodLog queryset to a date range (either end optional) and category.
+    """
+    if start_date:
+        logs = logs.filter(date_logged__gte=start_date)
+    if end_date:
+        logs = logs.filter(date_logged__lte=end_date)
+    if category:
+        logs = logs.filter(category=category)
+    return logs
@@ -0,0 +1,353 @@
+"""
+Bulk loader for USDA FoodData Central (FDC) food-composition dumps.
+
+Foods are loaded into Ingredient (keyed by fdc_id) and IngredientNutrient
+(per 100 g, the basis FDC reports in), so nutrition and autocomplete can
+run without Spoonacular. Two dump layouts are read, both as streams:
+
+    CSV   the directory of an FDC CSV download: food.csv and
+          food_nutrient.csv, plus food_portion.csv, measure_unit.csv and
+          nutrient.csv when present. food_nutrient.csv is read row by row
+          and grouped by fdc_id, in whatever order its rows come.
+    JSON  an FDC JSON download ({"SRLegacyFoods": [...]} and the like, or
+          a bare array), decoded one food at a time, or NDJSON with one
+          food per line.
+
+Nutrients are matched by FDC nutrient number; when a food reports a
+nutrient more than once (e.g. energy by several methods) the preferred
+number wins. Portions ("1 cup, chopped", "1 medium") fill in the gram
+weights of the app's count and volume units.
+
+Foods are inserted with bulk_create in batches of BATCH_SIZE, one
+transaction per batch, skipping foods already loaded. The loader drops
+the ingredient tables' secondary indexes (the ingredient/nutrient unique
+index above all) first and builds them again once the data is in.
+Replacing the loaded foods also drops their cached densities.
+"""
+import csv
+import json
+import os
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from itertools import islice
+
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from .ingredients import density_key
+from .models import Ingredient, IngredientNutrient
+
+BATCH_SIZE = 2000
+
+# FDC nutrient numbers for each nutrient field, most preferred first.
+NUTRIENT_NUMBERS = {
+    "calories": ["208", "957", "958"],
+    "protein": ["203"],
+    "carbs": ["205"],
+    "sugars": ["269", "269.3"],
+    "fiber": ["291"],
+    "fat": ["204"],
+    "saturated_fat": ["606"],
+    "cholesterol": ["601"],
+    "sodium": ["307"],
+    "potassium": ["306"],
+    "calcium": ["301"],
+    "iron": ["303"],
+    "vitamin_a": ["320"],
+    "vitamin_c": ["401"],
+    "vitamin_d": ["328"],
+    "vitamin_b12": ["418"],
+    "magnesium": ["304"],
+    "zinc": ["309"],
+}
+
+# FDC nutrient ids of those numbers, for CSV dumps shipped without nutrient.csv.
+FDC_NUTRIENT_IDS = {
+    1008: "208", 2047: "957", 2048: "958", 1003: "203", 1005: "205", 2000: "269",
+    1063: "269.3", 1079: "291", 1004: "204", 1258: "606", 1253: "601", 1093: "307",
+    1092: "306", 1087: "301", 1089: "303", 1106: "320", 1162: "401", 1114: "328",
+    1178: "418", 1090: "304", 1095: "309",
+}
+
+# Leading words of a portion description and the units they give a weight for.
+PORTION_UNITS = [
+    ("cup", ["cup"]),
+    ("slice", ["slice"]),
+    ("piece", ["piece"]),
+    ("serving", ["serving"]),
+    ("fruit", ["fruit"]),
+    ("medium", ["piece", "fruit"]),
+    ("whole", ["piece", "fruit"]),
+]
+
+_RANKS = {
+    number: (field, rank)
+    for field, numbers in NUTRIENT_NUMBERS.items()
+    for rank, number in enumerate(numbers)
+}
+
+_NAME_LENGTH = Ingredient._meta.get_field("name").max_length
+
+Food = namedtuple("Food", ["fdc_id", "name", "nutrients", "unit_grams"])
+
+
+def pick_nutrients(pairs):
+    """
+    {field: amount per 100 g} from (FDC nutrient number, amount) pairs,
+    keeping the preferred number where a field is reported more than once.
+    """
+    best = {}
+    for number, amount in pairs:
+        if number not in _RANKS or amount is None:
+            continue
+        field, rank = _RANKS[number]
+        if field not in best or rank < best[field][0]:
+            best[field] = (rank, float(amount))
+    return {field: amount for field, (_, amount) in best.items()}
+
+
+def portion_units(description):
+    """
+    The app units a portion description such as "cup, chopped" weighs.
+    """
+    text = description.strip().lower()
+    for prefix, units in PORTION_UNITS:
+        if text.startswith(prefix):
+            return units
+    return []
+
+
+def unit_grams_from(portions):
+    """
+    {unit: grams in one} from (description, amount, gram weight) portions;
+    the first portion for a unit wins.
+    """
+    grams = {}
+    for description, amount, gram_weight in portions:
+        try:
+            amount, gram_weight = float(amount or 1), float(gram_weight)
+        except (TypeError, ValueError):
+            continue
+        if amount <= 0 or gram_weight <= 0:
+            continue
+        for unit in portion_units(description):
+            grams.setdefault(unit, round(gram_weight / amount, 3))
+    return grams
+
+
+def iter_json_array(stream, chunk_size=1 << 16):
+    """
+    Yield the items of the first JSON array in a text stream one at a time,
+    holding only the current item in memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    started = False
+    while True:
+        if not started:
+            start = buffer.find("[", position)
+            if start >= 0:
+                position = start + 1
+                started = True
+                continue
+            position = len(buffer)
+        else:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer) and buffer[position] == "]":
+                return
+            if position < len(buffer):
+                try:
+                    item, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    item = None
+                else:
+                    if end < len(buffer):
+                        yield item
+                        position = end
+                        continue
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            if started and position < len(buffer):
+                item, position = decoder.raw_decode(buffer, position)
+                yield item
+                continue
+            return
+        buffer = buffer[position:] + chunk
+        position = 0
+
+
+def food_from_json(record):
+    """
+    A Food from one FDC JSON food record.
+    """
+    nutrients = pick_nutrients(
+        ((entry.get("nutrient") or {}).get("number"), entry.get("amount"))
+        for entry in record.get("foodNutrients", [])
+    )
+    portions = []
+    for portion in record.get("foodPortions", []):
+        unit = (portion.get("measureUnit") or {}).get("name", "")
+        description = unit if unit and unit != "undetermined" else (
+            portion.get("modifier") or portion.get("portionDescription") or ""
+        )
+        portions.append((description, portion.get("amount"), portion.get("gramWeight")))
+    return Food(int(record["fdcId"]), record.get("description", ""), nutrients, unit_grams_from(portions))
+
+
+def read_json_foods(stream, ndjson=False):
+    """
+    Yield Foods from an FDC JSON document or NDJSON stream.
+    """
+    if ndjson:
+        records = (json.loads(line) for line in stream if line.strip())
+    else:
+        records = iter_json_array(stream)
+    for record in records:
+        yield food_from_json(record)
+
+
+def _csv_rows(directory, name):
+    path = os.path.join(directory, name)
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8-sig", newline="") as stream:
+        yield from csv.DictReader(stream)
+
+
+def read_csv_foods(directory, data_types=None):
+    """
+    Yield Foods from an FDC CSV download directory, optionally only those
+    of the given data types (e.g. "sr_legacy_food", "foundation_food").
+
+    food_nutrient.csv need not be sorted: its rows are grouped by fdc_id
+    first, keeping only the nutrients NUTRIENT_NUMBERS maps, and the foods
+    are yielded once the whole file has been read.
+    """
+    if not os.path.exists(os.path.join(directory, "food_nutrient.csv")):
+        raise FileNotFoundError(f"No food_nutrient.csv in {directory}.")
+    names = {
+        row["fdc_id"]: row["description"]
+        for row in _csv_rows(directory, "food.csv")
+        if not data_types or row.get("data_type") in data_types
+    }
+    numbers = {
+        row["id"]: row["nutrient_nbr"] for row in _csv_rows(directory, "nutrient.csv")
+    } or {str(nutrient_id): number for nutrient_id, number in FDC_NUTRIENT_IDS.items()}
+    measure_units = {row["id"]: row["name"] for row in _csv_rows(directory, "measure_unit.csv")}
+
+    portions = {}
+    for row in _csv_rows(directory, "food_portion.csv"):
+        if row["fdc_id"] not in names:
+            continue
+        unit = measure_units.get(row.get("measure_unit_id"), "")
+        description = unit if unit and unit != "undetermined" else (
+            row.get("modifier") or row.get("portion_description") or ""
+        )
+        portions.setdefault(row["fdc_id"], []).append((description, row.get("amount"), row.get("gram_weight")))
+
+    pairs = {}
+    for row in _csv_rows(directory, "food_nutrient.csv"):
+        fdc_id = row["fdc_id"]
+        if fdc_id not in names:
+            continue
+        food_pairs = pairs.setdefault(fdc_id, [])
+        number = numbers.get(row["nutrient_id"])
+        if number in _RANKS:
+            food_pairs.append((number, row.get("amount") or None))
+
+    for fdc_id, food_pairs in pairs.items():
+        yield Food(int(fdc_id), names[fdc_id], pick_nutrients(food_pairs), unit_grams_from(portions.get(fdc_id, [])))
+
+
+@contextmanager
+def indexes_deferred():
+    """
+    Drop the ingredient tables' secondary indexes and unique_together
+    indexes for the duration of a bulk load, then build them again.
+    """
+    # Not entered as a context manager: nothing here rebuilds a table, and
+    # the load may run inside a transaction.
+    editor = connection.schema_editor()
+    models = (Ingredient, IngredientNutrient)
+    for model in models:
+        editor.alter_unique_together(model, model._meta.unique_together, [])
+        for index in model._meta.indexes:
+            editor.remove_index(model, index)
+    try:
+        yield
+    finally:
+        for model in models:
+            for index in model._meta.indexes:
+                editor.add_index(model, index)
+            editor.alter_unique_together(model, [], model._meta.unique_together)
+
+
+def _batches(items, size):
+    items = iter(items)
+    while batch := list(islice(items, size)):
+        yield batch
+
+
+def load_foods(foods, batch_size=BATCH_SIZE, replace=False):
+    """
+    Insert Foods as Ingredients and IngredientNutrients, batch by batch.
+
+    Args:
+        foods: iterable of Food, consumed lazily.
+        replace: delete every previously loaded FDC food first, and drop
+            their cached densities once loading ends; otherwise foods
+            already loaded are skipped.
+
+    Returns:
+        dict: foods, nutrients, skipped, seconds, rows_per_second.
+    """
+    started = time.perf_counter()
+    if replace:
+        replaced = list(Ingredient.objects.filter(fdc_id__isnull=False).values_list("fdc_id", flat=True))
+        Ingredient.objects.filter(fdc_id__isnull=False).delete()
+        loaded = set()
+    else:
+        replaced = []
+        loaded = set(Ingredient.objects.filter(fdc_id__isnull=False).values_list("fdc_id", flat=True))
+
+    created_foods = created_nutrients = skipped = 0
+    try:
+        with indexes_deferred():
+            for batch in _batches(foods, batch_size):
+                fresh = []
+                for food in batch:
+                    if food.fdc_id in loaded:
+                        skipped += 1
+                    else:
+                        loaded.add(food.fdc_id)
+                        fresh.append(food)
+                if not fresh:
+                    continue
+                with transaction.atomic():
+                    ingredients = Ingredient.objects.bulk_create([
+                        Ingredient(fdc_id=food.fdc_id, name=food.name[:_NAME_LENGTH], unit_grams=food.unit_grams)
+                        for food in fresh
+                    ])
+                    nutrients = IngredientNutrient.objects.bulk_create([
+                        IngredientNutrient(ingredient=ingredient, nutrient=field, per_100g=amount)
+                        for ingredient, food in zip(ingredients, fresh)
+                        for field, amount in food.nutrients.items()
+                    ], batch_size=batch_size)
+                created_foods += len(ingredients)
+                created_nutrients += len(nutrients)
+    finally:
+        # A density cached before the replace would outlive its rows.
+        cache.delete_many([density_key(fdc_id=fdc_id) for fdc_id in replaced])
+
+    seconds = time.perf_counter() - started
+    rows = created_foods + created_nutrients
+    return {
+        "foods": created_foods,
+        "nutrients": created_nutrients,
+        "skipped": skipped,
+        "seconds": seconds,
+        "rows_per_second": round(rows / seconds) if seconds else rows,
+    }
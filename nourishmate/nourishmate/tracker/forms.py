@@ -6,10 +6,20 @@ from django import forms
 from django.core.exceptions import ValidationError
 from django.utils.timezone import localdate
 from .models import FoodLog, PantryItem
+from .nutrients import NUTRIENT_FIELDS
 from datetime import date
 from django.core.validators import MinValueValidator
 
 
+# Fields that must not be negative, and the error messages shared with the
+# bulk importer.
+NON_NEGATIVE_FIELDS = ['quantity_amount'] + NUTRIENT_FIELDS
+FUTURE_DATE_ERROR = "You can’t log food for a future date."
+
+
+def negative_error(field):
+    return f"{field.replace('_', ' ').capitalize()} cannot be negative."
+
 
 class FoodLogForm(forms.ModelForm):
     """
@@ -26,25 +36,7 @@ class FoodLogForm(forms.ModelForm):
             'quantity_unit',
             'category',
             'date_logged',
-            'calories',
-            'protein',
-            'carbs',
-            'sugars',
-            'fiber',
-            'fat',
-            'saturated_fat',
-            'cholesterol',
-            'sodium',
-            'potassium',
-            'calcium',
-            'iron',
-            'vitamin_a',
-            'vitamin_c',
-            'vitamin_d',
-            'vitamin_b12',
-            'magnesium',
-            'zinc',
-        ]
+        ] + NUTRIENT_FIELDS
         widgets = {
             'food_name': forms.TextInput(attrs={'class': 'form-control'}),
             'quantity_amount': forms.NumberInput(attrs={
@@ -78,13 +70,7 @@ class FoodLogForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        optional_fields = [
-            'calories', 'protein', 'carbs', 'sugars', 'fiber', 'fat', 'saturated_fat',
-            'cholesterol', 'sodium', 'potassium', 'calcium', 'iron',
-            'vitamin_a', 'vitamin_c', 'vitamin_d', 'vitamin_b12',
-            'magnesium', 'zinc'
-        ]
-        for field in optional_fields:
+        for field in NUTRIENT_FIELDS:
             self.fields[field].required = False
 
         self.fields['quantity_unit'].choices = [('', '--- Select Unit ---')] + list(self.fields['quantity_unit'].choices)
@@ -103,7 +89,7 @@ class FoodLogForm(forms.ModelForm):
         """
         date = self.cleaned_data.get('date_logged')
         if date and date > localdate():
-            raise forms.ValidationError("You can’t log food for a future date.")
+            raise forms.ValidationError(FUTURE_DATE_ERROR)
         return date
     
     def clean(self):
@@ -111,16 +97,10 @@ class FoodLogForm(forms.ModelForm):
         Validation for non-negative numbers.
         """
         cleaned_data = super().clean()
-        numeric_fields = [
-            'quantity_amount', 'calories', 'protein', 'carbs', 'sugars', 'fiber', 
-            'fat', 'saturated_fat', 'cholesterol', 'sodium', 'potassium', 'calcium', 
-            'iron', 'vitamin_a', 'vitamin_c', 'vitamin_d', 'vitamin_b12', 'magnesium', 'zinc'
-        ]
-        
-        for field in numeric_fields:
+        for field in NON_NEGATIVE_FIELDS:
             value = cleaned_data.get(field)
             if value is not None and value < 0:
-                raise ValidationError({field: f"{field.replace('_', ' ').capitalize()} cannot be negative."})
+                raise ValidationError({field: negative_error(field)})
         
         return cleaned_data
     
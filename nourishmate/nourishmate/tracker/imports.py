@@ -0,0 +1,219 @@
+"""
+Bulk FoodLog import from CSV, NDJSON or JSON.
+
+Rows are read lazily and validated a batch at a time, one column across the
+whole batch per pass, with the same rules as FoodLogForm (nutrients and
+quantity non-negative, no future dates). Valid rows of each batch are
+inserted with bulk_create in their own transaction; invalid rows are
+reported by row number and skipped. The columns match tracker.exports, so
+an export can be imported again as-is.
+
+bulk_create bypasses FoodLog.save() and its signals, so the user's rollups
+are rebuilt over the imported date range once the last batch is in, and the
+cached home snapshot and facet counts are dropped. This also happens when
+the import stops early: a file that cannot be read past some record keeps
+the batches committed before it, and the report says where it stopped.
+"""
+import csv
+import io
+import json
+import math
+import time
+from datetime import datetime
+
+from django.db import transaction
+from django.utils.timezone import localdate
+
+from .dashboard import invalidate_snapshot
+from .facets import invalidate_facets
+from .forms import FUTURE_DATE_ERROR, NON_NEGATIVE_FIELDS, negative_error
+from .models import CATEGORY_CHOICES, QUANTITY_UNITS, FoodLog
+from .rollups import rebuild_rollups
+
+IMPORT_FORMATS = ['csv', 'ndjson', 'json']
+
+BATCH_SIZE = 1000
+
+_CATEGORIES = {value for value, _ in CATEGORY_CHOICES}
+_UNITS = {value for value, _ in QUANTITY_UNITS}
+_NAME_LENGTH = FoodLog._meta.get_field('food_name').max_length
+
+
+def format_for(filename):
+    """
+    Import format implied by a file name: .csv, .ndjson/.jsonl or .json.
+    """
+    name = filename.lower()
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    if name.endswith('.json'):
+        return 'json'
+    return None
+
+
+def read_rows(stream, import_format):
+    """
+    Yield one dict per record from a text stream.
+    CSV and NDJSON are read line by line; a JSON document must be an array.
+    """
+    if import_format == 'csv':
+        yield from csv.DictReader(stream)
+    elif import_format == 'ndjson':
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        yield from json.load(stream)
+
+
+def text_stream(binary_file):
+    """
+    Wrap an uploaded (binary) file for reading as UTF-8 text, BOM tolerated.
+    """
+    return io.TextIOWrapper(binary_file, encoding='utf-8-sig', newline='')
+
+
+def _blank(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def validate_batch(batch, today):
+    """
+    Validate a list of (row_number, record) pairs column by column.
+
+    Returns:
+        tuple: (list of unsaved FoodLog, list of {"row": n, "errors": {...}}).
+    """
+    columns = {}
+    errors = [{} for _ in batch]
+
+    names = []
+    for i, (_, record) in enumerate(batch):
+        name = str(record.get('food_name') or '').strip()
+        if not name:
+            errors[i]['food_name'] = "This field is required."
+        elif len(name) > _NAME_LENGTH:
+            errors[i]['food_name'] = f"Ensure this value has at most {_NAME_LENGTH} characters."
+        names.append(name)
+    columns['food_name'] = names
+
+    for field in NON_NEGATIVE_FIELDS:
+        values = []
+        for i, (_, record) in enumerate(batch):
+            raw = record.get(field)
+            if _blank(raw):
+                values.append(None if field == 'quantity_amount' else 0.0)
+                continue
+            try:
+                value = float(raw)
+            except (TypeError, ValueError):
+                value = None
+            if value is None or not math.isfinite(value):
+                errors[i][field] = "Enter a number."
+            elif value < 0:
+                errors[i][field] = negative_error(field)
+            values.append(value)
+        columns[field] = values
+
+    dates = []
+    for i, (_, record) in enumerate(batch):
+        raw = record.get('date_logged')
+        day = today
+        if not _blank(raw):
+            try:
+                day = datetime.strptime(str(raw).strip(), "%Y-%m-%d").date()
+            except ValueError:
+                errors[i]['date_logged'] = "Enter a valid date (YYYY-MM-DD)."
+        if day > today:
+            errors[i]['date_logged'] = FUTURE_DATE_ERROR
+        dates.append(day)
+    columns['date_logged'] = dates
+
+    for field, allowed, default in [
+        ('category', _CATEGORIES, 'other'),
+        ('quantity_unit', _UNITS, None),
+    ]:
+        values = []
+        for i, (_, record) in enumerate(batch):
+            raw = record.get(field)
+            value = default if _blank(raw) else str(raw).strip()
+            if value is not None and value not in allowed:
+                errors[i][field] = f"Select a valid choice. {value} is not one of the available choices."
+            values.append(value)
+        columns[field] = values
+
+    logs, report = [], []
+    for i, (row_number, _) in enumerate(batch):
+        if errors[i]:
+            report.append({'row': row_number, 'errors': errors[i]})
+        else:
+            logs.append(FoodLog(**{field: values[i] for field, values in columns.items()}))
+    return logs, report
+
+
+def import_food_logs(rows, user, batch_size=BATCH_SIZE, dry_run=False):
+    """
+    Validate and insert records from `rows` as FoodLog entries owned by `user`.
+
+    Row numbers in the error report count data records from 1. A read
+    error (bad encoding, malformed line) stops the import; rows read
+    before it are still imported, and the error is reported as read_error.
+
+    Returns:
+        dict: processed, created, rejected, errors, read_error (None when
+        the whole file was read), seconds and rows_per_second.
+    """
+    started = time.perf_counter()
+    today = localdate()
+    created, errors = 0, []
+    first_day = last_day = None
+
+    def flush(batch):
+        nonlocal created, first_day, last_day
+        logs, batch_errors = validate_batch(batch, today)
+        errors.extend(batch_errors)
+        if dry_run or not logs:
+            return
+        for log in logs:
+            log.user = user
+        with transaction.atomic():
+            FoodLog.objects.bulk_create(logs, batch_size=batch_size)
+        created += len(logs)
+        days = [log.date_logged for log in logs] + [d for d in (first_day, last_day) if d]
+        first_day, last_day = min(days), max(days)
+
+    batch, processed, read_error = [], 0, None
+    try:
+        try:
+            for processed, record in enumerate(rows, start=1):
+                if not isinstance(record, dict):
+                    errors.append({'row': processed, 'errors': {'__all__': "Expected an object."}})
+                    continue
+                batch.append((processed, record))
+                if len(batch) >= batch_size:
+                    flush(batch)
+                    batch = []
+        except (ValueError, csv.Error) as e:
+            read_error = f"Stopped at record {processed + 1}: {e}"
+        if batch:
+            flush(batch)
+    finally:
+        # Whatever was committed, even if a batch then failed, is reflected
+        # in the rollups and caches.
+        if created:
+            for _ in rebuild_rollups(first_day, last_day, user=user):
+                pass
+            transaction.on_commit(lambda: (invalidate_snapshot(user.pk), invalidate_facets(user.pk)))
+
+    seconds = time.perf_counter() - started
+    return {
+        'processed': processed,
+        'created': created,
+        'rejected': len(errors),
+        'errors': errors,
+        'read_error': read_error,
+        'seconds': round(seconds, 3),
+        'rows_per_second': round(processed / seconds) if seconds else processed,
+    }
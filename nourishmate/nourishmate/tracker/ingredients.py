@@ -0,0 +1,186 @@
+"""
+Local nutrition for ingredients.
+
+The food form asks /api/nutrition/ again whenever the quantity or unit
+changes. Instead of one Spoonacular call per (ingredient, amount, unit),
+each ingredient's nutrients are stored once per BASE_GRAMS (Ingredient and
+IngredientNutrient), with the weight of each count or volume unit the app
+offers. Any quantity is then converted to grams and scaled locally:
+
+    g, oz                              fixed factors (MASS_UNITS)
+    cup, piece, slice, fruit, serving  per ingredient, in Ingredient.unit_grams
+
+The weight of a unit comes from the weightPerServing Spoonacular reports
+the first time that ingredient is asked for in that unit. So an
+ingredient costs one upstream call, plus one for each further count or
+volume unit. The stored density is also kept in the cache, so a warm
+lookup runs no queries.
+
+Foods loaded from a USDA FoodData Central dump (tracker.fooddata) are
+addressed as "fdc:<fdc_id>" and always scaled locally. With
+NUTRITION_OFFLINE set, Spoonacular is never called: ingredients that are
+not stored, or units without a stored weight, have no nutrition.
+"""
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+
+from . import spoonacular
+from .models import Ingredient, IngredientNutrient
+from .nutrients import NUTRIENT_FIELDS, NutrientVector
+
+# Canonical amount nutrients are stored for (IngredientNutrient.per_100g).
+BASE_GRAMS = 100
+
+# Grams per unit for units whose weight does not depend on the ingredient.
+MASS_UNITS = {
+    "g": 1.0,
+    "oz": 28.349523125,
+}
+
+# Nutrient amounts per BASE_GRAMS (in NUTRIENT_FIELDS order) and {unit: grams}.
+Density = namedtuple("Density", ["per_base", "unit_grams"])
+
+
+# Prefix of ingredient ids that name a food loaded from FoodData Central.
+FDC_PREFIX = "fdc:"
+
+
+def density_key(spoonacular_id=None, fdc_id=None):
+    """
+    Cache key for one ingredient's density.
+    """
+    if fdc_id is not None:
+        return f"ingredient_density:{FDC_PREFIX}{fdc_id}"
+    return f"ingredient_density:{spoonacular_id}"
+
+
+def parse_ingredient_id(raw):
+    """
+    {"spoonacular_id": n} or {"fdc_id": n} for an ingredient id as the
+    client sends it ("1234" or "fdc:1234").
+
+    Raises:
+        ValueError: when `raw` is neither.
+    """
+    if raw.startswith(FDC_PREFIX):
+        return {"fdc_id": int(raw[len(FDC_PREFIX):])}
+    return {"spoonacular_id": int(raw)}
+
+
+def load_density(spoonacular_id=None, fdc_id=None):
+    """
+    An ingredient's stored density, from the cache when possible; None
+    when it has never been fetched or loaded.
+    """
+    key = density_key(spoonacular_id, fdc_id)
+    density = cache.get(key)
+    if density is None:
+        lookup = {"fdc_id": fdc_id} if fdc_id is not None else {"spoonacular_id": spoonacular_id}
+        ingredient = (
+            Ingredient.objects.filter(**lookup)
+            .prefetch_related("nutrients")
+            .first()
+        )
+        if ingredient is None:
+            return None
+        amounts = {row.nutrient: row.per_100g for row in ingredient.nutrients.all()}
+        density = Density(
+            tuple(NutrientVector.from_mapping(amounts).amounts),
+            dict(ingredient.unit_grams),
+        )
+        cache.set(key, density, settings.INGREDIENT_CACHE_TIMEOUT)
+    return density
+
+
+def to_grams(amount, unit, unit_grams):
+    """
+    Weight of `amount` `unit`s, or None when the unit's weight is unknown.
+    """
+    if unit in MASS_UNITS:
+        return amount * MASS_UNITS[unit]
+    per_unit = unit_grams.get(unit)
+    return amount * per_unit if per_unit else None
+
+
+def scale(density, grams):
+    """
+    Nutrients in `grams` of an ingredient.
+    """
+    return NutrientVector(density.per_base) * (grams / BASE_GRAMS)
+
+
+def learn(spoonacular_id, amount, unit, info, stored=False):
+    """
+    Store the density and unit weight an upstream /information response
+    reveals, and return its nutrients for the requested amount. Responses
+    without a weight in grams are returned but not stored. When the
+    ingredient is `stored` already, only the unit's weight is added.
+    """
+    nutrition = info.get("nutrition", {})
+    nutrients = NutrientVector.from_spoonacular(nutrition.get("nutrients", []))
+    weight = nutrition.get("weightPerServing") or {}
+    grams = weight.get("amount") if weight.get("unit") == "g" else None
+    if not grams or amount <= 0:
+        return nutrients
+
+    unit_grams = {} if unit in MASS_UNITS else {unit: grams / amount}
+    if not stored:
+        per_base = nutrients * (BASE_GRAMS / grams)
+        try:
+            with transaction.atomic():
+                ingredient = Ingredient.objects.create(
+                    spoonacular_id=spoonacular_id, name=info.get("name", ""), unit_grams=unit_grams,
+                )
+                IngredientNutrient.objects.bulk_create([
+                    IngredientNutrient(ingredient=ingredient, nutrient=field, per_100g=value)
+                    for field, value in zip(NUTRIENT_FIELDS, per_base.amounts)
+                ])
+            unit_grams = {}
+        except IntegrityError:
+            pass  # Stored meanwhile by another request; add the unit below.
+    if unit_grams:
+        ingredient = Ingredient.objects.get(spoonacular_id=spoonacular_id)
+        ingredient.unit_grams.update(unit_grams)
+        ingredient.save(update_fields=["unit_grams", "updated_at"])
+    cache.delete(density_key(spoonacular_id))
+    return nutrients
+
+
+def local_nutrition(amount, unit, spoonacular_id=None, fdc_id=None):
+    """
+    Nutrients in `amount` `unit`s of a stored ingredient, or None when the
+    ingredient or the unit's weight is not stored.
+    """
+    density = load_density(spoonacular_id, fdc_id)
+    if density is None:
+        return None
+    grams = to_grams(amount, unit, density.unit_grams)
+    return scale(density, grams) if grams is not None else None
+
+
+def nutrition_for(spoonacular_id, amount, unit):
+    """
+    Nutrients in `amount` `unit`s of an ingredient, scaled locally when its
+    density and the unit's weight are stored, fetched otherwise.
+
+    Returns:
+        NutrientVector, or None when it is not stored and the upstream call
+        failed or NUTRITION_OFFLINE is set.
+    """
+    density = load_density(spoonacular_id)
+    if density is not None:
+        grams = to_grams(amount, unit, density.unit_grams)
+        if grams is not None:
+            return scale(density, grams)
+    if settings.NUTRITION_OFFLINE:
+        return None
+
+    info = spoonacular.get(
+        f"/food/ingredients/{spoonacular_id}/information", {"amount": amount, "unit": unit},
+    )
+    if info is None:
+        return None
+    return learn(spoonacular_id, amount, unit, info, stored=density is not None)
@@ -0,0 +1,195 @@
+"""
+Synthetic-load benchmark for the main tracker views.
+
+Seeds N users, each with M food logs, pantry items and grocery items, in a
+tracker.testing.sandbox: a throwaway test database and private in-memory
+caches, so neither the configured database nor the caches real workers
+share are touched. Every view is then
+requested through the Django test client with Spoonacular replaced by
+tracker.testing.fake_spoonacular_get, and the p50/p95 latency, query count
+and peak Python memory per view are written as JSON so runs can be diffed
+between releases.
+"""
+import json
+import platform
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import timedelta
+from unittest.mock import patch
+
+import django
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.timezone import localdate
+
+from tracker.models import CATEGORY_CHOICES, FoodLog, GroceryItem, PantryItem, SupplementLog
+from tracker.nutrients import NUTRIENT_FIELDS
+from tracker.rollups import rebuild_rollups
+from tracker.testing import fake_spoonacular_get, sandbox
+
+# (name, url name, query parameters) for every benchmarked request.
+SCENARIOS = [
+    ("home", "home", {}),
+    ("food_log_list", "food_log_list", {}),
+    ("food_log_list_sorted_page", "food_log_list", {"sort": "calories_desc", "page": 2}),
+    ("nutrition_summary_30", "nutrition_summary", {"range": "30"}),
+    ("grocery_list", "grocery_list", {}),
+    ("pantry_list", "pantry_list", {}),
+    ("recipe_search", "recipe_search", {"mode": "search", "ingredients": "tomato"}),
+    ("recipe_smart", "recipe_search", {"mode": "smart"}),
+]
+
+FOODS = ["Oats", "Apple", "Lentils", "Tofu", "Spinach", "Rice", "Almonds", "Yogurt", "Salmon", "Bread"]
+
+
+def percentile(samples, pct):
+    """
+    Nearest-rank percentile of a non-empty list.
+    """
+    ordered = sorted(samples)
+    rank = max(1, round(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class Command(BaseCommand):
+    help = "Benchmark tracker views against synthetic users and write p50/p95, queries and memory as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=5, help="Synthetic users (N).")
+        parser.add_argument("--logs", type=int, default=500, help="Food logs per user (M).")
+        parser.add_argument("--pantry", type=int, default=50, help="Pantry items per user.")
+        parser.add_argument("--grocery", type=int, default=50, help="Grocery items per user.")
+        parser.add_argument("--days", type=int, default=365, help="Days of history the logs are spread over.")
+        parser.add_argument("--requests", type=int, default=20, help="Timed requests per view.")
+        parser.add_argument("--views", nargs="+", choices=[name for name, _, _ in SCENARIOS], help="Only these scenarios.")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="JSON file to write (default: stdout).")
+
+    def handle(self, *args, **options):
+        if options["users"] < 1 or options["requests"] < 1:
+            raise CommandError("--users and --requests must be at least 1.")
+        scenarios = [s for s in SCENARIOS if not options["views"] or s[0] in options["views"]]
+
+        with sandbox(), override_settings(ALLOWED_HOSTS=["testserver"]), \
+                patch("tracker.spoonacular.session.get", side_effect=fake_spoonacular_get):
+            started = time.perf_counter()
+            users = self.seed(options)
+            seed_seconds = time.perf_counter() - started
+            results = {
+                name: self.measure(users, url_name, params, options["requests"])
+                for name, url_name, params in scenarios
+            }
+
+        report = {
+            "generated_at": timezone.now().isoformat(),
+            "config": {key: options[key] for key in ("users", "logs", "pantry", "grocery", "days", "requests", "seed")},
+            "environment": {
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+            },
+            "seed_seconds": round(seed_seconds, 3),
+            "views": results,
+        }
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as out:
+                out.write(output + "\n")
+            for name, result in results.items():
+                self.stdout.write(
+                    f"{name:<28} p50 {result['p50_ms']:>8.2f} ms  p95 {result['p95_ms']:>8.2f} ms  "
+                    f"{result['queries']['max']:>3} queries  {result['peak_memory_kb']:>8.1f} KiB"
+                )
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+    def seed(self, options):
+        """
+        Create the synthetic users and their rows; returns the users.
+        """
+        rng = random.Random(options["seed"])
+        today = localdate()
+        categories = [value for value, _ in CATEGORY_CHOICES]
+        users = [
+            User.objects.create_user(f"benchmark-{n}", password="benchmark")
+            for n in range(options["users"])
+        ]
+        for user in users:
+            FoodLog.objects.bulk_create(
+                (
+                    FoodLog(
+                        user=user,
+                        food_name=rng.choice(FOODS),
+                        category=rng.choice(categories),
+                        quantity_amount=rng.randint(1, 4),
+                        date_logged=today - timedelta(days=rng.randrange(options["days"])),
+                        **{field: round(rng.uniform(0, 50), 1) for field in NUTRIENT_FIELDS},
+                    )
+                    for _ in range(options["logs"])
+                ),
+                batch_size=1000,
+            )
+            PantryItem.objects.bulk_create(
+                PantryItem(user=user, name=f"{rng.choice(FOODS)} {n}", quantity=rng.randint(1, 5), unit="piece")
+                for n in range(options["pantry"])
+            )
+            GroceryItem.objects.bulk_create(
+                GroceryItem(user=user, name=f"{rng.choice(FOODS)} {n}", quantity="1", category=rng.choice(categories))
+                for n in range(options["grocery"])
+            )
+            SupplementLog.objects.create(user=user, date=today, time_of_day="morning")
+        for _ in rebuild_rollups():
+            pass
+        return users
+
+    def measure(self, users, url_name, params, repeat):
+        """
+        Time `repeat` requests spread across `users`, then take one traced
+        request per user for peak memory.
+        """
+        url = reverse(url_name)
+        clients = []
+        for user in users:
+            client = Client()
+            client.force_login(user)
+            client.get(url, params)  # Warm-up: imports, template loading, caches.
+            clients.append(client)
+
+        timings, queries = [], []
+        for n in range(repeat):
+            client = clients[n % len(clients)]
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get(url, params)
+                timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise CommandError(f"{url} returned {response.status_code}")
+            queries.append(len(captured))
+
+        peaks = []
+        for client in clients:
+            tracemalloc.start()
+            try:
+                client.get(url, params)
+                peaks.append(tracemalloc.get_traced_memory()[1])
+            finally:
+                tracemalloc.stop()
+
+        return {
+            "url": url,
+            "params": params,
+            "requests": repeat,
+            "p50_ms": round(percentile(timings, 50), 3),
+            "p95_ms": round(percentile(timings, 95), 3),
+            "mean_ms": round(statistics.mean(timings), 3),
+            "queries": {"min": min(queries), "median": statistics.median(queries), "max": max(queries)},
+            "peak_memory_kb": round(max(peaks) / 1024, 1),
+        }
@@ -0,0 +1,76 @@
+"""
+Compare date-range summary strategies over growing range lengths.
+
+Seeds a user with synthetic food logs in a tracker.testing.sandbox (a
+throwaway test database and private caches), then times three ways of computing range totals:
+summing raw FoodLog rows, summing DailyNutrientRollup rows, and the
+prefix-sum index.
+"""
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.utils.timezone import localdate
+
+from tracker.aggregates import food_totals
+from tracker.models import FoodLog
+from tracker.rollups import rebuild_rollups, rollup_totals, range_totals
+from tracker.testing import sandbox
+
+
+def median_ms(func, repeat):
+    """
+    Median wall time of `repeat` calls to `func`, in milliseconds.
+    """
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+class Command(BaseCommand):
+    help = "Benchmark raw, rollup and prefix-sum range totals over 1, 30, 365 and 1,000 days."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, nargs="+", default=[1, 30, 365, 1000])
+        parser.add_argument("--logs-per-day", type=int, default=5)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        spans = sorted(options["days"])
+        today = localdate()
+
+        with sandbox():
+            user = User.objects.create_user("benchmark-ranges")
+            FoodLog.objects.bulk_create(
+                (
+                    FoodLog(
+                        user=user,
+                        food_name=f"Synthetic {day}-{n}",
+                        date_logged=today - timedelta(days=day),
+                        calories=100 + n,
+                        protein=5,
+                    )
+                    for day in range(spans[-1])
+                    for n in range(options["logs_per_day"])
+                ),
+                batch_size=1000,
+            )
+            for _ in rebuild_rollups(today - timedelta(days=spans[-1]), today, user=user):
+                pass
+            range_totals(user, today, today)
+
+            self.stdout.write(f"{'days':>6} {'raw ms':>10} {'rollup ms':>10} {'prefix ms':>10}")
+            for span in spans:
+                start = today - timedelta(days=span - 1)
+                raw = median_ms(
+                    lambda: food_totals(FoodLog.objects.filter(user=user, date_logged__range=[start, today])),
+                    options["repeat"],
+                )
+                rollup = median_ms(lambda: rollup_totals(user, start, today), options["repeat"])
+                prefix = median_ms(lambda: range_totals(user, start, today), options["repeat"])
+                self.stdout.write(f"{span:>6} {raw:>10.2f} {rollup:>10.2f} {prefix:>10.2f}")
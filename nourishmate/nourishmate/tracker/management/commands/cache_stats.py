@@ -0,0 +1,23 @@
+"""
+Report hit/miss counters for the cached home snapshot.
+"""
+from django.core.management.base import BaseCommand
+
+from tracker.dashboard import reset_snapshot_stats, snapshot_stats
+
+
+class Command(BaseCommand):
+    help = "Show cache hit/miss counters for the home page snapshot."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Zero the counters after printing them.")
+
+    def handle(self, *args, **options):
+        stats = snapshot_stats()
+        ratio = "n/a" if stats["hit_ratio"] is None else f"{stats['hit_ratio']:.1%}"
+        self.stdout.write(
+            f"dashboard snapshot: {stats['hits']} hits, {stats['misses']} misses, hit ratio {ratio}"
+        )
+        if options["reset"]:
+            reset_snapshot_stats()
+            self.stdout.write("Counters reset.")
@@ -0,0 +1,49 @@
+"""
+Stream FoodLog rows to a file or stdout as CSV or NDJSON.
+"""
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.timezone import localdate
+
+from tracker.exports import CHUNK_SIZE, EXPORT_COLUMNS, EXPORT_FORMATS, export_lines
+from tracker.filters import date_range, filter_logs
+from tracker.models import FoodLog
+
+
+class Command(BaseCommand):
+    help = "Export food logs as CSV or NDJSON without loading them into memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="csv")
+        parser.add_argument("--user", help="Only export this username's logs (default: every user).")
+        parser.add_argument("--range", choices=["today", "7", "30", "month"], help="Preset date range.")
+        parser.add_argument("--start", help="First day, YYYY-MM-DD (use with --end).")
+        parser.add_argument("--end", help="Last day, YYYY-MM-DD (use with --start).")
+        parser.add_argument("--category", default="", help="Only export this category.")
+        parser.add_argument("--output", help="File to write (default: stdout).")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows fetched per database round trip.")
+
+    def handle(self, *args, **options):
+        params = {"range": options["range"], "start_date": options["start"], "end_date": options["end"]}
+        start_date, end_date = date_range(params, localdate(), default_preset=None)
+        if bool(options["start"]) != bool(options["end"]) or (options["start"] and not start_date):
+            raise CommandError("--start and --end must both be given as YYYY-MM-DD.")
+
+        logs = FoodLog.objects.all()
+        columns = ["user__username"] + EXPORT_COLUMNS
+        if options["user"]:
+            user = User.objects.filter(username=options["user"]).first()
+            if user is None:
+                raise CommandError(f"No user named '{options['user']}'.")
+            logs = logs.filter(user=user)
+            columns = EXPORT_COLUMNS
+        logs = filter_logs(logs, start_date, end_date, options["category"])
+
+        lines = export_lines(logs, options["format"], columns, options["chunk_size"])
+        if options["output"]:
+            with open(options["output"], "w", newline="", encoding="utf-8") as out:
+                out.writelines(lines)
+            self.stderr.write(f"Wrote {options['output']}")
+        else:
+            for line in lines:
+                self.stdout.write(line, ending="")
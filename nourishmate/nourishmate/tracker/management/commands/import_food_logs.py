@@ -0,0 +1,66 @@
+"""
+Bulk-import food logs for one user from a CSV, NDJSON or JSON file.
+"""
+import csv
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker.imports import BATCH_SIZE, IMPORT_FORMATS, format_for, import_food_logs, read_rows
+
+
+class Command(BaseCommand):
+    help = "Validate and bulk-insert food logs from a file, reporting rejected rows and throughput."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import (.csv, .ndjson/.jsonl or .json).")
+        parser.add_argument("--user", required=True, help="Username that will own the imported logs.")
+        parser.add_argument("--format", choices=IMPORT_FORMATS, help="Override the format implied by the file name.")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Rows validated and inserted per transaction.")
+        parser.add_argument("--dry-run", action="store_true", help="Validate only; insert nothing.")
+        parser.add_argument("--report", help="Write every rejected row to this CSV file.")
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options["user"]).first()
+        if user is None:
+            raise CommandError(f"No user named '{options['user']}'.")
+        import_format = options["format"] or format_for(options["path"])
+        if import_format is None:
+            raise CommandError("Cannot tell the format from the file name; pass --format.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        try:
+            with open(options["path"], encoding="utf-8-sig", newline="") as stream:
+                report = import_food_logs(
+                    read_rows(stream, import_format), user,
+                    batch_size=options["batch_size"], dry_run=options["dry_run"],
+                )
+        except OSError as e:
+            raise CommandError(str(e))
+
+        for error in report["errors"][:20]:
+            details = "; ".join(f"{field}: {message}" for field, message in error["errors"].items())
+            self.stderr.write(f"row {error['row']}: {details}")
+        if report["rejected"] > 20:
+            self.stderr.write(f"... and {report['rejected'] - 20} more rejected rows")
+
+        if options["report"]:
+            with open(options["report"], "w", newline="", encoding="utf-8") as out:
+                writer = csv.writer(out)
+                writer.writerow(["row", "field", "error"])
+                for error in report["errors"]:
+                    for field, message in error["errors"].items():
+                        writer.writerow([error["row"], field, message])
+
+        timing = f"in {report['seconds']:.2f}s ({report['rows_per_second']} rows/s)"
+        if options["dry_run"]:
+            valid = report["processed"] - report["rejected"]
+            self.stdout.write(f"Dry run: {valid} of {report['processed']} rows valid {timing}.")
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Imported {report['created']} of {report['processed']} rows "
+                f"({report['rejected']} rejected) {timing}."
+            ))
+        if report["read_error"]:
+            raise CommandError(f"Could not read {options['path']}: {report['read_error']}")
@@ -0,0 +1,65 @@
+"""
+Bulk-load a USDA FoodData Central dump into the local ingredient database.
+"""
+import csv
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker.fooddata import BATCH_SIZE, load_foods, read_csv_foods, read_json_foods
+
+FORMATS = ["csv", "json", "ndjson"]
+
+
+def _format_for(path):
+    if os.path.isdir(path):
+        return "csv"
+    name = path.lower()
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    if name.endswith(".json"):
+        return "json"
+    return None
+
+
+class Command(BaseCommand):
+    help = "Stream FoodData Central foods (CSV directory, JSON or NDJSON) into Ingredient/IngredientNutrient."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="FDC CSV download directory, or a .json/.ndjson/.jsonl file.")
+        parser.add_argument("--format", choices=FORMATS, help="Override the format implied by the path.")
+        parser.add_argument("--data-type", action="append", dest="data_types",
+                            help="Only load CSV foods of this data_type (e.g. sr_legacy_food); repeatable.")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Foods inserted per transaction.")
+        parser.add_argument("--replace", action="store_true", help="Delete previously loaded FDC foods first.")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        load_format = options["format"] or _format_for(path)
+        if load_format is None:
+            raise CommandError("Cannot tell the format from the path; pass --format.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        try:
+            if load_format == "csv":
+                report = load_foods(
+                    read_csv_foods(path, options["data_types"]),
+                    batch_size=options["batch_size"], replace=options["replace"],
+                )
+            else:
+                with open(path, encoding="utf-8-sig") as stream:
+                    report = load_foods(
+                        read_json_foods(stream, ndjson=load_format == "ndjson"),
+                        batch_size=options["batch_size"], replace=options["replace"],
+                    )
+        except OSError as e:
+            raise CommandError(str(e))
+        except (ValueError, KeyError, csv.Error) as e:
+            raise CommandError(f"Could not read {path}: {e}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Loaded {report['foods']} foods and {report['nutrients']} nutrient rows "
+            f"({report['skipped']} already loaded) in {report['seconds']:.2f}s "
+            f"({report['rows_per_second']} rows/s)."
+        ))
@@ -0,0 +1,48 @@
+"""
+Backfill or repair the DailyNutrientRollup table from FoodLog and SupplementLog.
+"""
+from datetime import datetime
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker.rollups import rebuild_rollups
+
+
+def parse_date(value):
+    """
+    Parse a YYYY-MM-DD command-line argument.
+    """
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD.")
+
+
+class Command(BaseCommand):
+    help = "Recompute daily nutrient rollups in chunks of days."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", type=parse_date, help="First day to rebuild (default: earliest log).")
+        parser.add_argument("--end", type=parse_date, help="Last day to rebuild (default: latest log).")
+        parser.add_argument("--chunk-days", type=int, default=90, help="Days rebuilt per transaction.")
+        parser.add_argument("--user", help="Only rebuild this username's rows (default: every user).")
+
+    def handle(self, *args, **options):
+        if options["chunk_days"] < 1:
+            raise CommandError("--chunk-days must be at least 1.")
+
+        user = None
+        if options["user"]:
+            user = User.objects.filter(username=options["user"]).first()
+            if user is None:
+                raise CommandError(f"No user named '{options['user']}'.")
+
+        total = 0
+        for start, end, written in rebuild_rollups(
+            options["start"], options["end"], options["chunk_days"], user=user
+        ):
+            total += written
+            self.stdout.write(f"{start} – {end}: {written} rollup rows")
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {total} rollup rows."))
@@ -0,0 +1,15 @@
+"""
+Recreate the food log full-text search index and refill it from tracker_foodlog.
+"""
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from tracker.search import install_search_index
+
+
+class Command(BaseCommand):
+    help = "Recreate the food log search index (FTS5 on SQLite, GIN on PostgreSQL) from existing rows."
+
+    def handle(self, *args, **options):
+        install_search_index(connection)
+        self.stdout.write(self.style.SUCCESS(f"Search index rebuilt ({connection.vendor})."))
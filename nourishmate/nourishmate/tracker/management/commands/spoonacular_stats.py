@@ -0,0 +1,52 @@
+"""
+Report per-endpoint call counts, latency, response cache savings and
+coalesced calls for the Spoonacular client.
+"""
+from django.core.management.base import BaseCommand
+
+from tracker.spoonacular import (
+    coalesce_stats, latency_stats, reset_coalesce_stats, reset_latency_stats,
+    reset_response_cache_stats, response_cache_stats,
+)
+
+
+def _ms(bound):
+    return "> 10000" if bound is None else f"<= {bound}"
+
+
+class Command(BaseCommand):
+    help = "Show Spoonacular call counts, errors, latency, cache hit rates and coalesced calls per endpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Zero the counters after printing them.")
+
+    def handle(self, *args, **options):
+        stats = latency_stats()
+        if not stats:
+            self.stdout.write("No Spoonacular calls recorded.")
+        for endpoint, row in stats.items():
+            self.stdout.write(
+                f"{endpoint}: {row['count']} calls, {row['errors']} errors, "
+                f"mean {row['mean_ms']} ms, p50 {_ms(row['p50_ms'])} ms, p95 {_ms(row['p95_ms'])} ms"
+            )
+
+        cached = response_cache_stats()
+        for endpoint, row in cached.items():
+            self.stdout.write(
+                f"{endpoint} cache: {row['hits']} hits, {row['misses']} misses, "
+                f"hit ratio {row['hit_ratio']:.1%}, {row['bytes_saved']:,} bytes saved"
+            )
+        if cached:
+            saved = sum(row["bytes_saved"] for row in cached.values())
+            self.stdout.write(f"Response cache saved {saved:,} bytes in total.")
+
+        for endpoint, row in coalesce_stats().items():
+            self.stdout.write(
+                f"{endpoint} coalesced: {row['coalesced']} in-process, {row['shared']} across workers"
+            )
+
+        if options["reset"]:
+            reset_latency_stats()
+            reset_response_cache_stats()
+            reset_coalesce_stats()
+            self.stdout.write("Counters reset.")
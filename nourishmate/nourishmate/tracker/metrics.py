@@ -0,0 +1,29 @@
+"""
+Counters shared by every worker.
+
+Counters live in the METRICS_CACHE alias rather than the default cache, so
+they are never culled along with cached pages, and a management command
+running in its own process reads the same totals the web workers add to.
+Increments are atomic on Redis and Memcached; on the file and database
+backends two workers incrementing the same counter at the same moment can
+lose one count.
+"""
+from django.conf import settings
+from django.core.cache import caches
+
+
+def metrics_cache():
+    return caches[settings.METRICS_CACHE]
+
+
+def incr(key, amount=1):
+    """
+    Add `amount` to a counter, creating it at zero first.
+    """
+    counters = metrics_cache()
+    # add() is a no-op when the counter exists; incr() is atomic on shared backends.
+    counters.add(key, 0, timeout=None)
+    try:
+        counters.incr(key, amount)
+    except ValueError:
+        counters.set(key, amount, timeout=None)
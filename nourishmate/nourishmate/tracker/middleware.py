@@ -0,0 +1,203 @@
+"""
+Request instrumentation middleware for NourishMate: Server-Timing headers,
+on-demand cProfile dumps, and (in development) query budget logging.
+"""
+import cProfile
+import logging
+import random
+import re
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+import requests
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection, connections
+from django.template.backends.django import Template as DjangoTemplate
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from .query_budget import budget_for, budget_report
+
+query_logger = logging.getLogger("tracker.queries")
+profile_logger = logging.getLogger("tracker.profiling")
+
+# Per-request timing totals; None outside ServerTimingMiddleware.
+_timings = ContextVar("server_timings", default=None)
+
+
+class RequestTimings:
+    """
+    Accumulated time (ms) and call counts for one request.
+    """
+    def __init__(self):
+        self.db_ms = self.template_ms = self.http_ms = 0.0
+        self.queries = self.templates = self.http_calls = 0
+        self.rendering = False
+        # Outbound calls may run on Spoonacular pool threads at the same time.
+        self.http_lock = threading.Lock()
+
+    def header(self, total_ms):
+        return ", ".join([
+            f'db;dur={self.db_ms:.1f};desc="{self.queries} queries"',
+            f'tpl;dur={self.template_ms:.1f};desc="{self.templates} templates"',
+            f'http;dur={self.http_ms:.1f};desc="{self.http_calls} outbound"',
+            f"total;dur={total_ms:.1f}",
+        ])
+
+
+def _time_query(execute, sql, params, many, context):
+    timings = _timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db_ms += (time.perf_counter() - started) * 1000
+        timings.queries += 1
+
+
+def _timed_template_render(render):
+    def wrapper(self, *args, **kwargs):
+        timings = _timings.get()
+        # Only the outermost render counts; inclusion tags render nested templates.
+        if timings is None or timings.rendering:
+            return render(self, *args, **kwargs)
+        timings.rendering = True
+        started = time.perf_counter()
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            timings.rendering = False
+            timings.template_ms += (time.perf_counter() - started) * 1000
+            timings.templates += 1
+    return wrapper
+
+
+def _timed_http_send(send):
+    def wrapper(self, *args, **kwargs):
+        timings = _timings.get()
+        if timings is None:
+            return send(self, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return send(self, *args, **kwargs)
+        finally:
+            with timings.http_lock:
+                timings.http_ms += (time.perf_counter() - started) * 1000
+                timings.http_calls += 1
+    return wrapper
+
+
+_hooks_installed = False
+
+
+def _install_hooks():
+    """
+    Wrap template rendering and requests' Session.send once per process.
+    The wrappers do nothing unless a request is being timed.
+    """
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    DjangoTemplate.render = _timed_template_render(DjangoTemplate.render)
+    requests.Session.send = _timed_http_send(requests.Session.send)
+    _hooks_installed = True
+
+
+class ServerTimingMiddleware:
+    """
+    Add a Server-Timing header splitting each request into database, template
+    and outbound HTTP time, and profile selected requests with cProfile.
+
+    A request is profiled when a staff user adds ?profile=1, or at random
+    with probability PROFILE_SAMPLE_RATE. Dumps go to PROFILE_DIR as .prof
+    files (open them with pstats or snakeviz); the file name is returned in
+    the X-Profile header.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "SERVER_TIMING", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        _install_hooks()
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        token = _timings.set(timings)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(_time_query))
+                profile_path = None
+                if self.should_profile(request):
+                    profile_path = stack.enter_context(self.profiled(request))
+                response = self.get_response(request)
+        finally:
+            _timings.reset(token)
+
+        response["Server-Timing"] = timings.header((time.perf_counter() - started) * 1000)
+        if profile_path:
+            response["X-Profile"] = profile_path.name
+        return response
+
+    def should_profile(self, request):
+        if request.GET.get("profile") == "1":
+            user = getattr(request, "user", None)
+            return bool(user and user.is_staff)
+        rate = getattr(settings, "PROFILE_SAMPLE_RATE", 0)
+        return rate > 0 and random.random() < rate
+
+    @contextmanager
+    def profiled(self, request):
+        """
+        Run the block under cProfile and dump the stats to PROFILE_DIR.
+        Yields the dump's Path, or None if profiling could not start.
+        """
+        directory = Path(settings.PROFILE_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", request.path).strip("-") or "root"
+        path = directory / f"{timezone.now():%Y%m%dT%H%M%S%f}-{request.method}-{slug}.prof"
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active in this thread.
+            yield None
+            return
+        try:
+            yield path
+        finally:
+            profiler.disable()
+            profiler.dump_stats(path)
+            profile_logger.info("Profiled %s %s -> %s", request.method, request.path, path)
+
+
+class QueryBudgetMiddleware:
+    """
+    Log requests that run more SQL queries than their URL's budget, with the
+    duplicated statements grouped. Only active when DEBUG is on.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DEBUG:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        budget = budget_for(match.url_name, request.method) if match else None
+        if budget is not None and len(captured) > budget:
+            query_logger.warning(
+                budget_report(f"{request.method} {request.path}", captured.captured_queries, budget)
+            )
+        return response
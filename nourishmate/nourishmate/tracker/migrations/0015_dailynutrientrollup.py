@@ -0,0 +1,92 @@
+# Generated by Django 5.2 on 2026-10-18 01:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+NUTRIENTS = [
+    'calories', 'protein', 'carbs', 'sugars', 'fiber', 'fat', 'saturated_fat',
+    'cholesterol', 'sodium', 'potassium', 'calcium', 'iron',
+    'vitamin_a', 'vitamin_c', 'vitamin_d', 'vitamin_b12',
+    'magnesium', 'zinc',
+]
+
+SUPPLEMENT_NUTRIENTS = {
+    "morning": {"vitamin_d": 30, "vitamin_b12": 3.0, "calcium": 1200},
+    "afternoon": {"iron": 25, "vitamin_c": 120},
+    "evening": {"fiber": 35, "magnesium": 500, "zinc": 15},
+}
+
+
+def backfill_rollups(apps, schema_editor):
+    """
+    Populate rollups for existing logs with historical models.
+    """
+    FoodLog = apps.get_model('tracker', 'FoodLog')
+    SupplementLog = apps.get_model('tracker', 'SupplementLog')
+    DailyNutrientRollup = apps.get_model('tracker', 'DailyNutrientRollup')
+
+    rows = {}
+    food = (
+        FoodLog.objects.order_by().values('date_logged')
+        .annotate(log_count=Count('id'), **{n: Sum(n) for n in NUTRIENTS})
+    )
+    for values in food:
+        day = values.pop('date_logged')
+        rows[(None, day)] = DailyNutrientRollup(user_id=None, date=day, **values)
+
+    supplements = (
+        SupplementLog.objects.order_by().values('user_id', 'date', 'time_of_day')
+        .annotate(taken=Count('id'))
+    )
+    for values in supplements:
+        key = (values['user_id'], values['date'])
+        if key not in rows:
+            rows[key] = DailyNutrientRollup(user_id=key[0], date=key[1])
+        for nutrient, amount in SUPPLEMENT_NUTRIENTS.get(values['time_of_day'], {}).items():
+            setattr(rows[key], nutrient, getattr(rows[key], nutrient) + amount * values['taken'])
+
+    DailyNutrientRollup.objects.bulk_create(rows.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0014_groceryitem_user'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyNutrientRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('log_count', models.PositiveIntegerField(default=0)),
+                ('calories', models.FloatField(default=0.0)),
+                ('protein', models.FloatField(default=0.0)),
+                ('carbs', models.FloatField(default=0.0)),
+                ('sugars', models.FloatField(default=0.0)),
+                ('fiber', models.FloatField(default=0.0)),
+                ('fat', models.FloatField(default=0.0)),
+                ('saturated_fat', models.FloatField(default=0.0)),
+                ('cholesterol', models.FloatField(default=0.0)),
+                ('sodium', models.FloatField(default=0.0)),
+                ('potassium', models.FloatField(default=0.0)),
+                ('calcium', models.FloatField(default=0.0)),
+                ('iron', models.FloatField(default=0.0)),
+                ('vitamin_a', models.FloatField(default=0.0)),
+                ('vitamin_c', models.FloatField(default=0.0)),
+                ('vitamin_d', models.FloatField(default=0.0)),
+                ('vitamin_b12', models.FloatField(default=0.0)),
+                ('magnesium', models.FloatField(default=0.0)),
+                ('zinc', models.FloatField(default=0.0)),
+                ('user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'date')},
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
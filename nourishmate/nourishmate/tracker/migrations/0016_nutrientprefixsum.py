@@ -0,0 +1,46 @@
+# Generated by Django 5.2 on 2026-10-18 01:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0015_dailynutrientrollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NutrientPrefixSum',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('log_count', models.PositiveIntegerField(default=0)),
+                ('calories', models.FloatField(default=0.0)),
+                ('protein', models.FloatField(default=0.0)),
+                ('carbs', models.FloatField(default=0.0)),
+                ('sugars', models.FloatField(default=0.0)),
+                ('fiber', models.FloatField(default=0.0)),
+                ('fat', models.FloatField(default=0.0)),
+                ('saturated_fat', models.FloatField(default=0.0)),
+                ('cholesterol', models.FloatField(default=0.0)),
+                ('sodium', models.FloatField(default=0.0)),
+                ('potassium', models.FloatField(default=0.0)),
+                ('calcium', models.FloatField(default=0.0)),
+                ('iron', models.FloatField(default=0.0)),
+                ('vitamin_a', models.FloatField(default=0.0)),
+                ('vitamin_c', models.FloatField(default=0.0)),
+                ('vitamin_d', models.FloatField(default=0.0)),
+                ('vitamin_b12', models.FloatField(default=0.0)),
+                ('magnesium', models.FloatField(default=0.0)),
+                ('zinc', models.FloatField(default=0.0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2 on 2026-10-18 01:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+TOTALS = [
+    'log_count', 'calories', 'protein', 'carbs', 'sugars', 'fiber', 'fat',
+    'saturated_fat', 'cholesterol', 'sodium', 'potassium', 'calcium', 'iron',
+    'vitamin_a', 'vitamin_c', 'vitamin_d', 'vitamin_b12', 'magnesium', 'zinc',
+]
+
+
+def assign_existing_logs(apps, schema_editor):
+    """
+    Give existing logs to the first superuser (or the first user) and move the
+    rollups of unowned logs onto that user's rows.
+    """
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    FoodLog = apps.get_model('tracker', 'FoodLog')
+    DailyNutrientRollup = apps.get_model('tracker', 'DailyNutrientRollup')
+    NutrientPrefixSum = apps.get_model('tracker', 'NutrientPrefixSum')
+
+    owner = (
+        User.objects.filter(is_superuser=True).order_by('pk').first()
+        or User.objects.order_by('pk').first()
+    )
+    if owner is None:
+        return
+
+    FoodLog.objects.filter(user__isnull=True).update(user=owner)
+    for shared in DailyNutrientRollup.objects.filter(user__isnull=True):
+        row, created = DailyNutrientRollup.objects.get_or_create(user=owner, date=shared.date)
+        for field in TOTALS:
+            setattr(row, field, getattr(row, field) + getattr(shared, field))
+        row.save()
+        shared.delete()
+    NutrientPrefixSum.objects.filter(user=owner).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0016_nutrientprefixsum'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='foodlog',
+            name='user',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(assign_existing_logs, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='foodlog',
+            index=models.Index(fields=['user', 'date_logged'], name='foodlog_user_date_idx'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2 on 2026-10-18 01:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0017_foodlog_user'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='foodlog',
+            name='foodlog_user_date_idx',
+        ),
+        migrations.AlterField(
+            model_name='groceryitem',
+            name='user',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='pantryitem',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='savedrecipe',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='foodlog',
+            index=models.Index(fields=['user', 'date_logged', 'id'], name='foodlog_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='foodlog',
+            index=models.Index(fields=['user', 'food_name', 'id'], name='foodlog_user_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='foodlog',
+            index=models.Index(fields=['user', 'calories', 'id'], name='foodlog_user_calories_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='foodlog',
+            index=models.Index(fields=['user', 'category', 'date_logged', 'id'], name='foodlog_user_cat_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='groceryitem',
+            index=models.Index(fields=['user', 'added_on'], name='grocery_user_added_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pantryitem',
+            index=models.Index(fields=['user', 'name'], name='pantry_user_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='savedrecipe',
+            index=models.Index(fields=['user', '-saved_at'], name='saved_user_saved_at_idx'),
+        ),
+    ]
@@ -0,0 +1,111 @@
+from django.db import migrations
+
+# The SQL is frozen here as it stood when this migration was written, so
+# replaying it always builds the same schema. Changes to tracker/search.py
+# need a new migration of their own.
+
+_ADD_NAME = (
+    "INSERT INTO tracker_foodlog_name (user_id, food_name, log_count, last_logged) "
+    "SELECT new.user_id, new.food_name, 1, new.date_logged WHERE new.user_id IS NOT NULL "
+    "ON CONFLICT (user_id, food_name) DO UPDATE SET "
+    "log_count = log_count + 1, last_logged = max(last_logged, excluded.last_logged);"
+)
+
+_REMOVE_NAME = (
+    "UPDATE tracker_foodlog_name SET log_count = log_count - 1, last_logged = CASE "
+    "WHEN last_logged = old.date_logged THEN (SELECT max(date_logged) FROM tracker_foodlog "
+    "WHERE user_id = old.user_id AND food_name = old.food_name) ELSE last_logged END "
+    "WHERE user_id = old.user_id AND food_name = old.food_name; "
+    "DELETE FROM tracker_foodlog_name WHERE user_id = old.user_id AND food_name = old.food_name "
+    "AND log_count <= 0;"
+)
+
+SQLITE_TRIGGERS = [
+    'tracker_foodlog_name_ai',
+    'tracker_foodlog_name_ad',
+    'tracker_foodlog_name_au',
+    'tracker_foodlog_fts_ai',
+    'tracker_foodlog_trigram_ai',
+    'tracker_foodlog_fts_ad',
+    'tracker_foodlog_trigram_ad',
+]
+
+SQLITE_INSTALL = [f"DROP TRIGGER IF EXISTS {name}" for name in SQLITE_TRIGGERS] + [
+    "CREATE TABLE IF NOT EXISTS tracker_foodlog_name ("
+    "id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, food_name TEXT NOT NULL, "
+    "log_count INTEGER NOT NULL, last_logged DATE, UNIQUE (user_id, food_name))",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tracker_foodlog_fts USING fts5("
+    "food_name, content='tracker_foodlog_name', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tracker_foodlog_trigram USING fts5("
+    "food_name, content='tracker_foodlog_name', content_rowid='id', tokenize='trigram')",
+    "DELETE FROM tracker_foodlog_name",
+    "INSERT INTO tracker_foodlog_name (user_id, food_name, log_count, last_logged) "
+    "SELECT user_id, food_name, count(*), max(date_logged) FROM tracker_foodlog "
+    "WHERE user_id IS NOT NULL GROUP BY user_id, food_name",
+    "INSERT INTO tracker_foodlog_fts(tracker_foodlog_fts) VALUES ('rebuild')",
+    "INSERT INTO tracker_foodlog_trigram(tracker_foodlog_trigram) VALUES ('rebuild')",
+    f"CREATE TRIGGER tracker_foodlog_name_ai AFTER INSERT ON tracker_foodlog "
+    f"BEGIN {_ADD_NAME} END",
+    f"CREATE TRIGGER tracker_foodlog_name_ad AFTER DELETE ON tracker_foodlog "
+    f"BEGIN {_REMOVE_NAME} END",
+    f"CREATE TRIGGER tracker_foodlog_name_au AFTER UPDATE OF user_id, food_name, date_logged "
+    f"ON tracker_foodlog BEGIN {_REMOVE_NAME} {_ADD_NAME} END",
+    "CREATE TRIGGER tracker_foodlog_fts_ai AFTER INSERT ON tracker_foodlog_name BEGIN "
+    "INSERT INTO tracker_foodlog_fts(rowid, food_name) VALUES (new.id, new.food_name); END",
+    "CREATE TRIGGER tracker_foodlog_trigram_ai AFTER INSERT ON tracker_foodlog_name BEGIN "
+    "INSERT INTO tracker_foodlog_trigram(rowid, food_name) VALUES (new.id, new.food_name); END",
+    "CREATE TRIGGER tracker_foodlog_fts_ad AFTER DELETE ON tracker_foodlog_name BEGIN "
+    "INSERT INTO tracker_foodlog_fts(tracker_foodlog_fts, rowid, food_name) "
+    "VALUES ('delete', old.id, old.food_name); END",
+    "CREATE TRIGGER tracker_foodlog_trigram_ad AFTER DELETE ON tracker_foodlog_name BEGIN "
+    "INSERT INTO tracker_foodlog_trigram(tracker_foodlog_trigram, rowid, food_name) "
+    "VALUES ('delete', old.id, old.food_name); END",
+]
+
+SQLITE_DROP = [f"DROP TRIGGER IF EXISTS {name}" for name in SQLITE_TRIGGERS] + [
+    "DROP TABLE IF EXISTS tracker_foodlog_fts",
+    "DROP TABLE IF EXISTS tracker_foodlog_trigram",
+    "DROP TABLE IF EXISTS tracker_foodlog_name",
+]
+
+POSTGRES_INSTALL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS foodlog_name_tsv_idx ON tracker_foodlog "
+    "USING gin (to_tsvector('simple', food_name))",
+    "CREATE INDEX IF NOT EXISTS foodlog_name_trgm_idx ON tracker_foodlog "
+    "USING gin (food_name gin_trgm_ops)",
+]
+
+POSTGRES_DROP = [
+    "DROP INDEX IF EXISTS foodlog_name_tsv_idx",
+    "DROP INDEX IF EXISTS foodlog_name_trgm_idx",
+]
+
+
+def _run(schema_editor, statements):
+    vendor = schema_editor.connection.vendor
+    for sql in statements.get(vendor, []):
+        schema_editor.execute(sql, params=None)
+
+
+def install(apps, schema_editor):
+    """
+    Create the FTS5 tables and triggers (SQLite) or GIN indexes (PostgreSQL).
+    """
+    _run(schema_editor, {'sqlite': SQLITE_INSTALL, 'postgresql': POSTGRES_INSTALL})
+
+
+def drop(apps, schema_editor):
+    _run(schema_editor, {'sqlite': SQLITE_DROP, 'postgresql': POSTGRES_DROP})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0018_sort_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, drop),
+    ]
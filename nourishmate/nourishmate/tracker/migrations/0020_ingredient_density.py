@@ -0,0 +1,36 @@
+# Generated by Django 5.2 on 2026-10-18 02:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0019_foodlog_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Ingredient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('spoonacular_id', models.IntegerField(blank=True, null=True, unique=True)),
+                ('name', models.CharField(max_length=200)),
+                ('unit_grams', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='IngredientNutrient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nutrient', models.CharField(choices=[('calories', 'Calories'), ('protein', 'Protein'), ('carbs', 'Carbohydrates'), ('sugars', 'Sugars'), ('fiber', 'Fiber'), ('fat', 'Fat'), ('saturated_fat', 'Saturated Fat'), ('cholesterol', 'Cholesterol'), ('sodium', 'Sodium'), ('potassium', 'Potassium'), ('calcium', 'Calcium'), ('iron', 'Iron'), ('vitamin_a', 'Vitamin A'), ('vitamin_c', 'Vitamin C'), ('vitamin_d', 'Vitamin D'), ('vitamin_b12', 'Vitamin B12'), ('magnesium', 'Magnesium'), ('zinc', 'Zinc')], max_length=20)),
+                ('per_100g', models.FloatField()),
+                ('ingredient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='nutrients', to='tracker.ingredient')),
+            ],
+            options={
+                'unique_together': {('ingredient', 'nutrient')},
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-18 02:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0020_ingredient_density'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingredient',
+            name='fdc_id',
+            field=models.IntegerField(blank=True, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='ingredientnutrient',
+            name='ingredient',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='nutrients', to='tracker.ingredient'),
+        ),
+    ]
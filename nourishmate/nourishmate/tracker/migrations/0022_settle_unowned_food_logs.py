@@ -0,0 +1,54 @@
+# Generated by Django 5.2 on 2026-10-18 03:48
+
+from django.conf import settings
+from django.db import migrations
+
+TOTALS = [
+    'log_count', 'calories', 'protein', 'carbs', 'sugars', 'fiber', 'fat',
+    'saturated_fat', 'cholesterol', 'sodium', 'potassium', 'calcium', 'iron',
+    'vitamin_a', 'vitamin_c', 'vitamin_d', 'vitamin_b12', 'magnesium', 'zinc',
+]
+
+
+def settle_unowned_logs(apps, schema_editor):
+    """
+    Give logs still without an owner (0017 found no user to give them to) to
+    the first superuser or the first user, moving their rollups along. With
+    no users at all nobody can ever see them, so they are deleted.
+    """
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    FoodLog = apps.get_model('tracker', 'FoodLog')
+    DailyNutrientRollup = apps.get_model('tracker', 'DailyNutrientRollup')
+    NutrientPrefixSum = apps.get_model('tracker', 'NutrientPrefixSum')
+
+    unowned = FoodLog.objects.filter(user__isnull=True)
+    shared_rollups = DailyNutrientRollup.objects.filter(user__isnull=True)
+    owner = (
+        User.objects.filter(is_superuser=True).order_by('pk').first()
+        or User.objects.order_by('pk').first()
+    )
+    if owner is None:
+        unowned.delete()
+        shared_rollups.delete()
+        return
+
+    unowned.update(user=owner)
+    for shared in shared_rollups:
+        row, created = DailyNutrientRollup.objects.get_or_create(user=owner, date=shared.date)
+        for field in TOTALS:
+            setattr(row, field, getattr(row, field) + getattr(shared, field))
+        row.save()
+        shared.delete()
+    NutrientPrefixSum.objects.filter(user=owner).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0021_ingredient_fdc_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(settle_unowned_logs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-18 03:48
+
+from importlib import import_module
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+search_index = import_module('tracker.migrations.0019_foodlog_search_index')
+
+
+def reinstall_search_index(apps, schema_editor):
+    """
+    SQLite rebuilds tracker_foodlog to change the user column, which drops
+    the search triggers on it; put them back.
+    """
+    search_index.install(apps, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0022_settle_unowned_food_logs'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, reinstall_search_index),
+        migrations.AlterField(
+            model_name='dailynutrientrollup',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='foodlog',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(reinstall_search_index, migrations.RunPython.noop),
+    ]
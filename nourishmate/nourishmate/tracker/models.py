@@ -1,10 +1,12 @@
 """
 Django models for application.
 """
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from django.contrib.auth.models import User
 
+from .nutrients import NUTRIENTS
+
 
 CATEGORY_CHOICES = [
     ('fruit', 'Fruit'),
@@ -29,10 +31,26 @@ QUANTITY_UNITS = [
         ('serving', 'Serving'),
     ]
 
-class FoodLog(models.Model):
+
+class NutrientAmounts(models.Model):
+    """
+    Abstract base with one float column per registered nutrient (in the
+    registry's unit), shared by FoodLog and the tables summed from it.
+    """
+    class Meta:
+        abstract = True
+
+
+for _nutrient in NUTRIENTS:
+    NutrientAmounts.add_to_class(_nutrient.field, models.FloatField(default=0.0))
+
+
+class FoodLog(NutrientAmounts):
     """
     Log entry for a single food item consumed by a user.
     """
+    # Lookups by user are served by the composite indexes below.
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
     food_name = models.CharField(max_length=100)
     
     quantity_amount = models.FloatField(null=True, blank=True)
@@ -41,34 +59,54 @@ class FoodLog(models.Model):
     category = models.CharField(max_length=20, choices=CATEGORY_CHOICES, default='other')
     date_logged = models.DateField(default=timezone.now)
 
-    calories = models.FloatField(default=0.0) # kcal
-    protein = models.FloatField(default=0.0)  # grams
-    carbs = models.FloatField(default=0.0)    # grams
-    sugars = models.FloatField(default=0.0)   # grams
-    fiber = models.FloatField(default=0.0)    # grams
-    fat = models.FloatField(default=0.0)      # grams
-    saturated_fat = models.FloatField(default=0.0)  # grams
-    cholesterol = models.FloatField(default=0.0)    # mg
-    sodium = models.FloatField(default=0.0)         # mg
-    potassium = models.FloatField(default=0.0)      # mg
-    calcium = models.FloatField(default=0.0)        # mg
-    iron = models.FloatField(default=0.0)           # mg
-    vitamin_a = models.FloatField(default=0.0)      # mcg
-    vitamin_c = models.FloatField(default=0.0)      # mg
-    vitamin_d = models.FloatField(default=0.0)      # mcg
-    vitamin_b12 = models.FloatField(default=0.0)    # mcg
-    magnesium = models.FloatField(default=0.0)      # mg
-    zinc = models.FloatField(default=0.0)           # mg
+    class Meta:
+        # One index per food log list sort, each ending in the pk tie-break
+        # so keyset pages are read in index order without a sort step.
+        indexes = [
+            models.Index(fields=['user', 'date_logged', 'id'], name='foodlog_user_date_idx'),
+            models.Index(fields=['user', 'food_name', 'id'], name='foodlog_user_name_idx'),
+            models.Index(fields=['user', 'calories', 'id'], name='foodlog_user_calories_idx'),
+            models.Index(fields=['user', 'category', 'date_logged', 'id'], name='foodlog_user_cat_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.food_name} ({self.quantity_amount} {self.quantity_unit}) on {self.date_logged}"
 
+    def save(self, *args, **kwargs):
+        """
+        Save the entry and refresh the daily rollups for its old and new
+        owner and date in the same transaction.
+        """
+        from .rollups import refresh_rollups
+
+        with transaction.atomic():
+            previous = None
+            if self.pk:
+                previous = FoodLog.objects.filter(pk=self.pk).values_list('user_id', 'date_logged').first()
+            super().save(*args, **kwargs)
+            if previous and previous[0] != self.user_id:
+                refresh_rollups(previous[0], [previous[1]])
+                previous = None
+            refresh_rollups(self.user_id, [previous and previous[1], self.date_logged])
+
+    def delete(self, *args, **kwargs):
+        """
+        Delete the entry and refresh the owner's daily rollup for its date.
+        """
+        from .rollups import refresh_rollups
+
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            refresh_rollups(self.user_id, [self.date_logged])
+        return result
+
 
 class GroceryItem(models.Model):
     """
     An item a user has added to their grocery shopping list.
     """
-    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True)
+    # Lookups by user are served by the (user, added_on) index below.
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, db_index=False)
     name = models.CharField(max_length=100)
     quantity = models.CharField(max_length=50, blank=True)
     category = models.CharField(
@@ -79,6 +117,11 @@ class GroceryItem(models.Model):
     added_on = models.DateTimeField(auto_now_add=True)
     purchased = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'added_on'], name='grocery_user_added_idx'),
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.quantity})"
 
@@ -87,7 +130,8 @@ class PantryItem(models.Model):
     A single pantry item for a user.
     Tracks unit, quantity, and when it was added.
     """
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Lookups by user are served by the (user, name) index below.
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
     name = models.CharField(max_length=100)
     quantity = models.FloatField(default=1)
     unit = models.CharField(max_length=20, choices=[
@@ -103,6 +147,11 @@ class PantryItem(models.Model):
     )
     added_on = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'name'], name='pantry_user_name_idx'),
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.quantity} {self.unit})"
     
@@ -123,12 +172,34 @@ class SupplementLog(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.time_of_day} supplement on {self.date}"
 
+    def save(self, *args, **kwargs):
+        """
+        Save the log and refresh the user's daily rollup in the same transaction.
+        """
+        from .rollups import refresh_rollups
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            refresh_rollups(self.user_id, [self.date])
+
+    def delete(self, *args, **kwargs):
+        """
+        Delete the log and refresh the user's daily rollup.
+        """
+        from .rollups import refresh_rollups
+
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            refresh_rollups(self.user_id, [self.date])
+        return result
+
 class SavedRecipe(models.Model):
     """
     A recipe saved by a user for quick access later.
     Each user can save a particular recipe only once.
     """
-    user           = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Lookups by user are served by the (user, -saved_at) index below.
+    user           = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
     spoonacular_id = models.CharField(max_length=50)
     title          = models.CharField(max_length=255)
     image_url      = models.URLField()
@@ -137,6 +208,79 @@ class SavedRecipe(models.Model):
 
     class Meta:
         unique_together = ("user", "spoonacular_id")
+        indexes = [
+            models.Index(fields=['user', '-saved_at'], name='saved_user_saved_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.title} (saved by {self.user.username})"
+
+
+class DailyNutrientRollup(NutrientAmounts):
+    """
+    Pre-summed nutrient totals for one user on one day.
+    Food totals are stored with supplement boosts already added, so a date
+    range is summarised by summing one row per day instead of every FoodLog.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    date = models.DateField()
+    log_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("user", "date")
+
+    def __str__(self):
+        return f"Rollup for user {self.user_id} on {self.date}"
+
+
+class NutrientPrefixSum(NutrientAmounts):
+    """
+    Running nutrient totals for a user from their first rollup through `date`.
+    The total for any date range is the row at its end minus the row before
+    its start. Rows are dropped from an edited date forward and rebuilt from
+    DailyNutrientRollup on the next read.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    date = models.DateField()
+    log_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("user", "date")
+
+    def __str__(self):
+        return f"Running totals for user {self.user_id} through {self.date}"
+
+
+class Ingredient(models.Model):
+    """
+    An ingredient whose nutrients are stored locally per 100 g, so any
+    quantity of it can be scaled without another upstream lookup.
+    """
+    spoonacular_id = models.IntegerField(unique=True, null=True, blank=True)
+    # USDA FoodData Central id, for foods loaded by load_food_data.
+    fdc_id = models.IntegerField(unique=True, null=True, blank=True)
+    name = models.CharField(max_length=200)
+    # Grams in one cup, piece, slice, fruit or serving of this ingredient,
+    # learned as those units are used. Mass units need no entry.
+    unit_grams = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
+
+
+class IngredientNutrient(models.Model):
+    """
+    Amount of one nutrient in 100 g of an ingredient.
+    """
+    # Lookups by ingredient are served by the unique_together index below.
+    ingredient = models.ForeignKey(Ingredient, on_delete=models.CASCADE, related_name='nutrients', db_index=False)
+    nutrient = models.CharField(max_length=20, choices=[(n.field, n.label) for n in NUTRIENTS])
+    per_100g = models.FloatField()
+
+    class Meta:
+        # Dropped and rebuilt around bulk loads (tracker.fooddata).
+        unique_together = ("ingredient", "nutrient")
 
     def __str__(self):
-        return f"{self.title} (saved by {self.user.username})"
\ No newline at end of file
+        return f"{self.nutrient} in 100 g of {self.ingredient}"
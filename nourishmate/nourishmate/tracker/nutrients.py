@@ -0,0 +1,243 @@
+"""
+Nutrient registry and a compact vector type for whole-profile arithmetic.
+
+Every list of nutrients in the app (model columns, form fields, Spoonacular
+name mapping, summary labels, daily targets and supplement boosts) is derived
+from NUTRIENTS so the 18 names live in one place.
+"""
+from array import array
+from collections import namedtuple
+from operator import add, sub
+
+
+Nutrient = namedtuple("Nutrient", ["field", "label", "unit", "spoonacular"])
+
+# FoodLog nutrient columns, in display order.
+NUTRIENTS = [
+    Nutrient("calories", "Calories", "kcal", "calories"),
+    Nutrient("protein", "Protein", "g", "protein"),
+    Nutrient("carbs", "Carbohydrates", "g", "carbohydrates"),
+    Nutrient("sugars", "Sugars", "g", "sugar"),
+    Nutrient("fiber", "Fiber", "g", "fiber"),
+    Nutrient("fat", "Fat", "g", "fat"),
+    Nutrient("saturated_fat", "Saturated Fat", "g", "saturated_fat"),
+    Nutrient("cholesterol", "Cholesterol", "mg", "cholesterol"),
+    Nutrient("sodium", "Sodium", "mg", "sodium"),
+    Nutrient("potassium", "Potassium", "mg", "potassium"),
+    Nutrient("calcium", "Calcium", "mg", "calcium"),
+    Nutrient("iron", "Iron", "mg", "iron"),
+    Nutrient("vitamin_a", "Vitamin A", "mcg", "vitamin_a"),
+    Nutrient("vitamin_c", "Vitamin C", "mg", "vitamin_c"),
+    Nutrient("vitamin_d", "Vitamin D", "mcg", "vitamin_d"),
+    Nutrient("vitamin_b12", "Vitamin B12", "mcg", "vitamin_b12"),
+    Nutrient("magnesium", "Magnesium", "mg", "magnesium"),
+    Nutrient("zinc", "Zinc", "mg", "zinc"),
+]
+
+NUTRIENT_FIELDS = [n.field for n in NUTRIENTS]
+
+# Column labels for the Nutrition Summary table.
+NUTRIENT_LABELS = {
+    n.field: n.label if n.unit == "kcal" else f"{n.label} ({n.unit})"
+    for n in NUTRIENTS
+}
+
+# MOCK - daily nutrient targets.
+DAILY_TARGETS = {
+    "calories": 2000,
+    "protein": 50,
+    "fiber": 25,
+    "vitamin_c": 75,
+    "iron": 18,
+    "vitamin_d": 20,
+    "vitamin_b12": 2.4,
+    "calcium": 1000,
+    "magnesium": 400,
+    "zinc": 11,
+}
+
+# Supplements for (home page).
+SUPPLEMENT_NUTRIENTS = {
+    "morning": {
+        "vitamin_d": 30,
+        "vitamin_b12": 3.0,
+        "calcium": 1200,
+    },
+    "afternoon": {
+        "iron": 25,
+        "vitamin_c": 120,
+    },
+    "evening": {
+        "fiber": 35,
+        "magnesium": 500,
+        "zinc": 15,
+    },
+}
+
+# Share of the target below which a nutrient is Low, and above which it is High.
+LOW_RATIO = 0.8
+HIGH_RATIO = 1.2
+
+_INDEX = {field: i for i, field in enumerate(NUTRIENT_FIELDS)}
+
+
+class NutrientVector:
+    """
+    Amounts for all registered nutrients, stored as one array of doubles.
+
+    Vectors add, subtract and scale element-wise, and read like a dict keyed
+    by nutrient field so templates and JSON views can use them directly.
+    """
+    __slots__ = ("amounts",)
+
+    def __init__(self, values=None):
+        if values is None:
+            self.amounts = array("d", bytes(8 * len(NUTRIENT_FIELDS)))
+        else:
+            self.amounts = array("d", values)
+
+    @classmethod
+    def from_mapping(cls, mapping):
+        """
+        Build a vector from a dict of field -> amount; missing fields are 0.
+        """
+        return cls(float(mapping.get(field) or 0) for field in NUTRIENT_FIELDS)
+
+    @classmethod
+    def from_object(cls, obj):
+        """
+        Build a vector from any object with nutrient attributes (FoodLog, rollups).
+        """
+        return cls(float(getattr(obj, field) or 0) for field in NUTRIENT_FIELDS)
+
+    @classmethod
+    def from_spoonacular(cls, nutrients):
+        """
+        Build a vector from a Spoonacular `nutrition.nutrients` list.
+        """
+        amounts = {
+            n["name"].lower().replace(" ", "_"): n["amount"]
+            for n in nutrients
+        }
+        return cls(float(amounts.get(n.spoonacular) or 0) for n in NUTRIENTS)
+
+    def __add__(self, other):
+        if not isinstance(other, NutrientVector):
+            return NotImplemented
+        return NutrientVector(map(add, self.amounts, other.amounts))
+
+    def __radd__(self, other):
+        # Lets sum() start from 0.
+        if other == 0:
+            return self
+        return self.__add__(other)
+
+    def __sub__(self, other):
+        if not isinstance(other, NutrientVector):
+            return NotImplemented
+        return NutrientVector(map(sub, self.amounts, other.amounts))
+
+    def __mul__(self, factor):
+        return NutrientVector(value * factor for value in self.amounts)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, divisor):
+        return self * (1.0 / divisor)
+
+    def __eq__(self, other):
+        return isinstance(other, NutrientVector) and self.amounts == other.amounts
+
+    def __getitem__(self, field):
+        return self.amounts[_INDEX[field]]
+
+    def __iter__(self):
+        return iter(NUTRIENT_FIELDS)
+
+    def __len__(self):
+        return len(self.amounts)
+
+    def __repr__(self):
+        return f"NutrientVector({self.as_dict()!r})"
+
+    def get(self, field, default=0):
+        """
+        Dict-style lookup, so the `get_item` template filter works.
+        """
+        index = _INDEX.get(field)
+        return default if index is None else self.amounts[index]
+
+    def keys(self):
+        return list(NUTRIENT_FIELDS)
+
+    def values(self):
+        return list(self.amounts)
+
+    def items(self):
+        return zip(NUTRIENT_FIELDS, self.amounts)
+
+    def as_dict(self):
+        return dict(self.items())
+
+    def rounded(self, digits=6):
+        """
+        Copy with every amount rounded, e.g. to drop float noise after subtraction.
+        """
+        return NutrientVector(round(value, digits) for value in self.amounts)
+
+    def ratios(self, targets):
+        """
+        Element-wise share of `targets` met; 0 where a nutrient has no target.
+        """
+        return NutrientVector(
+            value / target if target else 0.0
+            for value, target in zip(self.amounts, targets.amounts)
+        )
+
+    def mean(self, fields):
+        """
+        Average amount over `fields`; 0 when `fields` is empty.
+        """
+        if not fields:
+            return 0.0
+        return sum(self.amounts[_INDEX[field]] for field in fields) / len(fields)
+
+    def badges(self, targets):
+        """
+        Low/Good/High for every nutrient that has a target.
+        """
+        badges = {}
+        for field, value, target in zip(NUTRIENT_FIELDS, self.amounts, targets.amounts):
+            if not target:
+                continue
+            if value < target * LOW_RATIO:
+                badges[field] = "Low"
+            elif value > target * HIGH_RATIO:
+                badges[field] = "High"
+            else:
+                badges[field] = "Good"
+        return badges
+
+    def lows(self, targets):
+        """
+        Fields below LOW_RATIO of their target, in registry order.
+        """
+        return [field for field, badge in self.badges(targets).items() if badge == "Low"]
+
+
+TARGETS = NutrientVector.from_mapping(DAILY_TARGETS)
+
+SUPPLEMENT_VECTORS = {
+    slot: NutrientVector.from_mapping(boosts)
+    for slot, boosts in SUPPLEMENT_NUTRIENTS.items()
+}
+
+
+def supplement_boost(counts):
+    """
+    Nutrients added by supplements, given slot -> number of times taken.
+    """
+    return sum(
+        (SUPPLEMENT_VECTORS[slot] * taken for slot, taken in counts.items() if slot in SUPPLEMENT_VECTORS),
+        NutrientVector(),
+    )
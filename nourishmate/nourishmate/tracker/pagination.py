@@ -0,0 +1,107 @@
+"""
+Keyset (seek) pagination for ordered querysets.
+
+Instead of OFFSET/LIMIT plus COUNT(*), each page is fetched with a WHERE
+clause that continues from the last row of the previous page, so page 1 and
+page 10,000 cost the same. Rows are ordered by one field and then by pk in
+the same direction, which makes the position of every row unique even when
+many rows share a calories value or food name.
+
+Cursors are opaque URL-safe strings; a cursor made for a different ordering,
+or one that cannot be decoded, falls back to the first page.
+"""
+import base64
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+
+def encode_cursor(ordering, row, direction):
+    """
+    Opaque cursor positioned at `row` for `ordering`, read forward ("n")
+    or backward ("p").
+    """
+    field = ordering.lstrip('-')
+    payload = {
+        'o': ordering,
+        'v': row.serializable_value(field),
+        'k': row.pk,
+        'd': direction,
+    }
+    raw = json.dumps(payload, default=str, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, ordering, model):
+    """
+    (value, pk, direction) from a cursor, or None if it is invalid or was
+    made for another ordering.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload['o'] != ordering or payload['d'] not in ('n', 'p'):
+            return None
+        field = model._meta.get_field(ordering.lstrip('-'))
+        value = field.to_python(payload['v'])
+        pk = model._meta.pk.to_python(payload['k'])
+    except (ValueError, TypeError, KeyError, AttributeError, FieldDoesNotExist, ValidationError):
+        return None
+    return value, pk, payload['d']
+
+
+class KeysetPage:
+    """
+    One page of rows plus cursors for the pages on either side.
+    Iterates like a Paginator page so templates can loop over it.
+    """
+
+    def __init__(self, object_list, ordering, has_next, has_previous):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.next_cursor = (
+            encode_cursor(ordering, object_list[-1], 'n') if has_next and object_list else None
+        )
+        self.previous_cursor = (
+            encode_cursor(ordering, object_list[0], 'p') if has_previous and object_list else None
+        )
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def keyset_page(queryset, ordering, cursor=None, per_page=10):
+    """
+    Fetch the page of `queryset` after (or before) `cursor` in `ordering`,
+    a single field name optionally prefixed with "-".
+    """
+    field = ordering.lstrip('-')
+    descending = ordering.startswith('-')
+    forward_order = [ordering, '-pk' if descending else 'pk']
+    backward_order = [field if descending else f'-{field}', 'pk' if descending else '-pk']
+
+    position = decode_cursor(cursor, ordering, queryset.model) if cursor else None
+    if position is None:
+        rows = list(queryset.order_by(*forward_order)[:per_page + 1])
+        return KeysetPage(rows[:per_page], ordering, len(rows) > per_page, False)
+
+    value, pk, direction = position
+    after = 'lt' if descending else 'gt'
+    before = 'gt' if descending else 'lt'
+
+    if direction == 'n':
+        seek = Q(**{f'{field}__{after}': value}) | Q(**{field: value, f'pk__{after}': pk})
+        rows = list(queryset.filter(seek).order_by(*forward_order)[:per_page + 1])
+        return KeysetPage(rows[:per_page], ordering, len(rows) > per_page, True)
+
+    seek = Q(**{f'{field}__{before}': value}) | Q(**{field: value, f'pk__{before}': pk})
+    rows = list(queryset.filter(seek).order_by(*backward_order)[:per_page + 1])
+    if not rows:
+        return keyset_page(queryset, ordering, None, per_page)
+    page = rows[:per_page][::-1]
+    return KeysetPage(page, ordering, True, len(rows) > per_page)
@@ -0,0 +1,104 @@
+"""
+Per-URL SQL query budgets.
+
+Each named URL in tracker/urls.py declares the most queries one request may
+run in QUERY_BUDGETS, as one number for every method or per HTTP method
+where reads and writes differ. Tests use QueryBudgetAssertions to fail when a view
+goes over, and QueryBudgetMiddleware logs over-budget requests during
+development. Both report the offending queries grouped by statement shape,
+so N+1 patterns show up as one line with a high count. Long shapes keep
+only their start and end, so a bulk INSERT does not flood the log.
+"""
+import re
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+# Longest statement shape shown whole in a report; longer ones are cut in
+# the middle, keeping the start (what is queried) and end (the WHERE clause).
+REPORT_SQL_LENGTH = 300
+
+
+def budgets():
+    """
+    The QUERY_BUDGETS mapping from tracker/urls.py (url name -> max queries,
+    or {method: max queries}).
+    """
+    from .urls import QUERY_BUDGETS
+    return QUERY_BUDGETS
+
+
+def budget_for(url_name, method="GET"):
+    """
+    Query budget for a request to a URL name, or None when it has none.
+    """
+    budget = budgets().get(url_name)
+    if isinstance(budget, dict):
+        return budget.get(method.upper())
+    return budget
+
+
+def statement_shape(sql):
+    """
+    SQL with literals replaced by ? so repeats of one query group together.
+    """
+    return _IN_LISTS.sub("(?, ...)", _LITERALS.sub("?", sql))
+
+
+def group_queries(queries):
+    """
+    (count, statement shape) pairs for captured queries, most repeated first.
+    """
+    counts = Counter(statement_shape(query["sql"]) for query in queries)
+    return [(count, sql) for sql, count in counts.most_common()]
+
+
+def budget_report(label, queries, budget):
+    """
+    Multi-line description of an over-budget request.
+    """
+    lines = [f"{label} ran {len(queries)} queries (budget {budget})."]
+    for count, sql in group_queries(queries):
+        marker = f"{count}x" if count > 1 else "  "
+        if len(sql) > REPORT_SQL_LENGTH:
+            half = REPORT_SQL_LENGTH // 2
+            sql = f"{sql[:half]} ... {sql[-half:]}"
+        lines.append(f"  {marker:>4} {sql}")
+    return "\n".join(lines)
+
+
+class QueryBudgetAssertions:
+    """
+    TestCase mixin: `with self.assertQueryBudget("food_log_list"): ...` fails
+    when the block runs more queries than the URL's budget for `method`.
+    """
+
+    @contextmanager
+    def assertQueryBudget(self, url_name, method="GET"):
+        budget = budget_for(url_name, method)
+        if budget is None:
+            self.fail(f"URL '{url_name}' has no {method.upper()} entry in QUERY_BUDGETS.")
+        with CaptureQueriesContext(connection) as captured:
+            yield captured
+        if len(captured) > budget:
+            self.fail(budget_report(f"{method.upper()} {url_name}", captured.captured_queries, budget))
+
+
+def query_budget(url_name, method="GET"):
+    """
+    Decorator form of assertQueryBudget for test methods whose whole body is
+    the request(s) under test.
+    """
+    def decorator(test_method):
+        def wrapper(self, *args, **kwargs):
+            with self.assertQueryBudget(url_name, method):
+                return test_method(self, *args, **kwargs)
+        wrapper.__name__ = test_method.__name__
+        wrapper.__doc__ = test_method.__doc__
+        return wrapper
+    return decorator
@@ -0,0 +1,91 @@
+"""
+Batched recipe information lookups.
+
+Spoonacular's recipes/informationBulk returns many recipes in one call.
+recipe_information() takes every id a request needs, splits them into
+chunks of SPOONACULAR_BULK_SIZE ids, fetches the chunks concurrently and
+hands back a dict keyed by id. A chunk that fails or misses the deadline,
+or an id the response leaves out, is simply absent from the dict, so
+callers decide what a missing recipe means.
+
+The title, image and source URL of every recipe fetched are cached for
+RECIPE_SUMMARY_CACHE_TIMEOUT, so saving a recipe that was just shown on
+the recipe page needs no further call.
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import spoonacular
+
+logger = logging.getLogger("tracker.spoonacular")
+
+
+def summary_key(recipe_id):
+    """
+    Cache key for one recipe's summary.
+    """
+    return f"recipe_summary:{recipe_id}"
+
+
+def summarize(info):
+    """
+    The fields a SavedRecipe keeps, from an /information payload.
+    """
+    return {
+        "title": info.get("title", "Unknown"),
+        "image": info.get("image"),
+        "source_url": info.get("sourceUrl"),
+    }
+
+
+def chunked(ids, size):
+    """
+    Consecutive slices of at most `size` ids.
+    """
+    return [ids[start:start + size] for start in range(0, len(ids), size)]
+
+
+def recipe_information(ids, include_nutrition=False, deadline=None):
+    """
+    Information for each recipe id, fetched in chunked bulk calls.
+
+    Returns:
+        dict: {id: information payload} for the ids that came back.
+    """
+    ids = list(dict.fromkeys(int(recipe_id) for recipe_id in ids))
+    if not ids:
+        return {}
+    extra = {"includeNutrition": "true"} if include_nutrition else {}
+    chunks = chunked(ids, settings.SPOONACULAR_BULK_SIZE)
+    responses = spoonacular.get_many(
+        [("/recipes/informationBulk", {"ids": ",".join(map(str, chunk)), **extra}) for chunk in chunks],
+        deadline=deadline,
+    )
+
+    found = {}
+    for data in responses:
+        for info in data if isinstance(data, list) else []:
+            if info.get("id") in ids:
+                found[info["id"]] = info
+    if len(found) < len(ids):
+        logger.warning("Recipe information missing for %d of %d ids", len(ids) - len(found), len(ids))
+
+    cache.set_many(
+        {summary_key(recipe_id): summarize(info) for recipe_id, info in found.items()},
+        settings.RECIPE_SUMMARY_CACHE_TIMEOUT,
+    )
+    return found
+
+
+def recipe_summary(recipe_id):
+    """
+    Title, image and source URL of a recipe, from the cache when it was
+    fetched recently. None when Spoonacular cannot provide it.
+    """
+    summary = cache.get(summary_key(recipe_id))
+    if summary is None:
+        info = recipe_information([recipe_id]).get(int(recipe_id))
+        summary = summarize(info) if info is not None else None
+    return summary
@@ -0,0 +1,397 @@
+"""
+Maintenance and reads for the per-user daily nutrient rollup table and the
+prefix-sum index built on top of it.
+
+FoodLog and SupplementLog refresh the (user, date) rows they touch from their
+own save() and delete(), inside the same transaction as the write. Bulk
+queryset operations bypass those hooks; `manage.py rebuild_rollups` repairs
+the table after them.
+
+Each refresh also drops the owner's NutrientPrefixSum rows from the
+refreshed date forward. The next range read extends the index again from the
+last surviving row, so a range total is two lookups and a subtraction no
+matter how many days it spans. Extending and dropping a user's prefix rows
+both lock the user's row first, so an extension computed from rollups that a
+concurrent write is replacing cannot be stored after that write's drop.
+
+`nutrient_series` groups rollup rows into day, week, month, quarter or year
+buckets in the database for the charting API, choosing a coarser bucket
+when the range would otherwise produce more than MAX_SERIES_POINTS points.
+"""
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import Count, DateField, F, Max, Min, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth, TruncQuarter, TruncWeek, TruncYear
+
+from .aggregates import nutrient_sums, food_totals, supplement_counts
+from .models import FoodLog, SupplementLog, DailyNutrientRollup, NutrientPrefixSum
+from .nutrients import NUTRIENT_FIELDS, NutrientVector, supplement_boost
+
+# Columns shared by DailyNutrientRollup and NutrientPrefixSum.
+TOTAL_FIELDS = ['log_count'] + NUTRIENT_FIELDS
+
+
+def _as_date(value):
+    """
+    Normalise a DateField value (a datetime when a `timezone.now` default
+    was used) to the local date that will be stored.
+    """
+    return DailyNutrientRollup._meta.get_field('date').to_python(value)
+
+
+def _add_boosts(row, counts):
+    """
+    Add supplement boosts for the taken slots in `counts` onto a rollup row.
+    """
+    for nutrient, amount in (NutrientVector.from_object(row) + supplement_boost(counts)).items():
+        setattr(row, nutrient, amount)
+
+
+def _sources(user_id, day):
+    """
+    FoodLog and SupplementLog querysets that feed the (user, day) rollup.
+    """
+    return (
+        FoodLog.objects.filter(user_id=user_id, date_logged=day),
+        SupplementLog.objects.filter(user_id=user_id, date=day),
+    )
+
+
+def refresh_rollups(user_id, dates):
+    """
+    Recompute the rollup rows for `user_id` on each of `dates` from source rows.
+    Days with nothing logged lose their row.
+    """
+    days = {_as_date(value) for value in dates if value is not None}
+    with transaction.atomic():
+        for day in days:
+            logs, supplements = _sources(user_id, day)
+            food = logs.order_by().aggregate(log_count=Count('id'), **nutrient_sums())
+            counts = supplement_counts(supplements)
+
+            if not food['log_count'] and not counts:
+                DailyNutrientRollup.objects.filter(user_id=user_id, date=day).delete()
+                continue
+
+            row = DailyNutrientRollup(user_id=user_id, date=day, **food)
+            _add_boosts(row, counts)
+            DailyNutrientRollup.objects.update_or_create(
+                user_id=user_id,
+                date=day,
+                defaults={field: getattr(row, field) for field in TOTAL_FIELDS},
+            )
+
+        if days:
+            invalidate_prefix(user_id, min(days))
+
+
+def rollups_for(user, start_date, end_date):
+    """
+    The user's rollup rows between start_date and end_date inclusive.
+    """
+    return DailyNutrientRollup.objects.filter(user=user, date__range=[start_date, end_date])
+
+
+def rollup_totals(user, start_date, end_date):
+    """
+    Nutrient totals (supplements included) for a date range, summed from
+    one rollup row per day in a single aggregate query.
+    """
+    return food_totals(rollups_for(user, start_date, end_date))
+
+
+def rebuild_rollups(start_date=None, end_date=None, chunk_days=90, user=None):
+    """
+    Recompute the rollup table from FoodLog and SupplementLog, for every user
+    or only `user`. Works through the range in windows of `chunk_days`, each
+    replaced in its own transaction.
+
+    Yields:
+        tuple: (window_start, window_end, rows_written) after each window.
+    """
+    all_logs = FoodLog.objects.all()
+    all_supplements = SupplementLog.objects.all()
+    all_rollups = DailyNutrientRollup.objects.all()
+    all_prefixes = NutrientPrefixSum.objects.all()
+    if user is not None:
+        all_logs = all_logs.filter(user=user)
+        all_supplements = all_supplements.filter(user=user)
+        all_rollups = all_rollups.filter(user=user)
+        all_prefixes = all_prefixes.filter(user=user)
+
+    if start_date is None or end_date is None:
+        food = all_logs.aggregate(first=Min('date_logged'), last=Max('date_logged'))
+        supplements = all_supplements.aggregate(first=Min('date'), last=Max('date'))
+        firsts = [d for d in (food['first'], supplements['first']) if d]
+        lasts = [d for d in (food['last'], supplements['last']) if d]
+        if not firsts:
+            return
+        start_date = start_date or min(firsts)
+        end_date = end_date or max(lasts)
+
+    window_start = start_date
+    while window_start <= end_date:
+        window_end = min(window_start + timedelta(days=chunk_days - 1), end_date)
+        window = [window_start, window_end]
+
+        with transaction.atomic():
+            if user is not None:
+                lock_prefix([user.pk])
+            else:
+                lock_prefix(User.objects.filter(
+                    Q(pk__in=all_logs.filter(date_logged__range=window).values('user_id'))
+                    | Q(pk__in=all_supplements.filter(date__range=window).values('user_id'))
+                    | Q(pk__in=all_rollups.filter(date__range=window).values('user_id'))
+                    | Q(pk__in=all_prefixes.filter(date__gte=window_start).values('user_id'))
+                ).values('pk'))
+            rows = {}
+            food = (
+                all_logs.filter(date_logged__range=window)
+                .order_by()
+                .values('user_id', 'date_logged')
+                .annotate(log_count=Count('id'), **nutrient_sums())
+            )
+            for values in food:
+                key = (values.pop('user_id'), values.pop('date_logged'))
+                rows[key] = DailyNutrientRollup(user_id=key[0], date=key[1], **values)
+
+            supplements = (
+                all_supplements.filter(date__range=window)
+                .order_by()
+                .values('user_id', 'date', 'time_of_day')
+                .annotate(taken=Count('id'))
+            )
+            for values in supplements:
+                key = (values['user_id'], values['date'])
+                if key not in rows:
+                    rows[key] = DailyNutrientRollup(user_id=key[0], date=key[1])
+                _add_boosts(rows[key], {values['time_of_day']: values['taken']})
+
+            all_rollups.filter(date__range=window).delete()
+            DailyNutrientRollup.objects.bulk_create(rows.values(), batch_size=500)
+            all_prefixes.filter(date__gte=window_start).delete()
+
+        yield window_start, window_end, len(rows)
+        window_start = window_end + timedelta(days=1)
+
+
+# ─── Prefix-sum range index ────────────────────────────────────────────────────
+def lock_prefix(user_ids):
+    """
+    Lock the users' rows for the rest of the current transaction, in id
+    order. Taken before a user's prefix rows are written or dropped. Skipped
+    on SQLite, whose database-wide write lock serialises them instead.
+    """
+    if not connection.features.has_select_for_update:
+        return
+    list(
+        User.objects.select_for_update()
+        .filter(pk__in=user_ids)
+        .order_by('pk')
+        .values_list('pk', flat=True)
+    )
+
+
+def invalidate_prefix(user_id, day):
+    """
+    Drop the user's prefix rows from `day` forward. Call it inside the
+    transaction that changed the rollups, so the lock is held to commit.
+    """
+    if user_id is not None:
+        lock_prefix([user_id])
+        NutrientPrefixSum.objects.filter(user_id=user_id, date__gte=_as_date(day)).delete()
+
+
+def extend_prefix(user, batch_size=500):
+    """
+    Append running totals for every rollup day after the user's last prefix row.
+    Returns the number of prefix rows written.
+
+    An index that is already complete costs one query and no lock. Otherwise
+    the user's row is locked and the pending days are read under the lock.
+    """
+    last_day = NutrientPrefixSum.objects.filter(user=user).order_by('-date').values('date')[:1]
+    pending = DailyNutrientRollup.objects.filter(
+        user=user, date__gt=Coalesce(Subquery(last_day), Value(date.min), output_field=DateField()),
+    )
+    if not pending.exists():
+        return 0
+    with transaction.atomic(savepoint=False):
+        lock_prefix([user.pk])
+        return _write_prefix(user, batch_size)
+
+
+def _write_prefix(user, batch_size):
+    last = (
+        NutrientPrefixSum.objects.filter(user=user)
+        .order_by('-date')
+        .values('date', *TOTAL_FIELDS)
+        .first()
+    )
+    pending = DailyNutrientRollup.objects.filter(user=user)
+    if last:
+        pending = pending.filter(date__gt=last.pop('date'))
+    last = last or {field: 0 for field in TOTAL_FIELDS}
+    running, log_count = NutrientVector.from_mapping(last), last['log_count']
+
+    days = (
+        pending.order_by('date')
+        .values('date')
+        .annotate(log_count_sum=Sum('log_count'), **nutrient_sums())
+    )
+    written, batch = 0, []
+    for values in days.iterator(chunk_size=batch_size):
+        log_count += values['log_count_sum']
+        running = running + NutrientVector.from_mapping(values)
+        batch.append(NutrientPrefixSum(
+            user=user, date=values['date'], log_count=log_count, **running.as_dict()
+        ))
+        if len(batch) >= batch_size:
+            NutrientPrefixSum.objects.bulk_create(batch, ignore_conflicts=True)
+            written, batch = written + len(batch), []
+    if batch:
+        NutrientPrefixSum.objects.bulk_create(batch, ignore_conflicts=True)
+        written += len(batch)
+    return written
+
+
+def prefix_through(user, day):
+    """
+    Running totals for `user` through `day` (the last prefix row on or before it).
+    """
+    row = (
+        NutrientPrefixSum.objects.filter(user=user, date__lte=day)
+        .order_by('-date')
+        .values(*TOTAL_FIELDS)
+        .first()
+    )
+    return row or {field: 0 for field in TOTAL_FIELDS}
+
+
+def range_totals(user, start_date, end_date):
+    """
+    Nutrient totals (supplements included) for any date range from the
+    prefix-sum index: the running total at end_date minus the one before
+    start_date. Cost does not grow with the length of the range. A range
+    that ends before it starts is empty.
+    """
+    if start_date > end_date:
+        return NutrientVector()
+    extend_prefix(user)
+    upper = NutrientVector.from_mapping(prefix_through(user, end_date))
+    lower = NutrientVector.from_mapping(prefix_through(user, start_date - timedelta(days=1)))
+    return (upper - lower).rounded()
+
+
+# ─── Bucketed time series ──────────────────────────────────────────────────────
+# Bucket name -> (database truncation, length in months), finest first.
+# Day and week buckets have a fixed length in days instead.
+SERIES_BUCKETS = {
+    'day': (None, None),
+    'week': (TruncWeek, None),
+    'month': (TruncMonth, 1),
+    'quarter': (TruncQuarter, 3),
+    'year': (TruncYear, 12),
+}
+
+# Upper bound on points per series, whatever the range length.
+MAX_SERIES_POINTS = 120
+
+
+def _month_index(day):
+    return day.year * 12 + day.month - 1
+
+
+def bucket_start(day, bucket):
+    """
+    First day of the bucket containing `day`, matching the database Trunc*.
+    """
+    months = SERIES_BUCKETS[bucket][1]
+    if bucket == 'week':
+        return day - timedelta(days=day.weekday())
+    if months is None:
+        return day
+    index = _month_index(day) // months * months
+    return day.replace(year=index // 12, month=index % 12 + 1, day=1)
+
+
+def bucket_starts(start_date, end_date, bucket):
+    """
+    Start date of every bucket overlapping start_date..end_date, in order.
+    """
+    months = SERIES_BUCKETS[bucket][1]
+    current = bucket_start(start_date, bucket)
+    starts = []
+    while current <= end_date:
+        starts.append(current)
+        if months is None:
+            current += timedelta(days=7 if bucket == 'week' else 1)
+        else:
+            index = _month_index(current) + months
+            current = current.replace(year=index // 12, month=index % 12 + 1)
+    return starts
+
+
+def bucket_count(start_date, end_date, bucket):
+    """
+    Number of buckets between start_date and end_date, without listing them.
+    """
+    months = SERIES_BUCKETS[bucket][1]
+    first, last = bucket_start(start_date, bucket), bucket_start(end_date, bucket)
+    if months is None:
+        return (last - first).days // (7 if bucket == 'week' else 1) + 1
+    return (_month_index(last) - _month_index(first)) // months + 1
+
+
+def choose_bucket(start_date, end_date, bucket='day', max_points=MAX_SERIES_POINTS):
+    """
+    `bucket`, or the first coarser bucket that keeps the series within
+    `max_points` points. Year buckets are used when nothing else fits.
+    """
+    names = list(SERIES_BUCKETS)
+    for name in names[names.index(bucket):]:
+        if bucket_count(start_date, end_date, name) <= max_points:
+            return name
+    return names[-1]
+
+
+def nutrient_series(user, start_date, end_date, bucket='day', fields=None,
+                    max_points=MAX_SERIES_POINTS):
+    """
+    Per-bucket nutrient totals (supplements included) for a date range,
+    grouped by the database in one query.
+
+    Values are packed as parallel arrays: `labels[i]` is the first day of
+    bucket i and `series[field][i]` its total. Buckets with nothing logged
+    are included with zeros so the arrays line up with a continuous axis.
+
+    Returns:
+        dict: bucket, labels, log_count and series keyed by nutrient field.
+    """
+    fields = list(fields or NUTRIENT_FIELDS)
+    bucket = choose_bucket(start_date, end_date, bucket, max_points)
+    trunc = SERIES_BUCKETS[bucket][0]
+
+    rows = (
+        rollups_for(user, start_date, end_date)
+        .order_by()
+        .annotate(period=trunc('date') if trunc else F('date'))
+        .values('period')
+        .annotate(logs=Sum('log_count'), **nutrient_sums(fields))
+    )
+    by_period = {_as_date(row.pop('period')): row for row in rows}
+
+    labels = bucket_starts(start_date, end_date, bucket)
+    empty = {'logs': 0, **{field: 0.0 for field in fields}}
+    buckets = [by_period.get(label, empty) for label in labels]
+    return {
+        'bucket': bucket,
+        'labels': [label.isoformat() for label in labels],
+        'log_count': [row['logs'] for row in buckets],
+        'series': {
+            field: [round(row[field], 2) for row in buckets]
+            for field in fields
+        },
+    }
@@ -0,0 +1,290 @@
+"""
+Full-text search over the foods a user has logged.
+
+People log the same foods over and over, so search runs over each user's
+distinct food names rather than over every FoodLog row. Each match carries
+how many times the food was logged and when it was last logged.
+
+SQLite keeps the distinct names in tracker_foodlog_name (user_id, food_name,
+log_count, last_logged), maintained by triggers on tracker_foodlog for every
+insert, update and delete, including bulk_create and queryset updates. Two
+FTS5 tables index those names as external content: one word-tokenized for
+prefix matches ("pea but" -> "Peanut butter") and one trigram-tokenized for
+fuzzy matches ("aple" -> "Apple").
+
+PostgreSQL uses GIN indexes on to_tsvector('simple', food_name) and on
+food_name with pg_trgm, and groups the matching rows by name.
+
+Word/prefix matches are ranked by relevance. Only when there are none does
+the search fall back to fuzzy matches, ranked by similarity and limited to
+names sharing at least FUZZY_MIN_SHARE of the query's trigrams. The most
+recently logged food comes first among equals.
+
+Django rebuilds a table on SQLite for most ALTER TABLE changes, which drops
+its triggers; run `manage.py rebuild_search_index` after such a migration.
+
+Migration 0019 keeps a frozen copy of this SQL. Any change to the tables,
+triggers or indexes here needs a new migration that installs it.
+"""
+import re
+from collections import namedtuple
+
+from django.db import connection
+from django.db.models import Count, Max
+
+from .models import FoodLog
+
+SEARCH_LIMIT = 50
+
+# Share of the query's trigrams a fuzzy match must contain on SQLite.
+# PostgreSQL applies pg_trgm's similarity threshold instead.
+FUZZY_MIN_SHARE = 0.5
+
+NAME_TABLE = 'tracker_foodlog_name'
+FTS_TABLE = 'tracker_foodlog_fts'
+TRIGRAM_TABLE = 'tracker_foodlog_trigram'
+
+FoodMatch = namedtuple('FoodMatch', ['food_name', 'log_count', 'last_logged', 'rank'])
+
+_WORDS = re.compile(r'\w+')
+
+_FTS_TABLES = {
+    FTS_TABLE: "tokenize='unicode61 remove_diacritics 2', prefix='2 3'",
+    TRIGRAM_TABLE: "tokenize='trigram'",
+}
+
+# Count one more log of NEW.food_name for NEW.user_id.
+_ADD_NAME = (
+    f"INSERT INTO {NAME_TABLE} (user_id, food_name, log_count, last_logged) "
+    f"SELECT new.user_id, new.food_name, 1, new.date_logged WHERE new.user_id IS NOT NULL "
+    f"ON CONFLICT (user_id, food_name) DO UPDATE SET "
+    f"log_count = log_count + 1, last_logged = max(last_logged, excluded.last_logged);"
+)
+
+# Count one less log of OLD.food_name; the last date is only looked up again
+# when the removed log was the latest one.
+_REMOVE_NAME = (
+    f"UPDATE {NAME_TABLE} SET log_count = log_count - 1, last_logged = CASE "
+    f"WHEN last_logged = old.date_logged THEN (SELECT max(date_logged) FROM tracker_foodlog "
+    f"WHERE user_id = old.user_id AND food_name = old.food_name) ELSE last_logged END "
+    f"WHERE user_id = old.user_id AND food_name = old.food_name; "
+    f"DELETE FROM {NAME_TABLE} WHERE user_id = old.user_id AND food_name = old.food_name "
+    f"AND log_count <= 0;"
+)
+
+_SQLITE_TRIGGERS = {
+    'tracker_foodlog_name_ai': f"AFTER INSERT ON tracker_foodlog BEGIN {_ADD_NAME} END",
+    'tracker_foodlog_name_ad': f"AFTER DELETE ON tracker_foodlog BEGIN {_REMOVE_NAME} END",
+    'tracker_foodlog_name_au': (
+        f"AFTER UPDATE OF user_id, food_name, date_logged ON tracker_foodlog "
+        f"BEGIN {_REMOVE_NAME} {_ADD_NAME} END"
+    ),
+    **{
+        f'{table}_ai': (
+            f"AFTER INSERT ON {NAME_TABLE} BEGIN "
+            f"INSERT INTO {table}(rowid, food_name) VALUES (new.id, new.food_name); END"
+        )
+        for table in _FTS_TABLES
+    },
+    **{
+        f'{table}_ad': (
+            f"AFTER DELETE ON {NAME_TABLE} BEGIN "
+            f"INSERT INTO {table}({table}, rowid, food_name) VALUES ('delete', old.id, old.food_name); END"
+        )
+        for table in _FTS_TABLES
+    },
+}
+
+_POSTGRES_INDEXES = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS foodlog_name_tsv_idx ON tracker_foodlog "
+    "USING gin (to_tsvector('simple', food_name))",
+    "CREATE INDEX IF NOT EXISTS foodlog_name_trgm_idx ON tracker_foodlog "
+    "USING gin (food_name gin_trgm_ops)",
+]
+
+
+def _sqlite_install():
+    """
+    Statements that (re)create the name table, FTS tables and triggers, and
+    refill them from tracker_foodlog.
+    """
+    drop_triggers = [f"DROP TRIGGER IF EXISTS {name}" for name in _SQLITE_TRIGGERS]
+    tables = [
+        f"CREATE TABLE IF NOT EXISTS {NAME_TABLE} ("
+        f"id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, food_name TEXT NOT NULL, "
+        f"log_count INTEGER NOT NULL, last_logged DATE, UNIQUE (user_id, food_name))",
+    ] + [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5("
+        f"food_name, content='{NAME_TABLE}', content_rowid='id', {options})"
+        for table, options in _FTS_TABLES.items()
+    ]
+    refill = [
+        f"DELETE FROM {NAME_TABLE}",
+        f"INSERT INTO {NAME_TABLE} (user_id, food_name, log_count, last_logged) "
+        f"SELECT user_id, food_name, count(*), max(date_logged) FROM tracker_foodlog "
+        f"WHERE user_id IS NOT NULL GROUP BY user_id, food_name",
+    ] + [f"INSERT INTO {table}({table}) VALUES ('rebuild')" for table in _FTS_TABLES]
+    create_triggers = [f"CREATE TRIGGER {name} {body}" for name, body in _SQLITE_TRIGGERS.items()]
+    return drop_triggers + tables + refill + create_triggers
+
+
+def install_search_index(conn=connection):
+    """
+    Create (or repair) the search index for the connection's database and
+    fill it from the existing rows. Safe to run repeatedly.
+    """
+    if conn.vendor == 'sqlite':
+        statements = _sqlite_install()
+    elif conn.vendor == 'postgresql':
+        statements = _POSTGRES_INDEXES
+    else:
+        return
+    with conn.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def drop_search_index(conn=connection):
+    """
+    Remove the search tables, triggers and indexes.
+    """
+    if conn.vendor == 'sqlite':
+        statements = [f"DROP TRIGGER IF EXISTS {name}" for name in _SQLITE_TRIGGERS] + [
+            f"DROP TABLE IF EXISTS {table}" for table in [*_FTS_TABLES, NAME_TABLE]
+        ]
+    elif conn.vendor == 'postgresql':
+        statements = [
+            "DROP INDEX IF EXISTS foodlog_name_tsv_idx",
+            "DROP INDEX IF EXISTS foodlog_name_trgm_idx",
+        ]
+    else:
+        return
+    with conn.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def search_terms(query):
+    """
+    Lower-cased words of a search query.
+    """
+    return _WORDS.findall(query.lower())
+
+
+def trigrams(words):
+    """
+    Distinct three-character windows of the words, in first-seen order.
+    Words shorter than three characters contribute none.
+    """
+    seen = {}
+    for word in words:
+        for i in range(len(word) - 2):
+            seen.setdefault(word[i:i + 3], None)
+    return list(seen)
+
+
+def prefix_expression(words):
+    """
+    FTS5 query matching names that contain a word starting with each term.
+    """
+    return ' AND '.join(f'"{word}"*' for word in words)
+
+
+def fuzzy_expression(words):
+    """
+    FTS5 trigram query matching names that share any trigram with the terms;
+    bm25 ranks names sharing more trigrams higher.
+    """
+    return ' OR '.join(f'"{gram}"' for gram in trigrams(words))
+
+
+def trigram_share(words, name):
+    """
+    Share of the query's trigrams that also occur in `name`.
+    """
+    grams = trigrams(words)
+    if not grams:
+        return 0.0
+    text = name.lower()
+    return sum(gram in text for gram in grams) / len(grams)
+
+
+def _as_date(value):
+    # Raw SQLite rows return dates as ISO strings.
+    if isinstance(value, str):
+        return FoodLog._meta.get_field('date_logged').to_python(value)
+    return value
+
+
+def _fetch(sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [FoodMatch(name, count, _as_date(last), rank) for name, count, last, rank in cursor.fetchall()]
+
+
+def _sqlite_match(table, expression, user, limit):
+    return _fetch(
+        f"SELECT n.food_name, n.log_count, n.last_logged, bm25({table}) AS rank "
+        f"FROM {table} JOIN {NAME_TABLE} n ON n.id = {table}.rowid "
+        f"WHERE {table} MATCH %s AND n.user_id = %s "
+        f"ORDER BY rank, n.last_logged DESC LIMIT %s",
+        [expression, user.pk, limit],
+    )
+
+
+def _search_sqlite(user, words, limit):
+    matches = _sqlite_match(FTS_TABLE, prefix_expression(words), user, limit)
+    if matches or not trigrams(words):
+        return matches
+    fuzzy = _sqlite_match(TRIGRAM_TABLE, fuzzy_expression(words), user, limit)
+    return [match for match in fuzzy if trigram_share(words, match.food_name) >= FUZZY_MIN_SHARE]
+
+
+def _search_postgresql(user, words, limit):
+    tsquery = ' & '.join(f'{word}:*' for word in words)
+    matches = _fetch(
+        "SELECT food_name, count(*), max(date_logged), "
+        "max(ts_rank(to_tsvector('simple', food_name), to_tsquery('simple', %s))) AS rank "
+        "FROM tracker_foodlog "
+        "WHERE user_id = %s AND to_tsvector('simple', food_name) @@ to_tsquery('simple', %s) "
+        "GROUP BY food_name ORDER BY rank DESC, max(date_logged) DESC LIMIT %s",
+        [tsquery, user.pk, tsquery, limit],
+    )
+    if matches:
+        return matches
+    query = ' '.join(words)
+    return _fetch(
+        "SELECT food_name, count(*), max(date_logged), similarity(food_name, %s) AS rank "
+        "FROM tracker_foodlog "
+        "WHERE user_id = %s AND food_name %% %s "
+        "GROUP BY food_name ORDER BY rank DESC, max(date_logged) DESC LIMIT %s",
+        [query, user.pk, query, limit],
+    )
+
+
+def _search_fallback(user, words, limit):
+    logs = FoodLog.objects.filter(user=user)
+    for word in words:
+        logs = logs.filter(food_name__icontains=word)
+    rows = (
+        logs.values('food_name')
+        .annotate(log_count=Count('pk'), last_logged=Max('date_logged'))
+        .order_by('-last_logged')[:limit]
+    )
+    return [FoodMatch(row['food_name'], row['log_count'], row['last_logged'], 0.0) for row in rows]
+
+
+def search_foods(user, query, limit=SEARCH_LIMIT):
+    """
+    The foods `user` has logged whose names match `query`, best match first,
+    as FoodMatch(food_name, log_count, last_logged, rank).
+    """
+    words = search_terms(query)
+    if not words:
+        return []
+    if connection.vendor == 'sqlite':
+        return _search_sqlite(user, words, limit)
+    if connection.vendor == 'postgresql':
+        return _search_postgresql(user, words, limit)
+    return _search_fallback(user, words, limit)
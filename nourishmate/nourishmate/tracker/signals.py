@@ -0,0 +1,47 @@
+"""
+Signal receivers that keep cached per-user data in step with writes.
+
+Cached entries are dropped once the writing transaction commits, not when
+the row is saved: a request that reads before the commit would otherwise
+cache the old data again, and keep it until the entry expires.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .autocomplete import note_use
+from .dashboard import invalidate_snapshot
+from .facets import invalidate_facets
+from .models import FoodLog, PantryItem, SupplementLog
+
+
+@receiver([post_save, post_delete], sender=FoodLog)
+@receiver([post_save, post_delete], sender=SupplementLog)
+def invalidate_dashboard(sender, instance, **kwargs):
+    """
+    Drop the owner's cached home snapshot after any log is written or removed.
+    The old date of an edited log is not known here, so today's snapshot is
+    always dropped.
+    """
+    user_id = instance.user_id
+    transaction.on_commit(lambda: invalidate_snapshot(user_id))
+
+
+@receiver([post_save, post_delete], sender=FoodLog)
+def invalidate_log_facets(sender, instance, **kwargs):
+    """
+    Drop the owner's cached food log facet counts after any log is written or removed.
+    """
+    user_id = instance.user_id
+    transaction.on_commit(lambda: invalidate_facets(user_id))
+
+
+@receiver(post_save, sender=FoodLog)
+@receiver(post_save, sender=PantryItem)
+def count_autocomplete_use(sender, instance, created, **kwargs):
+    """
+    Make a newly logged or stocked name a little more popular in this
+    process's autocomplete index.
+    """
+    if created:
+        note_use(instance.food_name if sender is FoodLog else instance.name)
@@ -0,0 +1,420 @@
+"""
+Shared HTTP client for the Spoonacular API.
+
+Every call goes through one module-level requests.Session, so connections
+are kept alive and pooled instead of paying a TCP/TLS handshake per call.
+Each GET has connect/read timeouts (SPOONACULAR_TIMEOUT) and is retried with
+exponential backoff on connection errors, timeouts and 429/5xx responses
+(SPOONACULAR_RETRIES, SPOONACULAR_BACKOFF), honouring Retry-After.
+
+Latency is recorded per endpoint (paths with ids folded to "{id}") as a
+count, an error count, total milliseconds and a fixed-bucket histogram in
+the shared metrics cache (tracker.metrics), so every worker adds to the
+same numbers; see
+`manage.py spoonacular_stats`.
+
+Successful responses are kept in a response cache shared by all workers
+(the SPOONACULAR_CACHE alias, an LRU file cache by default) for as long as
+SPOONACULAR_CACHE_TTLS allows for their endpoint; endpoints without a TTL
+are never cached. The key is the endpoint path plus the sorted query
+parameters, without the API key, so every user asking the same question
+shares one entry. Hits, misses and the response bytes served from the
+cache are counted per endpoint.
+
+Identical GETs (same response key) made at the same time share one
+upstream call: the first caller fetches, and the rest of the process waits
+for it and gets copies of its result. With SPOONACULAR_COALESCE_LOCK_TTL set,
+a short-lived lock in the response cache extends this to cacheable
+endpoints across workers: callers that find another worker's lock poll the
+response cache for its result instead of fetching too. Both kinds of
+coalesced call are counted per endpoint.
+
+get_many() fans several GETs out over a bounded thread pool shared by the
+process (SPOONACULAR_POOL_SIZE workers, one per pooled connection) and
+gives up on calls still running when the caller's deadline passes.
+"""
+import contextvars
+import copy
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlencode
+
+import requests
+from django.conf import settings
+from django.core.cache import caches
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .metrics import incr, metrics_cache
+
+logger = logging.getLogger("tracker.spoonacular")
+
+BASE_URL = "https://api.spoonacular.com"
+
+# Cache key of the set of endpoints that have recorded calls.
+ENDPOINTS_KEY = "spoonacular:endpoints"
+
+# Upper bounds (ms) of the latency histogram buckets; the last catches the rest.
+LATENCY_BUCKETS = [50, 100, 250, 500, 1000, 2500, 5000, 10000, None]
+
+_IDS = re.compile(r"/\d+(?=/|$)")
+
+
+def build_session():
+    """
+    A Session with a keep-alive pool and retries for idempotent requests.
+    """
+    retry = Retry(
+        total=settings.SPOONACULAR_RETRIES,
+        backoff_factor=settings.SPOONACULAR_BACKOFF,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET", "HEAD"],
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=settings.SPOONACULAR_POOL_SIZE,
+        max_retries=retry,
+    )
+    http = requests.Session()
+    http.mount("https://", adapter)
+    http.mount("http://", adapter)
+    return http
+
+
+session = build_session()
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def executor():
+    """
+    The process-wide thread pool for concurrent calls, created on first use.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.SPOONACULAR_POOL_SIZE, thread_name_prefix="spoonacular",
+            )
+        return _executor
+
+
+def endpoint_for(path):
+    """
+    Metrics label for an API path: "/recipes/716429/information" ->
+    "recipes/{id}/information".
+    """
+    return _IDS.sub("/{id}", "/" + path.strip("/")).lstrip("/")
+
+
+def _key(endpoint, name):
+    return f"spoonacular:{endpoint}:{name}"
+
+
+def _register(endpoint):
+    counters = metrics_cache()
+    known = counters.get(ENDPOINTS_KEY, set())
+    if endpoint not in known:
+        counters.set(ENDPOINTS_KEY, known | {endpoint}, timeout=None)
+
+
+def record_latency(endpoint, elapsed_ms, failed):
+    """
+    Add one call to the endpoint's counters and latency histogram.
+    """
+    incr(_key(endpoint, "count"))
+    incr(_key(endpoint, "total_ms"), round(elapsed_ms))
+    if failed:
+        incr(_key(endpoint, "errors"))
+    for bound in LATENCY_BUCKETS:
+        if bound is None or elapsed_ms <= bound:
+            incr(_key(endpoint, f"le_{bound or 'inf'}"))
+            break
+    _register(endpoint)
+
+
+def _normalize(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value).strip()
+
+
+def response_key(path, params=None):
+    """
+    Response cache key for a GET: the path plus its non-empty query
+    parameters in sorted order, never the API key.
+    """
+    query = urlencode(sorted(
+        (name, _normalize(value)) for name, value in (params or {}).items()
+        if name != "apiKey" and value not in (None, "")
+    ))
+    digest = hashlib.sha256(f"{path.strip('/')}?{query}".encode()).hexdigest()
+    return f"spoonacular:response:{digest}"
+
+
+def response_cache():
+    return caches[settings.SPOONACULAR_CACHE]
+
+
+def cached_response(endpoint, key):
+    """
+    The cached JSON for a response key, or None on a miss. Counts the hit
+    or miss and the bytes a hit saved.
+    """
+    body = response_cache().get(key)
+    _register(endpoint)
+    if body is None:
+        incr(_key(endpoint, "cache_misses"))
+        return None
+    incr(_key(endpoint, "cache_hits"))
+    incr(_key(endpoint, "bytes_saved"), len(body))
+    return json.loads(body)
+
+
+def store_response(endpoint, key, data):
+    """
+    Cache a response body for its endpoint's TTL.
+    """
+    response_cache().set(key, json.dumps(data, separators=(",", ":")), settings.SPOONACULAR_CACHE_TTLS[endpoint])
+
+
+class _Flight:
+    """
+    An upstream GET in progress, which identical calls wait on.
+    """
+    __slots__ = ("done", "result", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.waiters = 0
+
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def get(path, params=None):
+    """
+    GET an API path (e.g. "/recipes/complexSearch") with the API key added.
+
+    Returns:
+        The decoded JSON body of a 200 response, or None when the request
+        failed, timed out after retries, or returned another status.
+    """
+    endpoint = endpoint_for(path)
+    cacheable = endpoint in settings.SPOONACULAR_CACHE_TTLS
+    key = response_key(path, params)
+    if cacheable:
+        data = cached_response(endpoint, key)
+        if data is not None:
+            return data
+
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+        else:
+            flight.waiters += 1
+    if not leader:
+        incr(_key(endpoint, "coalesced"))
+        _register(endpoint)
+        flight.done.wait()
+        return copy.deepcopy(flight.result)
+
+    data = None
+    try:
+        if cacheable and settings.SPOONACULAR_COALESCE_LOCK_TTL:
+            data = _fetch_once_shared(endpoint, key, path, params)
+        else:
+            data = _fetch(endpoint, key, path, params, cacheable)
+    finally:
+        with _flights_lock:
+            del _flights[key]
+        # Callers may modify what they get back, so waiters copy a snapshot
+        # the leader never touches.
+        if flight.waiters:
+            flight.result = copy.deepcopy(data)
+        flight.done.set()
+    return data
+
+
+def _fetch_once_shared(endpoint, key, path, params):
+    # Fetch under a cross-worker lock, or wait for the worker holding it.
+    lock_key = f"{key}:lock"
+    lock_ttl = settings.SPOONACULAR_COALESCE_LOCK_TTL
+    locks = response_cache()
+    if locks.add(lock_key, 1, lock_ttl):
+        try:
+            return _fetch(endpoint, key, path, params, cacheable=True)
+        finally:
+            locks.delete(lock_key)
+
+    # Another worker is fetching; its result lands in the response cache.
+    # Fetch here as well if it fails or its lock expires first.
+    give_up = time.monotonic() + lock_ttl
+    while True:
+        body = locks.get(key)
+        if body is not None:
+            incr(_key(endpoint, "coalesced_shared"))
+            _register(endpoint)
+            return json.loads(body)
+        if locks.get(lock_key) is None or time.monotonic() >= give_up:
+            return _fetch(endpoint, key, path, params, cacheable=True)
+        time.sleep(settings.SPOONACULAR_COALESCE_POLL)
+
+
+def _fetch(endpoint, key, path, params, cacheable):
+    # One upstream GET, timed, and cached when its endpoint allows.
+    query = {**(params or {}), "apiKey": settings.SPOONACULAR_API_KEY}
+    started = time.perf_counter()
+    data = None
+    try:
+        response = session.get(
+            f"{BASE_URL}/{path.lstrip('/')}", params=query, timeout=settings.SPOONACULAR_TIMEOUT,
+        )
+        if response.status_code == 200:
+            data = response.json()
+        else:
+            logger.warning("Spoonacular %s returned %s", endpoint, response.status_code)
+    except (requests.RequestException, ValueError) as e:
+        logger.warning("Spoonacular %s failed: %s", endpoint, e)
+    record_latency(endpoint, (time.perf_counter() - started) * 1000, data is None)
+    if cacheable and data is not None:
+        store_response(endpoint, key, data)
+    return data
+
+
+def _percentile(histogram, count, pct):
+    # Upper bound of the bucket holding the pct-th call; None when it is the open bucket.
+    target = pct / 100 * count
+    seen = 0
+    for bound, calls in histogram:
+        seen += calls
+        if seen >= target:
+            return bound
+    return None
+
+
+def latency_stats():
+    """
+    Per-endpoint calls, errors, mean latency and histogram-estimated p50/p95
+    (bucket upper bounds, in ms), sorted by endpoint.
+    """
+    counters = metrics_cache()
+    stats = {}
+    for endpoint in sorted(counters.get(ENDPOINTS_KEY, set())):
+        count = counters.get(_key(endpoint, "count"), 0)
+        if not count:
+            continue
+        histogram = [
+            (bound, counters.get(_key(endpoint, f"le_{bound or 'inf'}"), 0))
+            for bound in LATENCY_BUCKETS
+        ]
+        stats[endpoint] = {
+            "count": count,
+            "errors": counters.get(_key(endpoint, "errors"), 0),
+            "mean_ms": round(counters.get(_key(endpoint, "total_ms"), 0) / count, 1),
+            "p50_ms": _percentile(histogram, count, 50),
+            "p95_ms": _percentile(histogram, count, 95),
+            "histogram": {f"le_{bound or 'inf'}": calls for bound, calls in histogram},
+        }
+    return stats
+
+
+def reset_latency_stats():
+    counters = metrics_cache()
+    endpoints = counters.get(ENDPOINTS_KEY, set())
+    names = ["count", "errors", "total_ms"] + [f"le_{bound or 'inf'}" for bound in LATENCY_BUCKETS]
+    counters.delete_many([_key(endpoint, name) for endpoint in endpoints for name in names])
+
+
+def response_cache_stats():
+    """
+    Per-endpoint response cache hits, misses, hit ratio and bytes served
+    from the cache, sorted by endpoint.
+    """
+    counters = metrics_cache()
+    stats = {}
+    for endpoint in sorted(counters.get(ENDPOINTS_KEY, set())):
+        hits = counters.get(_key(endpoint, "cache_hits"), 0)
+        misses = counters.get(_key(endpoint, "cache_misses"), 0)
+        if not hits + misses:
+            continue
+        stats[endpoint] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / (hits + misses),
+            "bytes_saved": counters.get(_key(endpoint, "bytes_saved"), 0),
+        }
+    return stats
+
+
+def reset_response_cache_stats():
+    counters = metrics_cache()
+    endpoints = counters.get(ENDPOINTS_KEY, set())
+    names = ["cache_hits", "cache_misses", "bytes_saved"]
+    counters.delete_many([_key(endpoint, name) for endpoint in endpoints for name in names])
+
+
+def coalesce_stats():
+    """
+    Per-endpoint calls served by another caller's upstream request: in
+    this process ("coalesced") or another worker's ("shared"), sorted by
+    endpoint.
+    """
+    counters = metrics_cache()
+    stats = {}
+    for endpoint in sorted(counters.get(ENDPOINTS_KEY, set())):
+        coalesced = counters.get(_key(endpoint, "coalesced"), 0)
+        shared = counters.get(_key(endpoint, "coalesced_shared"), 0)
+        if coalesced or shared:
+            stats[endpoint] = {"coalesced": coalesced, "shared": shared}
+    return stats
+
+
+def reset_coalesce_stats():
+    counters = metrics_cache()
+    endpoints = counters.get(ENDPOINTS_KEY, set())
+    names = ["coalesced", "coalesced_shared"]
+    counters.delete_many([_key(endpoint, name) for endpoint in endpoints for name in names])
+
+
+def get_many(calls, deadline=None):
+    """
+    Run several GETs concurrently.
+
+    Args:
+        calls: (path, params) pairs.
+        deadline: seconds to wait for all of them; None waits for every call.
+
+    Returns:
+        One result per call, in order: the JSON body, or None when the call
+        failed or had not finished by the deadline. Late calls are cancelled
+        if they have not started; running ones finish in the background,
+        bounded by SPOONACULAR_TIMEOUT.
+    """
+    # Each call runs in a copy of the caller's context so Server-Timing
+    # still attributes its time to the request.
+    futures = [
+        executor().submit(contextvars.copy_context().run, get, path, params)
+        for path, params in calls
+    ]
+    done, late = wait(futures, timeout=deadline)
+    for future in late:
+        future.cancel()
+    if late:
+        logger.warning("Dropped %d of %d Spoonacular calls after %ss deadline", len(late), len(futures), deadline)
+    return [
+        future.result() if future in done and future.exception() is None else None
+        for future in futures
+    ]
@@ -0,0 +1,38 @@
+/**
+ * This file loads a food log's edit form into the shared Edit modal
+ * when the modal opens, instead of rendering one form per row.
+ */
+
+document.addEventListener("DOMContentLoaded", () => {
+    const modal = document.getElementById("editModal");
+    if (!modal) return;
+
+    const form = modal.querySelector("form");
+    const body = modal.querySelector(".modal-body");
+    const submit = modal.querySelector('button[type="submit"]');
+
+    modal.addEventListener("show.bs.modal", event => {
+        const trigger = event.relatedTarget;
+        if (!trigger) return;
+
+        form.action = trigger.dataset.action;
+        submit.disabled = true;
+        body.textContent = "Loading…";
+
+        fetch(trigger.dataset.formUrl, {
+            headers: { "X-Requested-With": "XMLHttpRequest" }
+        })
+        .then(res => {
+            if (!res.ok) throw new Error("Network response was not OK");
+            return res.text();
+        })
+        .then(html => {
+            body.innerHTML = html;
+            submit.disabled = false;
+        })
+        .catch(err => {
+            console.error(err);
+            body.textContent = "Could not load this entry. Please try again.";
+        });
+    });
+});
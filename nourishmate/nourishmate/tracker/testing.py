@@ -0,0 +1,123 @@
+"""
+Helpers for driving NourishMate views without the network or real data: a
+canned Spoonacular stand-in for the shared client's `session.get`
+(tracker.spoonacular), used by the benchmark commands and tests, and a
+sandbox those commands seed their synthetic data in.
+"""
+import json
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.test import override_settings
+from django.test.utils import setup_databases, teardown_databases
+
+from .nutrients import DAILY_TARGETS
+
+
+@contextmanager
+def sandbox():
+    """
+    Run the block against a throwaway test database, created and dropped the
+    way the test runner does it, with every cache alias replaced by a private
+    in-memory one. Neither the configured database nor shared caches are touched.
+    """
+    caches = {
+        alias: {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": f"sandbox-{alias}"}
+        for alias in settings.CACHES
+    }
+    databases = setup_databases(verbosity=0, interactive=False, aliases={DEFAULT_DB_ALIAS})
+    try:
+        with override_settings(CACHES=caches):
+            yield
+    finally:
+        teardown_databases(databases, verbosity=0)
+
+
+class FakeResponse:
+    """
+    The parts of requests.Response the views use.
+    """
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+
+    @property
+    def text(self):
+        return json.dumps(self.payload)
+
+    def json(self):
+        return self.payload
+
+
+# Grams in one of each unit for every stub ingredient.
+STUB_UNIT_GRAMS = {"g": 1, "oz": 28.349523125, "cup": 240, "piece": 120, "slice": 30, "fruit": 150, "serving": 100}
+
+
+def _recipe(recipe_id):
+    return {
+        "id": recipe_id,
+        "title": f"Stub Recipe {recipe_id}",
+        "image": f"https://spoonacular.com/recipeImages/{recipe_id}-312x231.jpg",
+        "usedIngredientCount": recipe_id % 4,
+        "missedIngredientCount": recipe_id % 3,
+        "missedIngredients": [{"name": "basil", "amount": 1, "unit": "cup"}],
+    }
+
+
+def _nutrients(seed, scale=1):
+    # A third to a full day's target of each targeted nutrient, varied by seed.
+    share = (1 / 3 + (seed % 5) / 6) * scale
+    return [
+        {"name": name.replace("_", " ").title(), "amount": round(target * share, 2), "unit": ""}
+        for name, target in DAILY_TARGETS.items()
+    ]
+
+
+def _information(recipe_id):
+    return {
+        **_recipe(recipe_id),
+        "sourceUrl": f"https://example.com/recipes/{recipe_id}",
+        "diets": ["vegetarian"] if recipe_id % 2 else [],
+        "nutrition": {"nutrients": _nutrients(recipe_id)},
+    }
+
+
+def fake_spoonacular_get(url, params=None, **kwargs):
+    """
+    Answer a Spoonacular GET with plausible canned JSON, based on the URL path.
+    Unknown endpoints get a 404.
+    """
+    params = params or {}
+    path = urlparse(url).path
+    number = int(params.get("number") or 6)
+
+    if path.endswith("/recipes/complexSearch"):
+        return FakeResponse({"results": [_recipe(1000 + i) for i in range(number)]})
+    if path.endswith("/recipes/findByIngredients"):
+        return FakeResponse([_recipe(2000 + i) for i in range(number)])
+    if path.endswith("/recipes/informationBulk"):
+        ids = [int(i) for i in str(params.get("ids", "")).split(",") if i]
+        return FakeResponse([_information(recipe_id) for recipe_id in ids])
+    if path.startswith("/recipes/") and path.endswith("/information"):
+        return FakeResponse(_information(int(path.split("/")[2])))
+    if path.endswith("/food/ingredients/autocomplete"):
+        query = params.get("query", "")
+        return FakeResponse([{"name": f"{query} {n}", "id": 9000 + n} for n in range(number)])
+    if path.startswith("/food/ingredients/") and path.endswith("/information"):
+        ingredient_id = int(path.split("/")[3])
+        # Nutrients scale with the weight asked for, per 100 g as the base.
+        grams = float(params.get("amount") or 1) * STUB_UNIT_GRAMS.get(params.get("unit"), 100)
+        return FakeResponse({
+            "id": ingredient_id,
+            "name": f"ingredient {ingredient_id}",
+            "amount": params.get("amount"),
+            "unit": params.get("unit"),
+            "nutrition": {
+                "nutrients": _nutrients(ingredient_id, grams / 100),
+                "weightPerServing": {"amount": round(grams, 2), "unit": "g"},
+            },
+        })
+    return FakeResponse({"status": "failure", "message": "Not found"}, status_code=404)
+
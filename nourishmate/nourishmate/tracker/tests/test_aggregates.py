@@ -0,0 +1,99 @@
+"""
+Tests for the shared nutrient aggregation service, checking totals,
+supplement boosts, averages, and that memory stays flat as rows grow.
+"""
+
+import tracemalloc
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils.timezone import localdate
+from tracker.aggregates import nutrient_totals, daily_averages
+from tracker.models import FoodLog, SupplementLog
+
+
+def make_logs(user, count, day):
+    """
+    Bulk-insert `count` FoodLog rows for `user` on `day`, each with 10 kcal and 1 g protein.
+    """
+    FoodLog.objects.bulk_create(
+        FoodLog(user=user, food_name=f"Item {i}", date_logged=day, calories=10, protein=1)
+        for i in range(count)
+    )
+
+
+def peak_memory(func):
+    """
+    Run `func` and return the peak number of bytes allocated while it ran.
+    """
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class NutrientTotalsTests(TestCase):
+    """
+    TestCase for nutrient_totals and daily_averages.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user("agg", password="pass")
+        self.today = localdate()
+
+    def test_totals_and_supplement_boosts(self):
+        """
+        Food totals are summed and each taken supplement slot adds its boosts.
+        """
+        make_logs(self.user, 3, self.today)
+        SupplementLog.objects.create(user=self.user, date=self.today, time_of_day="morning")
+        SupplementLog.objects.create(
+            user=self.user, date=self.today - timedelta(days=1), time_of_day="morning"
+        )
+
+        totals = nutrient_totals(
+            FoodLog.objects.all(),
+            SupplementLog.objects.filter(user=self.user),
+        )
+        self.assertEqual(totals["calories"], 30)
+        self.assertEqual(totals["protein"], 3)
+        self.assertEqual(totals["vitamin_d"], 60)
+        self.assertEqual(totals["zinc"], 0)
+
+    def test_empty_range_is_zero(self):
+        """
+        An empty queryset yields zero for every nutrient, not None.
+        """
+        totals = nutrient_totals(FoodLog.objects.none())
+        self.assertTrue(all(value == 0 for value in totals.values()))
+
+    def test_daily_averages(self):
+        """
+        Averages divide by the inclusive number of days in the range.
+        """
+        make_logs(self.user, 4, self.today)
+        totals = nutrient_totals(FoodLog.objects.all())
+        averages = daily_averages(totals, self.today - timedelta(days=1), self.today)
+        self.assertEqual(averages["calories"], 20)
+
+    def test_totals_use_a_single_query(self):
+        """
+        Food totals and supplement boosts take one query each.
+        """
+        make_logs(self.user, 50, self.today)
+        with self.assertNumQueries(2):
+            nutrient_totals(FoodLog.objects.all(), SupplementLog.objects.all())
+
+    def test_memory_is_flat_as_rows_grow(self):
+        """
+        Summing 40x more rows should not need meaningfully more memory.
+        """
+        make_logs(self.user, 100, self.today)
+        small = peak_memory(lambda: nutrient_totals(FoodLog.objects.all()))
+
+        make_logs(self.user, 3900, self.today)
+        large = peak_memory(lambda: nutrient_totals(FoodLog.objects.all()))
+
+        self.assertLess(large, small * 1.5 + 16 * 1024)
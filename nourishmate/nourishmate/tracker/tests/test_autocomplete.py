@@ -0,0 +1,147 @@
+"""
+Tests for the in-process ingredient autocomplete index.
+"""
+
+from unittest.mock import patch
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from tracker.autocomplete import PrefixIndex, build_index, get_index, reset_index, suggest
+from tracker.models import FoodLog, Ingredient, PantryItem
+from tracker.testing import FakeResponse, fake_spoonacular_get
+from .test_views import create_and_login_user
+
+
+class PrefixIndexTests(TestCase):
+    """
+    Tests for prefix lookup and popularity ranking.
+    """
+
+    def test_prefix_match_is_case_insensitive(self):
+        index = PrefixIndex()
+        for name in ["Tomato", "tomato paste", "Tofu", "Apple"]:
+            index.add(name)
+        self.assertEqual([s.name for s in index.search("TOM")], ["Tomato", "tomato paste"])
+        self.assertEqual(index.search("x"), [])
+        self.assertEqual(index.search("  "), [])
+
+    def test_ranked_by_popularity_then_length(self):
+        index = PrefixIndex()
+        index.add("Banana bread", popularity=5)
+        index.add("Banana", popularity=2)
+        index.add("Banana chips", popularity=2)
+        index.add("banana", popularity=1)
+        self.assertEqual([s.name for s in index.search("ban", 2)], ["Banana bread", "Banana"])
+        self.assertEqual(index.search("banana")[1].popularity, 3)
+        self.assertEqual(len(index), 3)
+
+    def test_upstream_id_fills_known_name(self):
+        index = PrefixIndex()
+        index.add("Spinach", popularity=4)
+        index.add("spinach", ingredient_id=10011457)
+        self.assertEqual(index.search("spin")[0].as_json(), {"name": "Spinach", "id": 10011457})
+
+    def test_add_many_matches_add(self):
+        triples = [("Pear", None, 2), ("pea", 11304, 1), ("PEAR", 9252, 3), ("Peach", None, 1), ("", None, 1)]
+        one_by_one, bulk = PrefixIndex(), PrefixIndex()
+        for triple in triples:
+            one_by_one.add(*triple)
+        bulk.add_many(triples)
+        self.assertEqual(
+            [s.as_json() for s in bulk.search("pe")], [s.as_json() for s in one_by_one.search("pe")],
+        )
+        self.assertEqual(bulk.search("pear")[0].popularity, 5)
+        bulk.add("Peanut")
+        self.assertEqual([s.name for s in bulk.search("pean")], ["Peanut"])
+
+
+class BuildIndexTests(TestCase):
+    """
+    Only names shared by enough users are indexed from the database.
+    """
+
+    def setUp(self):
+        cache.clear()
+        reset_index()
+        self.alice = User.objects.create_user("alice", password="pass")
+        self.bob = User.objects.create_user("bob", password="pass")
+
+    def test_names_need_several_users(self):
+        for user in (self.alice, self.bob):
+            FoodLog.objects.create(user=user, food_name="Oatmeal")
+            PantryItem.objects.create(user=user, name="oatmeal")
+        FoodLog.objects.create(user=self.alice, food_name="Oat bars from Grandma")
+
+        with override_settings(AUTOCOMPLETE_MIN_USERS=2):
+            matches = build_index().search("oat")
+        self.assertEqual([(s.name, s.popularity) for s in matches], [("Oatmeal", 4)])
+
+        with override_settings(AUTOCOMPLETE_MIN_USERS=1):
+            self.assertEqual(len(build_index().search("oat")), 2)
+
+    def test_new_logs_bump_existing_names(self):
+        for user in (self.alice, self.bob):
+            FoodLog.objects.create(user=user, food_name="Rice")
+        self.assertEqual(get_index().search("ri")[0].popularity, 2)
+        FoodLog.objects.create(user=self.alice, food_name="rice")
+        self.assertEqual(get_index().search("ri")[0].popularity, 3)
+
+
+class SuggestTests(TestCase):
+    """
+    Tests for serving suggestions locally and topping up from Spoonacular.
+    """
+
+    def setUp(self):
+        cache.clear()
+        reset_index()
+        self.client, self.user = create_and_login_user(self)
+
+    @patch("tracker.spoonacular.session.get", side_effect=fake_spoonacular_get)
+    def test_upstream_only_when_too_few_local(self, mock_get):
+        first = suggest("tom", limit=3)
+        self.assertEqual(first, [{"name": f"tom {n}", "id": 9000 + n} for n in range(3)])
+        self.assertEqual(mock_get.call_count, 1)
+
+        # The upstream names are now indexed, so the same prefix stays local.
+        self.assertEqual(suggest("tom", limit=3), first)
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch("tracker.spoonacular.session.get", side_effect=fake_spoonacular_get)
+    def test_upstream_names_shared_through_cache(self, mock_get):
+        suggest("pea", limit=2)
+        reset_index()
+        self.assertEqual([s.name for s in get_index().search("pea")], ["pea 0", "pea 1"])
+
+    @override_settings(AUTOCOMPLETE_MIN_USERS=1)
+    @patch("tracker.spoonacular.session.get", side_effect=fake_spoonacular_get)
+    def test_local_matches_come_first(self, mock_get):
+        FoodLog.objects.create(user=self.user, food_name="Tomato soup")
+        reset_index()
+        names = [s["name"] for s in suggest("tom", limit=3)]
+        self.assertEqual(names, ["Tomato soup", "tom 0", "tom 1"])
+
+    @override_settings(AUTOCOMPLETE_MIN_USERS=1)
+    @patch("tracker.spoonacular.session.get", side_effect=fake_spoonacular_get)
+    def test_local_names_without_ids_get_them_from_upstream(self, mock_get):
+        for n in range(3):
+            FoodLog.objects.create(user=self.user, food_name=f"tom {n}")
+        reset_index()
+        expected = [{"name": f"tom {n}", "id": 9000 + n} for n in range(3)]
+        self.assertEqual(suggest("tom", limit=3), expected)
+        self.assertEqual(suggest("tom", limit=3), expected)
+        self.assertEqual(mock_get.call_count, 1)
+
+    @override_settings(AUTOCOMPLETE_MIN_USERS=1)
+    def test_stored_ingredients_give_local_names_ids(self):
+        FoodLog.objects.create(user=self.user, food_name="Banana")
+        Ingredient.objects.create(spoonacular_id=9040, name="banana")
+        reset_index()
+        self.assertEqual(get_index().search("ban")[0].as_json(), {"name": "Banana", "id": 9040})
+
+    @patch("tracker.spoonacular.session.get", return_value=FakeResponse({}, status_code=500))
+    def test_view_reports_upstream_failure(self, mock_get):
+        response = self.client.get(reverse("ingredient_autocomplete"), {"q": "zzz"})
+        self.assertEqual(response.status_code, 502)
+        self.assertEqual(response.json(), [])
@@ -0,0 +1,66 @@
+"""
+Tests for the synthetic-load benchmark command and the Spoonacular stub it uses.
+"""
+
+import json
+from io import StringIO
+from unittest.mock import patch
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from tracker.dashboard import MISSES_KEY
+from tracker.nutrients import NutrientVector
+from tracker.testing import fake_spoonacular_get
+
+
+class BenchmarkCommandTests(TestCase):
+    """
+    The benchmark should report every requested view from its own database
+    and caches.
+    """
+
+    # The suite already runs on a test database; the command's own would
+    # replace it, so only its setup and teardown are checked here.
+    @patch("tracker.testing.teardown_databases")
+    @patch("tracker.testing.setup_databases", return_value="old config")
+    def test_writes_json_report_from_throwaway_database(self, setup, teardown):
+        cache.set("shared", "kept")
+        out = StringIO()
+        call_command(
+            "benchmark", "--users", "2", "--logs", "15", "--pantry", "3", "--grocery", "3",
+            "--requests", "3", "--views", "home", "food_log_list", "recipe_smart",
+            stdout=out,
+        )
+        setup.assert_called_once()
+        teardown.assert_called_once_with("old config", verbosity=0)
+        self.assertEqual(cache.get("shared"), "kept")
+        self.assertIsNone(caches["metrics"].get(MISSES_KEY))
+
+        report = json.loads(out.getvalue())
+        self.assertEqual(set(report["views"]), {"home", "food_log_list", "recipe_smart"})
+        for result in report["views"].values():
+            self.assertLessEqual(result["p50_ms"], result["p95_ms"])
+            self.assertGreater(result["queries"]["max"], 0)
+            self.assertGreater(result["peak_memory_kb"], 0)
+
+    @patch("tracker.testing.teardown_databases")
+    @patch("tracker.testing.setup_databases", return_value="old config")
+    def test_ranges_benchmark_uses_throwaway_database(self, setup, teardown):
+        out = StringIO()
+        call_command("benchmark_ranges", "--days", "1", "30", "--repeat", "2", stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 3)
+        teardown.assert_called_once_with("old config", verbosity=0)
+
+
+class SpoonacularStubTests(SimpleTestCase):
+    """
+    The stub answers each endpoint the views call with the expected shape.
+    """
+
+    def test_endpoints(self):
+        base = "https://api.spoonacular.com"
+        self.assertEqual(len(fake_spoonacular_get(f"{base}/recipes/complexSearch", {"number": 3}).json()["results"]), 3)
+        self.assertIsInstance(fake_spoonacular_get(f"{base}/recipes/findByIngredients").json(), list)
+        info = fake_spoonacular_get(f"{base}/recipes/42/information").json()
+        self.assertGreater(NutrientVector.from_spoonacular(info["nutrition"]["nutrients"])["vitamin_c"], 0)
+        self.assertEqual(fake_spoonacular_get(f"{base}/unknown").status_code, 404)
@@ -0,0 +1,72 @@
+"""
+Tests for the cached home page snapshot and its signal-based invalidation.
+"""
+
+from io import StringIO
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import localdate
+from tracker.dashboard import build_snapshot, snapshot_key, snapshot_stats, today_snapshot
+from tracker.models import FoodLog
+from .test_views import create_and_login_user
+
+
+class DashboardSnapshotTests(TestCase):
+    """
+    The home snapshot should be served from the cache until a log changes.
+    """
+
+    def setUp(self):
+        cache.clear()
+        caches["metrics"].clear()
+        self.client, self.user = create_and_login_user(self)
+        self.today = localdate()
+
+    def test_second_visit_is_a_cache_hit(self):
+        self.client.get(reverse("home"))
+        with self.assertNumQueries(2):  # Session and user only.
+            response = self.client.get(reverse("home"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(snapshot_stats(), {"hits": 1, "misses": 1, "hit_ratio": 0.5})
+
+    def test_food_log_writes_invalidate(self):
+        self.assertEqual(today_snapshot(self.user)["totals"]["calories"], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            log = FoodLog.objects.create(
+                user=self.user, food_name="Oats", category="grain",
+                date_logged=self.today, calories=150,
+            )
+        self.assertEqual(today_snapshot(self.user)["totals"]["calories"], 150)
+        with self.captureOnCommitCallbacks(execute=True):
+            log.delete()
+        self.assertEqual(today_snapshot(self.user)["totals"]["calories"], 0)
+        self.assertEqual(snapshot_stats()["hits"], 0)
+
+    def test_snapshot_cached_during_a_write_is_dropped_on_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            FoodLog.objects.create(
+                user=self.user, food_name="Oats", category="grain",
+                date_logged=self.today, calories=150,
+            )
+            # Stands in for another worker that read before the commit.
+            cache.set(snapshot_key(self.user.pk, self.today), build_snapshot(self.user, self.today) | {"stale": True})
+        for callback in callbacks:
+            callback()
+        self.assertNotIn("stale", today_snapshot(self.user))
+
+    def test_supplement_toggle_invalidates(self):
+        self.assertFalse(today_snapshot(self.user)["taken_supplements"]["morning"])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("toggle_supplement", args=["morning"]))
+        response = self.client.get(reverse("home"))
+        self.assertTrue(response.context["taken_supplements"]["morning"])
+
+    def test_cache_stats_command(self):
+        today_snapshot(self.user)
+        today_snapshot(self.user)
+        out = StringIO()
+        call_command("cache_stats", "--reset", stdout=out)
+        self.assertIn("1 hits, 1 misses, hit ratio 50.0%", out.getvalue())
+        self.assertEqual(snapshot_stats()["hits"], 0)
@@ -0,0 +1,94 @@
+"""
+Tests for the streaming FoodLog export endpoint and export_food_logs command.
+"""
+
+import csv
+import json
+from datetime import timedelta
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import localdate
+from tracker.exports import export_lines
+from tracker.filters import date_range
+from tracker.models import FoodLog
+from .test_aggregates import peak_memory
+from .test_views import create_and_login_user
+
+
+class FoodLogExportTests(TestCase):
+    """
+    Exports should stream the requester's rows with the usual filters.
+    """
+
+    def setUp(self):
+        self.client, self.user = create_and_login_user(self)
+        self.today = localdate()
+        for i, (name, category) in enumerate([("Apple", "fruit"), ("Oats", "grain"), ("Pear", "fruit")]):
+            FoodLog.objects.create(
+                user=self.user, food_name=name, category=category,
+                date_logged=self.today - timedelta(days=i * 10), calories=50 + i,
+            )
+        other = User.objects.create_user("other")
+        FoodLog.objects.create(user=other, food_name="Cake", category="dessert", date_logged=self.today)
+
+    def get(self, **params):
+        response = self.client.get(reverse("food_log_export"), params)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_csv_contains_only_own_logs_oldest_first(self):
+        response, body = self.get()
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(csv.DictReader(StringIO(body)))
+        self.assertEqual([r["food_name"] for r in rows], ["Pear", "Oats", "Apple"])
+        self.assertEqual(rows[-1]["calories"], "50.0")
+
+    def test_ndjson_with_range_and_category(self):
+        _, body = self.get(format="ndjson", range="30", category="fruit")
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([r["food_name"] for r in rows], ["Pear", "Apple"])
+        self.assertEqual(rows[0]["date_logged"], (self.today - timedelta(days=20)).isoformat())
+
+        _, body = self.get(format="ndjson", start_date=self.today.isoformat(), end_date=self.today.isoformat())
+        self.assertEqual([json.loads(line)["food_name"] for line in body.splitlines()], ["Apple"])
+
+    def test_inverted_custom_range_is_swapped(self):
+        start, end = self.today - timedelta(days=15), self.today
+        self.assertEqual(date_range({"start_date": str(end), "end_date": str(start)}, self.today), (start, end))
+        _, body = self.get(format="ndjson", start_date=str(end), end_date=str(start))
+        self.assertEqual([json.loads(line)["food_name"] for line in body.splitlines()], ["Oats", "Apple"])
+
+    def test_unknown_format_is_rejected(self):
+        response = self.client.get(reverse("food_log_export"), {"format": "xml"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_memory_is_flat_as_rows_grow(self):
+        """
+        Streaming 20x more rows should not need meaningfully more memory.
+        """
+        def drain():
+            for _ in export_lines(FoodLog.objects.all(), "csv", chunk_size=100):
+                pass
+
+        FoodLog.objects.bulk_create(
+            FoodLog(user=self.user, food_name=f"Item {i}", date_logged=self.today) for i in range(200)
+        )
+        small = peak_memory(drain)
+        FoodLog.objects.bulk_create(
+            FoodLog(user=self.user, food_name=f"Item {i}", date_logged=self.today) for i in range(3800)
+        )
+        large = peak_memory(drain)
+        self.assertLess(large, small * 1.5 + 16 * 1024)
+
+    def test_command_writes_every_users_rows(self):
+        out = StringIO()
+        call_command("export_food_logs", "--category", "fruit", stdout=out)
+        rows = list(csv.DictReader(StringIO(out.getvalue())))
+        self.assertEqual([r["user__username"] for r in rows], ["tester", "tester"])
+
+        out = StringIO()
+        call_command("export_food_logs", "--format", "ndjson", "--user", "other", stdout=out)
+        self.assertEqual(json.loads(out.getvalue())["food_name"], "Cake")
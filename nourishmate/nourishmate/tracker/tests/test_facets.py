@@ -0,0 +1,106 @@
+"""
+Tests for the cached facet counts behind the food log list filters.
+"""
+
+from datetime import timedelta
+from io import StringIO
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import localdate
+from tracker.facets import cached_facet_rows, facet_counts, period_bounds, period_range
+from tracker.filters import filter_logs
+from tracker.imports import import_food_logs, read_rows
+from tracker.models import FoodLog
+from .test_views import create_and_login_user
+
+
+class FacetCountTests(TestCase):
+    """
+    Tests that one grouped query yields every category and period count.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.client, self.user = create_and_login_user(self)
+        self.today = localdate()
+        _, month_start = period_bounds(self.today)
+        self.days = {'week': self.today, 'older': month_start - timedelta(days=40)}
+        for category, day_key, count in [
+            ('fruit', 'week', 3),
+            ('fruit', 'older', 2),
+            ('dairy', 'week', 1),
+            ('dairy', 'older', 4),
+        ]:
+            for _ in range(count):
+                FoodLog.objects.create(user=self.user, food_name="x", category=category,
+                                       date_logged=self.days[day_key])
+
+    def test_counts_cross_filter(self):
+        rows = cached_facet_rows(self.user)
+        counts = facet_counts(rows)
+        self.assertEqual(counts['categories'], {'fruit': 5, 'dairy': 5})
+        self.assertEqual(counts['periods'], {'week': 4, 'month': 4, 'older': 6})
+        self.assertEqual(counts['total'], 10)
+
+        fruit = facet_counts(rows, category='fruit')
+        self.assertEqual(fruit['periods'], {'week': 3, 'month': 3, 'older': 2})
+        self.assertEqual(fruit['categories'], {'fruit': 5, 'dairy': 5})
+        self.assertEqual(fruit['total'], 5)
+
+        older_dairy = facet_counts(rows, category='dairy', period='older')
+        self.assertEqual(older_dairy['categories'], {'fruit': 2, 'dairy': 4})
+        self.assertEqual(older_dairy['total'], 4)
+
+    def test_total_matches_filtered_queryset(self):
+        rows = cached_facet_rows(self.user)
+        for period in ['', 'week', 'month', 'older']:
+            for category in ['', 'fruit', 'dairy', 'grain']:
+                start, end = period_range(period, self.today)
+                logs = filter_logs(FoodLog.objects.filter(user=self.user), start, end, category)
+                with self.subTest(period=period, category=category):
+                    self.assertEqual(facet_counts(rows, category, period)['total'], logs.count())
+
+    def test_one_query_then_cached(self):
+        with self.assertNumQueries(1):
+            cached_facet_rows(self.user)
+        with self.assertNumQueries(0):
+            cached_facet_rows(self.user)
+
+    def test_writes_invalidate_the_cache(self):
+        cached_facet_rows(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            log = FoodLog.objects.create(user=self.user, food_name="y", category="grain", date_logged=self.today)
+        self.assertEqual(facet_counts(cached_facet_rows(self.user))['categories']['grain'], 1)
+
+        log.category = "fish"
+        with self.captureOnCommitCallbacks(execute=True):
+            log.save()
+        counts = facet_counts(cached_facet_rows(self.user))
+        self.assertNotIn('grain', counts['categories'])
+        self.assertEqual(counts['categories']['fish'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            log.delete()
+        self.assertNotIn('fish', facet_counts(cached_facet_rows(self.user))['categories'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            import_food_logs(read_rows(StringIO("food_name,category\nKiwi,fruit\n"), 'csv'), self.user)
+        self.assertEqual(facet_counts(cached_facet_rows(self.user))['categories']['fruit'], 6)
+
+    def test_list_view_shows_counts_with_fixed_queries(self):
+        response = self.client.get(reverse("food_log_list"))
+        self.assertContains(response, "All Categories (10)")
+        self.assertContains(response, "This week (4)")
+        self.assertContains(response, "10 entries")
+
+        for params in [{}, {"category": "fruit"}, {"period": "older"}, {"category": "dairy", "period": "week"}]:
+            with self.subTest(params=params), self.assertNumQueries(3):
+                response = self.client.get(reverse("food_log_list"), params)
+        self.assertContains(response, "1 entry<")
+        self.assertEqual(len(response.context["page_obj"]), 1)
+
+    def test_numbered_pages_use_the_facet_total(self):
+        response = self.client.get(reverse("food_log_list"), {"page": 1, "category": "dairy"})
+        self.assertEqual(response.context["page_obj"].paginator.count, 5)
+        self.assertEqual(len(response.context["page_obj"]), 5)
@@ -0,0 +1,194 @@
+"""
+Tests for loading FoodData Central dumps and serving nutrition from them.
+"""
+
+import io
+import json
+import os
+import tempfile
+from unittest.mock import patch
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from tracker.autocomplete import reset_index, suggest
+from tracker.fooddata import iter_json_array, load_foods, pick_nutrients, read_csv_foods, read_json_foods
+from tracker.ingredients import load_density
+from tracker.models import Ingredient, IngredientNutrient
+from .test_views import create_and_login_user
+
+FDC_FOODS = [
+    {
+        "fdcId": 171688,
+        "description": "Apples, raw, with skin",
+        "foodNutrients": [
+            {"nutrient": {"number": "208"}, "amount": 52},
+            {"nutrient": {"number": "957"}, "amount": 55},
+            {"nutrient": {"number": "203"}, "amount": 0.26},
+            {"nutrient": {"number": "291"}, "amount": 2.4},
+            {"nutrient": {"number": "999"}, "amount": 7},
+        ],
+        "foodPortions": [
+            {"amount": 1, "gramWeight": 125, "measureUnit": {"name": "cup"}},
+            {"amount": 1, "gramWeight": 182, "measureUnit": {"name": "undetermined"}, "modifier": "medium"},
+        ],
+    },
+    {
+        "fdcId": 172687,
+        "description": "Bread, whole-wheat",
+        "foodNutrients": [
+            {"nutrient": {"number": "208"}, "amount": 252},
+            {"nutrient": {"number": "203"}, "amount": 12.45},
+        ],
+        "foodPortions": [
+            {"amount": 2, "gramWeight": 64, "measureUnit": {"name": "slice"}},
+        ],
+    },
+]
+
+FDC_CSV = {
+    "food.csv": (
+        "fdc_id,data_type,description\n"
+        "171688,sr_legacy_food,\"Apples, raw, with skin\"\n"
+        "172687,sr_legacy_food,\"Bread, whole-wheat\"\n"
+        "999999,branded_food,Cola\n"
+    ),
+    "food_nutrient.csv": (
+        "id,fdc_id,nutrient_id,amount\n"
+        "1,171688,1008,52\n"
+        "2,171688,1003,0.26\n"
+        "3,171688,1079,2.4\n"
+        "4,172687,1008,252\n"
+        "5,172687,1003,12.45\n"
+        "6,999999,1008,42\n"
+    ),
+    "measure_unit.csv": "id,name\n1000,cup\n1033,slice\n9999,undetermined\n",
+    "food_portion.csv": (
+        "id,fdc_id,amount,measure_unit_id,modifier,gram_weight\n"
+        "1,171688,1,1000,,125\n"
+        "2,171688,1,9999,medium,182\n"
+        "3,172687,2,1033,,64\n"
+    ),
+}
+
+
+def write_csv_dump(directory):
+    for name, text in FDC_CSV.items():
+        with open(os.path.join(directory, name), "w", encoding="utf-8") as out:
+            out.write(text)
+
+
+class ParsingTests(TestCase):
+    """
+    Tests for reading FDC dumps without loading them.
+    """
+
+    def test_preferred_nutrient_number_wins(self):
+        self.assertEqual(pick_nutrients([("957", 55), ("208", 52), ("269.3", 9)]), {"calories": 52, "sugars": 9})
+
+    def test_json_array_streamed_in_small_chunks(self):
+        text = json.dumps({"SRLegacyFoods": FDC_FOODS})
+        self.assertEqual(list(iter_json_array(io.StringIO(text), chunk_size=7)), FDC_FOODS)
+        self.assertEqual(list(iter_json_array(io.StringIO("[1, 22, 333]"), chunk_size=2)), [1, 22, 333])
+
+    def test_json_and_csv_agree(self):
+        from_json = list(read_json_foods(io.StringIO(json.dumps(FDC_FOODS))))
+        with tempfile.TemporaryDirectory() as tmp:
+            write_csv_dump(tmp)
+            from_csv = list(read_csv_foods(tmp, data_types={"sr_legacy_food"}))
+        self.assertEqual(from_csv, from_json)
+        apple = from_json[0]
+        self.assertEqual(apple.nutrients, {"calories": 52, "protein": 0.26, "fiber": 2.4})
+        self.assertEqual(apple.unit_grams, {"cup": 125, "piece": 182, "fruit": 182})
+        self.assertEqual(from_json[1].unit_grams, {"slice": 32})
+
+    def test_csv_nutrient_rows_grouped_in_any_order(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_csv_dump(tmp)
+            sorted_foods = list(read_csv_foods(tmp, data_types={"sr_legacy_food"}))
+            with open(os.path.join(tmp, "food_nutrient.csv"), "w", encoding="utf-8") as out:
+                out.write(
+                    "id,fdc_id,nutrient_id,amount\n"
+                    "1,171688,1008,52\n"
+                    "4,172687,1008,252\n"
+                    "2,171688,1003,0.26\n"
+                    "5,172687,1003,12.45\n"
+                    "3,171688,1079,2.4\n"
+                )
+            shuffled_foods = list(read_csv_foods(tmp, data_types={"sr_legacy_food"}))
+        self.assertEqual(shuffled_foods, sorted_foods)
+
+
+class LoadTests(TestCase):
+    """
+    Tests for bulk-loading foods.
+    """
+
+    def test_load_skips_foods_already_loaded(self):
+        foods = list(read_json_foods(io.StringIO(json.dumps(FDC_FOODS))))
+        report = load_foods(foods[:1], batch_size=1)
+        self.assertEqual((report["foods"], report["nutrients"]), (1, 3))
+        report = load_foods(foods, batch_size=1)
+        self.assertEqual((report["foods"], report["skipped"]), (1, 1))
+        self.assertEqual(IngredientNutrient.objects.count(), 5)
+
+    def test_replace_drops_cached_densities(self):
+        foods = list(read_json_foods(io.StringIO(json.dumps(FDC_FOODS))))
+        load_foods(foods)
+        cache.clear()
+        self.assertEqual(load_density(fdc_id=171688).per_base[0], 52)
+        load_foods([foods[0]._replace(nutrients={"calories": 60})], replace=True)
+        self.assertEqual(load_density(fdc_id=171688).per_base[0], 60)
+        self.assertIsNone(load_density(fdc_id=172687))
+
+    def test_unique_index_rebuilt_after_load(self):
+        load_foods(read_json_foods(io.StringIO(json.dumps(FDC_FOODS))))
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, IngredientNutrient._meta.db_table)
+        self.assertTrue(any(
+            c["unique"] and c["columns"] == ["ingredient_id", "nutrient"] for c in constraints.values()
+        ))
+
+    def test_command_reports_throughput(self):
+        out = io.StringIO()
+        with tempfile.TemporaryDirectory() as tmp:
+            write_csv_dump(tmp)
+            call_command("load_food_data", tmp, "--data-type", "sr_legacy_food", stdout=out)
+            call_command("load_food_data", tmp, "--replace", stdout=out)
+        self.assertIn("Loaded 2 foods and 5 nutrient rows", out.getvalue())
+        self.assertIn("rows/s", out.getvalue())
+        self.assertEqual(Ingredient.objects.get(fdc_id=999999).name, "Cola")
+
+
+@override_settings(NUTRITION_OFFLINE=True)
+@patch("tracker.spoonacular.session.get", side_effect=AssertionError("Spoonacular called offline"))
+class OfflineTests(TestCase):
+    """
+    With NUTRITION_OFFLINE, autocomplete and nutrition use loaded foods only.
+    """
+
+    def setUp(self):
+        cache.clear()
+        reset_index()
+        self.client, _ = create_and_login_user(self)
+        load_foods(read_json_foods(io.StringIO(json.dumps(FDC_FOODS))))
+
+    def tearDown(self):
+        reset_index()
+
+    def test_autocomplete_suggests_loaded_foods(self, mock_get):
+        self.assertEqual(suggest("apple"), [{"name": "Apples, raw, with skin", "id": "fdc:171688"}])
+        self.assertEqual(suggest("kumquat"), [])
+
+    def test_nutrition_scaled_from_loaded_food(self, mock_get):
+        url = reverse("ingredient_nutrition")
+        cup = self.client.get(url, {"id": "fdc:171688", "amount": 2, "unit": "cup"}).json()
+        self.assertEqual(cup["calories"], 130)
+        self.assertEqual(cup["protein"], 0.65)
+
+    def test_unknown_food_or_unit_not_found(self, mock_get):
+        url = reverse("ingredient_nutrition")
+        self.assertEqual(self.client.get(url, {"id": "fdc:1", "amount": 1, "unit": "g"}).status_code, 404)
+        self.assertEqual(self.client.get(url, {"id": "fdc:172687", "amount": 1, "unit": "cup"}).status_code, 404)
+        self.assertEqual(self.client.get(url, {"id": "11529", "amount": 1, "unit": "g"}).status_code, 404)
@@ -0,0 +1,129 @@
+"""
+Tests for the bulk FoodLog import pipeline, its upload endpoint and the
+import_food_logs command.
+"""
+
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import localdate
+from tracker.imports import import_food_logs, read_rows
+from tracker.models import DailyNutrientRollup, FoodLog
+from .test_views import create_and_login_user
+
+
+class FoodLogImportTests(TestCase):
+    """
+    Imports should insert valid rows, report invalid ones, and keep rollups right.
+    """
+
+    def setUp(self):
+        self.client, self.user = create_and_login_user(self)
+        self.today = localdate()
+        self.yesterday = self.today - timedelta(days=1)
+        tomorrow = self.today + timedelta(days=1)
+        self.csv = (
+            "food_name,category,date_logged,quantity_amount,quantity_unit,calories,protein\n"
+            f"Oats,grain,{self.yesterday},1,cup,150,5\n"
+            f"Apple,fruit,{self.today},,,95,\n"
+            f"Future,fruit,{tomorrow},,,10,\n"
+            f"Negative,fruit,{self.today},-1,piece,-5,\n"
+            f",other,{self.today},,,,\n"
+            f"Odd,snack,{self.today},,,abc,\n"
+        )
+
+    def test_valid_rows_are_created_and_invalid_rows_reported(self):
+        report = import_food_logs(read_rows(StringIO(self.csv), "csv"), self.user, batch_size=2)
+        self.assertEqual(report["processed"], 6)
+        self.assertEqual(report["created"], 2)
+        errors = {e["row"]: e["errors"] for e in report["errors"]}
+        self.assertEqual(errors[3], {"date_logged": "You can’t log food for a future date."})
+        self.assertEqual(errors[4], {
+            "quantity_amount": "Quantity amount cannot be negative.",
+            "calories": "Calories cannot be negative.",
+        })
+        self.assertIn("food_name", errors[5])
+        self.assertEqual(set(errors[6]), {"calories", "category"})
+        self.assertGreater(report["rows_per_second"], 0)
+
+        self.assertEqual(FoodLog.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(DailyNutrientRollup.objects.get(user=self.user, date=self.yesterday).calories, 150)
+
+    def test_dry_run_inserts_nothing(self):
+        report = import_food_logs(read_rows(StringIO(self.csv), "csv"), self.user, dry_run=True)
+        self.assertEqual(report["rejected"], 4)
+        self.assertFalse(FoodLog.objects.exists())
+
+    def test_upload_endpoint_accepts_ndjson(self):
+        body = "\n".join(json.dumps(row) for row in [
+            {"food_name": "Rice", "category": "grain", "date_logged": str(self.today), "calories": 200},
+            {"food_name": "Bad", "calories": -1},
+        ])
+        upload = SimpleUploadedFile("logs.ndjson", body.encode())
+        response = self.client.post(reverse("food_log_import"), {"file": upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["created"], 1)
+        self.assertEqual(response.json()["errors"][0]["row"], 2)
+        self.assertEqual(FoodLog.objects.get().user, self.user)
+
+    def test_upload_rejects_unknown_format(self):
+        upload = SimpleUploadedFile("logs.xml", b"<logs/>")
+        response = self.client.post(reverse("food_log_import"), {"file": upload})
+        self.assertEqual(response.status_code, 400)
+
+    def test_command_imports_json_and_reports_throughput(self):
+        rows = [{"food_name": f"Item {i}", "date_logged": str(self.today), "calories": 1} for i in range(25)]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "logs.json")
+            with open(path, "w") as f:
+                json.dump(rows, f)
+            out = StringIO()
+            call_command("import_food_logs", path, "--user", "tester", "--batch-size", "10", stdout=out)
+        self.assertIn("Imported 25 of 25 rows (0 rejected)", out.getvalue())
+        self.assertIn("rows/s", out.getvalue())
+        self.assertEqual(DailyNutrientRollup.objects.get(user=self.user, date=self.today).log_count, 25)
+
+    def ndjson_with_bad_line(self, good_rows):
+        rows = [
+            json.dumps({"food_name": f"Item {i}", "date_logged": str(self.today), "calories": 1})
+            for i in range(good_rows)
+        ]
+        return "\n".join(rows + ["{not json", rows[0]])
+
+    def test_read_error_keeps_committed_batches_and_their_rollups(self):
+        body = self.ndjson_with_bad_line(1500)
+        with self.captureOnCommitCallbacks(execute=True):
+            report = import_food_logs(read_rows(StringIO(body), "ndjson"), self.user)
+        self.assertEqual((report["processed"], report["created"]), (1500, 1500))
+        self.assertTrue(report["read_error"].startswith("Stopped at record 1501:"))
+        self.assertEqual(DailyNutrientRollup.objects.get(user=self.user, date=self.today).log_count, 1500)
+
+    def test_upload_reports_partial_import_when_file_breaks(self):
+        upload = SimpleUploadedFile("logs.ndjson", self.ndjson_with_bad_line(3).encode())
+        response = self.client.post(reverse("food_log_import"), {"file": upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["created"], 3)
+        self.assertIn("Could not read file: Stopped at record 4", response.json()["error"])
+
+        upload = SimpleUploadedFile("logs.ndjson", b"{not json")
+        response = self.client.post(reverse("food_log_import"), {"file": upload})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["created"], 0)
+
+    def test_command_fails_after_reporting_partial_import(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "logs.ndjson")
+            with open(path, "w") as f:
+                f.write(self.ndjson_with_bad_line(5))
+            out = StringIO()
+            with self.assertRaisesMessage(CommandError, "Stopped at record 6"):
+                call_command("import_food_logs", path, "--user", "tester", "--batch-size", "2", stdout=out)
+        self.assertIn("Imported 5 of 5 rows", out.getvalue())
+        self.assertEqual(DailyNutrientRollup.objects.get(user=self.user, date=self.today).log_count, 5)
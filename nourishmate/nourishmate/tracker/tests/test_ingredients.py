@@ -0,0 +1,109 @@
+"""
+Tests for scaling ingredient nutrition locally.
+"""
+
+from unittest.mock import patch
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from tracker.ingredients import learn, nutrition_for, to_grams
+from tracker.models import Ingredient
+from tracker.testing import STUB_UNIT_GRAMS, FakeResponse, fake_spoonacular_get
+from .test_views import create_and_login_user
+
+
+class UnitConversionTests(TestCase):
+    """
+    Tests for turning a quantity into grams.
+    """
+
+    def test_mass_units_need_no_ingredient_data(self):
+        self.assertEqual(to_grams(2, "g", {}), 2)
+        self.assertAlmostEqual(to_grams(1, "oz", {}), 28.3495, places=4)
+
+    def test_other_units_use_the_ingredient_weight(self):
+        self.assertEqual(to_grams(2, "cup", {"cup": 125}), 250)
+        self.assertIsNone(to_grams(1, "slice", {"cup": 125}))
+
+
+@patch("tracker.spoonacular.session.get", side_effect=fake_spoonacular_get)
+class NutritionScalingTests(TestCase):
+    """
+    An ingredient is fetched once; other amounts and known units are scaled locally.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    def test_amounts_scaled_without_upstream(self, mock_get):
+        fetched = nutrition_for(11529, 1, "piece")
+        self.assertEqual(mock_get.call_count, 1)
+
+        ingredient = Ingredient.objects.get(spoonacular_id=11529)
+        self.assertEqual(ingredient.unit_grams, {"piece": 120})
+        self.assertEqual(ingredient.nutrients.count(), 18)
+
+        for amount, unit in [(3, "piece"), (250, "g"), (2, "oz"), (0.5, "piece")]:
+            local = nutrition_for(11529, amount, unit)
+            grams = amount * STUB_UNIT_GRAMS[unit]
+            self.assertAlmostEqual(local["protein"], fetched["protein"] * grams / 120, places=6)
+        self.assertEqual(mock_get.call_count, 1)
+
+    def test_new_unit_fetched_once(self, mock_get):
+        nutrition_for(9003, 100, "g")
+        self.assertEqual(Ingredient.objects.get(spoonacular_id=9003).unit_grams, {})
+        nutrition_for(9003, 1, "cup")
+        nutrition_for(9003, 2, "cup")
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(Ingredient.objects.get(spoonacular_id=9003).unit_grams, {"cup": 240})
+
+    def test_warm_lookup_runs_no_queries(self, mock_get):
+        nutrition_for(9004, 1, "slice")
+        nutrition_for(9004, 2, "slice")
+        with CaptureQueriesContext(connection) as captured:
+            nutrition_for(9004, 3, "g")
+        self.assertEqual(len(captured), 0)
+
+    def test_ingredient_stored_meanwhile_gets_the_unit(self, mock_get):
+        Ingredient.objects.create(spoonacular_id=9006, name="ingredient 9006")
+        info = fake_spoonacular_get(
+            "https://api.spoonacular.com/food/ingredients/9006/information", {"amount": 1, "unit": "cup"},
+        ).json()
+        learn(9006, 1, "cup", info, stored=False)
+        self.assertEqual(Ingredient.objects.get(spoonacular_id=9006).unit_grams, {"cup": 240})
+
+    def test_response_without_weight_is_not_stored(self, mock_get):
+        mock_get.side_effect = None
+        mock_get.return_value = FakeResponse({"nutrition": {"nutrients": [{"name": "Protein", "amount": 3}]}})
+        self.assertEqual(nutrition_for(9005, 1, "serving")["protein"], 3)
+        self.assertFalse(Ingredient.objects.exists())
+
+
+class NutritionViewTests(TestCase):
+    """
+    Tests for /api/nutrition/.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.client, _ = create_and_login_user(self)
+
+    @patch("tracker.spoonacular.session.get", side_effect=fake_spoonacular_get)
+    def test_returns_rounded_scaled_nutrients(self, mock_get):
+        url = reverse("ingredient_nutrition")
+        first = self.client.get(url, {"id": 11529, "amount": 1, "unit": "piece"}).json()
+        double = self.client.get(url, {"id": 11529, "amount": 2, "unit": "piece"}).json()
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertAlmostEqual(double["calories"], first["calories"] * 2, places=1)
+        self.assertEqual(double["calories"], round(double["calories"], 2))
+
+    def test_bad_amount(self):
+        response = self.client.get(reverse("ingredient_nutrition"), {"id": 1, "amount": "lots", "unit": "g"})
+        self.assertEqual(response.status_code, 400)
+
+    @patch("tracker.spoonacular.session.get", return_value=FakeResponse({}, status_code=402))
+    def test_upstream_failure_on_cold_miss(self, mock_get):
+        response = self.client.get(reverse("ingredient_nutrition"), {"id": 1, "amount": 1, "unit": "g"})
+        self.assertEqual(response.status_code, 500)
@@ -2,6 +2,7 @@
 Tests for the FoodLog model, verifying its string representation.
 """
 
+from django.contrib.auth.models import User
 from django.test import TestCase
 from django.utils import timezone
 from tracker.models import FoodLog
@@ -17,6 +18,7 @@ class FoodLogModelTest(TestCase):
         The __str__ method should include the food name and unit.
         """
         log = FoodLog.objects.create(
+            user=User.objects.create_user('carrot'),
             food_name='Carrot',
             quantity_amount=2,
             quantity_unit='piece',
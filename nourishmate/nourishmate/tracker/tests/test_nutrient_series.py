@@ -0,0 +1,83 @@
+"""
+Tests for the bucketed nutrient time-series API used by charts.
+"""
+
+from datetime import date
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from tracker.models import FoodLog
+from tracker.rollups import MAX_SERIES_POINTS, nutrient_series
+from .test_views import create_and_login_user
+
+
+class NutrientSeriesTests(TestCase):
+    """
+    TestCase for nutrient_series and the /api/nutrients/series/ endpoint.
+    """
+
+    def setUp(self):
+        self.client, self.user = create_and_login_user(self)
+        # Wednesday 2025-01-01, Thursday 2025-01-02 and Monday 2025-01-06.
+        for day, calories in [(date(2025, 1, 1), 100), (date(2025, 1, 2), 200), (date(2025, 1, 6), 50)]:
+            FoodLog.objects.create(
+                user=self.user, food_name="Oats", category="grain",
+                date_logged=day, calories=calories, protein=1,
+            )
+        other = User.objects.create_user("other")
+        FoodLog.objects.create(
+            user=other, food_name="Cake", category="dessert",
+            date_logged=date(2025, 1, 1), calories=999,
+        )
+
+    def test_daily_series_fills_gaps_with_zeros(self):
+        series = nutrient_series(self.user, date(2025, 1, 1), date(2025, 1, 4), fields=["calories"])
+        self.assertEqual(series["bucket"], "day")
+        self.assertEqual(series["labels"], ["2025-01-01", "2025-01-02", "2025-01-03", "2025-01-04"])
+        self.assertEqual(series["series"]["calories"], [100, 200, 0, 0])
+        self.assertEqual(series["log_count"], [1, 1, 0, 0])
+
+    def test_weekly_buckets_start_on_monday(self):
+        series = nutrient_series(self.user, date(2025, 1, 1), date(2025, 1, 12), "week")
+        self.assertEqual(series["labels"], ["2024-12-30", "2025-01-06"])
+        self.assertEqual(series["series"]["calories"], [300, 50])
+        self.assertEqual(series["series"]["protein"], [2, 1])
+
+    def test_series_is_one_query(self):
+        with self.assertNumQueries(1):
+            nutrient_series(self.user, date(2024, 1, 1), date(2025, 12, 31), "month")
+
+    def test_long_ranges_are_downsampled(self):
+        """
+        A three-year daily request falls back to months; thirty years to years.
+        """
+        three = nutrient_series(self.user, date(2023, 1, 1), date(2025, 12, 31))
+        self.assertEqual(three["bucket"], "month")
+        self.assertEqual(len(three["labels"]), 36)
+        self.assertEqual(sum(three["series"]["calories"]), 350)
+
+        thirty = nutrient_series(self.user, date(1996, 1, 1), date(2025, 12, 31))
+        self.assertEqual(thirty["bucket"], "quarter")
+        self.assertLessEqual(len(thirty["labels"]), MAX_SERIES_POINTS)
+
+    def test_api_returns_parallel_arrays(self):
+        response = self.client.get(reverse("nutrient_series"), {
+            "start": "2025-01-01", "end": "2025-01-31",
+            "bucket": "week", "nutrients": "calories,protein",
+        })
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["bucket"], "week")
+        self.assertEqual(set(data["series"]), {"calories", "protein"})
+        self.assertEqual(len(data["series"]["calories"]), len(data["labels"]))
+        self.assertEqual(sum(data["series"]["calories"]), 350)
+
+    def test_api_rejects_bad_parameters(self):
+        url = reverse("nutrient_series")
+        for params in [
+            {"start": "yesterday"},
+            {"start": "2025-02-01", "end": "2025-01-01"},
+            {"bucket": "fortnight"},
+            {"nutrients": "calories,unobtainium"},
+        ]:
+            self.assertEqual(self.client.get(url, params).status_code, 400)
@@ -0,0 +1,91 @@
+"""
+Tests for the nutrient registry and the NutrientVector type.
+"""
+
+from django.test import SimpleTestCase
+from tracker.forms import FoodLogForm
+from tracker.models import DailyNutrientRollup, FoodLog, NutrientPrefixSum
+from tracker.nutrients import (
+    NUTRIENT_FIELDS, TARGETS, NutrientVector, supplement_boost,
+)
+
+
+class NutrientRegistryTests(SimpleTestCase):
+    """
+    The registry should describe exactly the nutrient columns in use.
+    """
+
+    def test_registry_matches_foodlog_columns(self):
+        """
+        Every FloatField on FoodLog except quantity_amount is a registered nutrient.
+        """
+        columns = [
+            f.name for f in FoodLog._meta.get_fields()
+            if f.get_internal_type() == "FloatField" and f.name != "quantity_amount"
+        ]
+        self.assertEqual(columns, NUTRIENT_FIELDS)
+
+    def test_rollup_tables_share_the_registry_columns(self):
+        for model in (DailyNutrientRollup, NutrientPrefixSum):
+            columns = [f.name for f in model._meta.get_fields() if f.get_internal_type() == "FloatField"]
+            self.assertEqual(columns, NUTRIENT_FIELDS)
+
+    def test_form_fields_come_from_registry(self):
+        """
+        FoodLogForm exposes every nutrient, and all of them are optional.
+        """
+        form = FoodLogForm()
+        for field in NUTRIENT_FIELDS:
+            self.assertFalse(form.fields[field].required)
+
+
+class NutrientVectorTests(SimpleTestCase):
+    """
+    Arithmetic, lookups and classification on NutrientVector.
+    """
+
+    def test_add_scale_and_lookup(self):
+        a = NutrientVector.from_mapping({"calories": 100, "protein": 5})
+        b = NutrientVector.from_mapping({"calories": 50})
+        total = (a + b) * 2
+        self.assertEqual(total["calories"], 300)
+        self.assertEqual(total.get("protein"), 10)
+        self.assertEqual(total.get("unknown", 0), 0)
+        self.assertEqual(sum([a, b])["calories"], 150)
+
+    def test_badges_only_cover_targeted_nutrients(self):
+        """
+        Nutrients without a daily target get no badge.
+        """
+        totals = NutrientVector.from_mapping({"calories": 2000, "protein": 10, "zinc": 100})
+        badges = totals.badges(TARGETS)
+        self.assertEqual(badges["calories"], "Good")
+        self.assertEqual(badges["protein"], "Low")
+        self.assertEqual(badges["zinc"], "High")
+        self.assertNotIn("sodium", badges)
+        self.assertIn("protein", totals.lows(TARGETS))
+
+    def test_ratios_and_mean(self):
+        totals = NutrientVector.from_mapping({"protein": 25, "fiber": 25})
+        ratios = totals.ratios(TARGETS)
+        self.assertEqual(ratios["protein"], 0.5)
+        self.assertEqual(ratios.mean(["protein", "fiber"]), 0.75)
+        self.assertEqual(ratios.mean([]), 0)
+
+    def test_from_spoonacular_maps_upstream_names(self):
+        """
+        Spoonacular names such as "Carbohydrates" and "Sugar" map onto our fields.
+        """
+        vector = NutrientVector.from_spoonacular([
+            {"name": "Carbohydrates", "amount": 12},
+            {"name": "Sugar", "amount": 3},
+            {"name": "Vitamin B12", "amount": 0.5},
+        ])
+        self.assertEqual(vector["carbs"], 12)
+        self.assertEqual(vector["sugars"], 3)
+        self.assertEqual(vector["vitamin_b12"], 0.5)
+
+    def test_supplement_boost(self):
+        boost = supplement_boost({"morning": 2, "evening": 1})
+        self.assertEqual(boost["vitamin_d"], 60)
+        self.assertEqual(boost["zinc"], 15)
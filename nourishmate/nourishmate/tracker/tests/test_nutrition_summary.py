@@ -24,6 +24,7 @@ class NutritionSummaryTests(TestCase):
         base = localdate()
         for i, calories in enumerate([100, 200, 300]):
             FoodLog.objects.create(
+                user=self.user,
                 food_name=f"Item{i}",
                 quantity_amount=1,
                 quantity_unit="piece",
@@ -54,3 +55,21 @@ class NutritionSummaryTests(TestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.context["totals"]["calories"], 600)
+
+    def test_inverted_custom_range(self):
+        """
+        A custom range given end first shows the same positive totals as the
+        range in order, not a negative difference of prefix sums.
+        """
+        start = (localdate() - timedelta(days=2)).isoformat()
+        end = localdate().isoformat()
+        url = (
+            reverse("nutrition_summary")
+            + f"?range=custom&start_date={end}&end_date={start}"
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["totals"]["calories"], 600)
+        self.assertEqual(response.context["badges"]["calories"], self.client.get(
+            reverse("nutrition_summary") + f"?range=custom&start_date={start}&end_date={end}"
+        ).context["badges"]["calories"])
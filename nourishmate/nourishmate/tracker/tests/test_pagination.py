@@ -0,0 +1,94 @@
+"""
+Tests for keyset pagination of the food log list.
+"""
+
+from datetime import timedelta
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import localdate
+from tracker.models import FoodLog
+from tracker.pagination import keyset_page
+from .test_views import create_and_login_user
+
+ORDERINGS = ['date_logged', '-date_logged', 'food_name', '-food_name', 'calories', '-calories']
+
+
+class KeysetPaginationTests(TestCase):
+    """
+    Walking cursors must visit every row exactly once, in order, for every sort.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.client, self.user = create_and_login_user(self)
+        today = localdate()
+        # Heavy ties: 4 names, 3 calorie values and 5 dates over 37 rows.
+        FoodLog.objects.bulk_create(
+            FoodLog(
+                user=self.user,
+                food_name=["Apple", "Bread", "Corn", "Dates"][i % 4],
+                calories=[50, 100, 150][i % 3],
+                date_logged=today - timedelta(days=i % 5),
+            )
+            for i in range(37)
+        )
+        self.logs = FoodLog.objects.filter(user=self.user)
+
+    def walk(self, ordering, per_page=5):
+        pages, cursor = [], None
+        while True:
+            page = keyset_page(self.logs, ordering, cursor, per_page)
+            pages.append([log.pk for log in page])
+            if not page.has_next:
+                return pages
+            cursor = page.next_cursor
+
+    def test_forward_walk_matches_offset_order(self):
+        for ordering in ORDERINGS:
+            with self.subTest(ordering=ordering):
+                tiebreak = '-pk' if ordering.startswith('-') else 'pk'
+                expected = list(self.logs.order_by(ordering, tiebreak).values_list('pk', flat=True))
+                pages = self.walk(ordering)
+                self.assertEqual([pk for page in pages for pk in page], expected)
+                self.assertEqual(len(pages), 8)
+
+    def test_previous_cursor_returns_the_earlier_page(self):
+        for ordering in ORDERINGS:
+            with self.subTest(ordering=ordering):
+                pages = self.walk(ordering)
+                page = keyset_page(self.logs, ordering, None, 5)
+                seen = [[log.pk for log in page]]
+                for _ in range(3):
+                    page = keyset_page(self.logs, ordering, page.next_cursor, 5)
+                    seen.append([log.pk for log in page])
+                for expected in reversed(seen[:-1]):
+                    page = keyset_page(self.logs, ordering, page.previous_cursor, 5)
+                    self.assertEqual([log.pk for log in page], expected)
+                self.assertFalse(page.has_previous)
+                self.assertEqual(seen, pages[:4])
+
+    def test_deep_page_is_one_query(self):
+        page = keyset_page(self.logs, '-calories', None, 5)
+        for _ in range(5):
+            page = keyset_page(self.logs, '-calories', page.next_cursor, 5)
+        with self.assertNumQueries(1):
+            keyset_page(self.logs, '-calories', page.next_cursor, 5)
+
+    def test_bad_or_foreign_cursor_falls_back_to_first_page(self):
+        first = [log.pk for log in keyset_page(self.logs, 'calories', None, 5)]
+        other = keyset_page(self.logs, 'food_name', None, 5).next_cursor
+        for cursor in ["not-a-cursor", "e30", other]:
+            self.assertEqual([log.pk for log in keyset_page(self.logs, 'calories', cursor, 5)], first)
+
+    def test_list_view_uses_cursors_and_keeps_page_links(self):
+        response = self.client.get(reverse("food_log_list"), {"sort": "calories_desc"})
+        self.assertContains(response, "?cursor=")
+        self.assertContains(response, "37 entries")
+        cursor = response.context["page_obj"].next_cursor
+        response = self.client.get(reverse("food_log_list"), {"sort": "calories_desc", "cursor": cursor})
+        self.assertEqual(len(response.context["page_obj"]), 10)
+
+        response = self.client.get(reverse("food_log_list"), {"page": 4, "sort": "calories_desc"})
+        self.assertEqual(response.context["page_obj"].number, 4)
+        self.assertContains(response, "?page=3&amp;sort=calories_desc")
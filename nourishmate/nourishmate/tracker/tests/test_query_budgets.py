@@ -0,0 +1,164 @@
+"""
+Query budget tests: every URL in tracker/urls.py must stay within the query
+count it declares in QUERY_BUDGETS, whatever the amount of data.
+"""
+
+from datetime import timedelta
+from unittest.mock import patch
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils.timezone import localdate
+from tracker import urls as tracker_urls
+from tracker.models import FoodLog, GroceryItem, PantryItem, SavedRecipe
+from tracker.query_budget import REPORT_SQL_LENGTH, QueryBudgetAssertions, budget_report, budgets, query_budget
+from tracker.testing import fake_spoonacular_get
+from .test_views import create_and_login_user
+
+
+@patch("tracker.spoonacular.session.get", side_effect=fake_spoonacular_get)
+class QueryBudgetTests(QueryBudgetAssertions, TransactionTestCase):
+    """
+    Request each URL with a dozen rows of everything and check its budget.
+    Each request runs in autocommit as in production, so the BEGIN, COMMIT
+    and savepoint statements of its writes count too.
+    """
+
+    def setUp(self):
+        self.client, self.user = create_and_login_user(self)
+        today = localdate()
+        self.logs = [
+            FoodLog.objects.create(
+                user=self.user, food_name=f"Item {i}", category="grain",
+                date_logged=today - timedelta(days=i % 4), calories=100,
+            )
+            for i in range(12)
+        ]
+        self.pantry = [
+            PantryItem.objects.create(user=self.user, name=f"Pantry {i}", quantity=2, unit="piece")
+            for i in range(12)
+        ]
+        self.grocery = [
+            GroceryItem.objects.create(user=self.user, name=f"Grocery {i}", quantity="1", category="fruit")
+            for i in range(12)
+        ]
+        self.saved = [
+            SavedRecipe.objects.create(user=self.user, spoonacular_id=i, title=f"Recipe {i}")
+            for i in range(12)
+        ]
+
+    def requests(self):
+        """
+        (url name, method, reverse args, data) for one request per URL and
+        method it serves.
+        """
+        log, pantry, grocery, saved = self.logs[0].pk, self.pantry[0].pk, self.grocery[0].pk, self.saved[0].pk
+        today = localdate()
+        return [
+            ("register", "get", [], {}),
+            ("home", "get", [], {}),
+            ("food_log_list", "get", [], {"sort": "calories_desc", "page": 2}),
+            ("food_log_list", "post", [], {
+                "food_name": "Toast", "category": "grain", "date_logged": str(today), "calories": 80,
+            }),
+            ("food_log_export", "get", [], {"range": "30"}),
+            ("food_log_search", "get", [], {"q": "aple"}),
+            ("food_log_import", "post", [], {"file": SimpleUploadedFile(
+                "logs.csv", b"food_name,calories\nToast,80\nJam,40\n")}),
+            ("add_to_grocery_list", "post", [], {"food_name": ["Kiwi"], "quantity": ["2"], "category": ["fruit"]}),
+            ("grocery_list", "get", [], {}),
+            ("toggle_purchased", "get", [grocery], {}),
+            ("delete_grocery_item", "get", [grocery], {}),
+            ("update_grocery_category", "post", [self.grocery[1].pk], {"category": "dairy"}),
+            ("nutrition_summary", "get", [], {"range": "30"}),
+            ("food_log_edit", "get", [log], {}),
+            # Moving the log to another day refreshes both days' rollups.
+            ("food_log_edit", "post", [self.logs[1].pk], {
+                "food_name": "Moved", "category": "grain", "date_logged": str(today - timedelta(days=5)), "calories": 90,
+            }),
+            ("food_log_edit_form", "get", [log], {}),
+            ("food_log_delete", "post", [log], {}),
+            ("pantry_list", "get", [], {}),
+            ("add_pantry_item", "get", [], {}),
+            ("edit_pantry_item", "get", [pantry], {}),
+            ("delete_pantry_item", "get", [pantry], {}),
+            ("increase_quantity", "post", [self.pantry[1].pk], {}),
+            ("decrease_quantity", "post", [self.pantry[1].pk], {}),
+            ("toggle_supplement", "post", ["morning"], {}),
+            ("ingredient_autocomplete", "get", [], {"q": "tom"}),
+            ("ingredient_nutrition", "get", [], {"id": 11529, "amount": 1, "unit": "piece"}),
+            ("nutrient_series", "get", [], {"bucket": "week"}),
+            ("save_recipe", "post", [99], {}),
+            ("saved_recipes", "get", [], {}),
+            ("delete_saved_recipe", "post", [saved], {}),
+            ("recipe_search", "get", [], {"mode": "smart"}),
+            ("logout", "post", [], {}),
+        ]
+
+    def test_every_url_has_a_budget(self, _):
+        names = {p.name for p in tracker_urls.urlpatterns if p.name}
+        self.assertEqual(names, set(budgets()))
+        self.assertEqual(names, {name for name, *_ in self.requests()})
+
+    def test_every_url_stays_within_budget(self, _):
+        for name, method, args, data in self.requests():
+            with self.subTest(url=name):
+                with self.assertQueryBudget(name, method):
+                    response = getattr(self.client, method)(reverse(name, args=args), data)
+                    if response.streaming:
+                        b"".join(response.streaming_content)
+                self.assertLess(response.status_code, 400)
+
+    @query_budget("recipe_search")
+    def test_search_mode_within_budget(self, _):
+        self.client.get(reverse("recipe_search"), {"mode": "search", "ingredients": "tomato"})
+
+    def test_over_budget_fails_with_grouped_queries(self, _):
+        with patch.dict(tracker_urls.QUERY_BUDGETS, {"pantry_list": 1}):
+            with self.assertRaises(AssertionError) as raised:
+                with self.assertQueryBudget("pantry_list"):
+                    self.client.get(reverse("pantry_list"))
+        self.assertIn("pantry_list ran", str(raised.exception))
+        self.assertIn("(budget 1)", str(raised.exception))
+
+
+class QueryBudgetMiddlewareTests(TestCase):
+    """
+    In development, requests over budget are logged with duplicates grouped.
+    """
+
+    @override_settings(DEBUG=True)
+    def test_logs_over_budget_request(self):
+        self.client, self.user = create_and_login_user(self)
+        for i in range(3):
+            PantryItem.objects.create(user=self.user, name=f"Item {i}", quantity=1, unit="piece")
+        with patch.dict(tracker_urls.QUERY_BUDGETS, {"increase_quantity": 1}):
+            with self.assertLogs("tracker.queries", "WARNING") as logs:
+                self.client.post(reverse("increase_quantity", args=[PantryItem.objects.first().pk]))
+        self.assertIn("POST /pantry/increase/", logs.output[0])
+        self.assertIn("(budget 1)", logs.output[0])
+
+    @override_settings(DEBUG=True)
+    def test_within_budget_is_silent(self):
+        self.client, _ = create_and_login_user(self)
+        with self.assertNoLogs("tracker.queries", "WARNING"):
+            self.client.get(reverse("pantry_list"))
+
+    def test_report_shortens_long_statements(self):
+        sql = "INSERT INTO tracker_foodlog (food_name) VALUES " + ", ".join(["(x)"] * 1000) + " RETURNING id"
+        report = budget_report("import", [{"sql": sql}], 0)
+        self.assertLess(len(report), REPORT_SQL_LENGTH + 100)
+        self.assertIn("INSERT INTO tracker_foodlog", report)
+        self.assertIn("RETURNING id", report)
+
+    @override_settings(DEBUG=True)
+    def test_write_is_checked_against_its_method_budget(self):
+        self.client, _ = create_and_login_user(self)
+        with patch.dict(tracker_urls.QUERY_BUDGETS, {"food_log_list": {"GET": 100, "POST": 1}}):
+            with self.assertNoLogs("tracker.queries", "WARNING"):
+                self.client.get(reverse("food_log_list"))
+            with self.assertLogs("tracker.queries", "WARNING") as logs:
+                self.client.post(reverse("food_log_list"), {
+                    "food_name": "Toast", "category": "grain", "date_logged": str(localdate()),
+                })
+        self.assertIn("POST /logs/", logs.output[0])
@@ -0,0 +1,130 @@
+"""
+Query-plan tests: per-user lookups and every sort/filter path of the list
+views should be served by a composite index that starts with the user, on
+every supported database, without a full scan or a separate sort step.
+"""
+
+import re
+from contextlib import contextmanager
+from unittest import skipUnless
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase
+from django.utils.timezone import localdate
+from tracker.models import FoodLog, GroceryItem, PantryItem, SavedRecipe
+from .test_views import create_and_login_user
+
+# SQLite: "SCAN <table>" without an index is a full scan; a temp B-tree is a sort.
+SQLITE_FULL_SCAN = re.compile(r"\bSCAN tracker_\w+(?! USING)")
+SQLITE_SORT = "USE TEMP B-TREE"
+
+
+@contextmanager
+def index_only_planner():
+    """
+    Test tables are tiny, so take sequential scans and sorts off the table
+    for PostgreSQL; a plan that still needs one has no usable index.
+    """
+    settings = ["enable_seqscan", "enable_bitmapscan", "enable_sort"]
+    with connection.cursor() as cursor:
+        for setting in settings:
+            cursor.execute(f"SET {setting} = off")
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for setting in settings:
+                cursor.execute(f"RESET {setting}")
+
+
+class FoodLogIndexPlanTests(TestCase):
+    """
+    EXPLAIN the queries behind the log list, home page and recipe view.
+    """
+
+    def setUp(self):
+        self.client, self.user = create_and_login_user(self)
+        self.today = localdate()
+
+    def queries(self):
+        return [
+            FoodLog.objects.filter(user=self.user).order_by("-date_logged"),
+            FoodLog.objects.filter(user=self.user, date_logged=self.today),
+            FoodLog.objects.filter(user=self.user, date_logged__range=[self.today, self.today]),
+        ]
+
+    @skipUnless(connection.vendor == "sqlite", "SQLite query plan")
+    def test_sqlite_uses_user_date_index(self):
+        for qs in self.queries():
+            self.assertIn("foodlog_user_date_idx", qs.explain())
+
+    @skipUnless(connection.vendor == "postgresql", "PostgreSQL query plan")
+    def test_postgresql_uses_user_date_index(self):
+        # A test table is tiny, so make the planner prefer any usable index.
+        with connection.cursor() as cursor:
+            cursor.execute("SET enable_seqscan = off")
+        try:
+            for qs in self.queries():
+                self.assertIn("foodlog_user_date_idx", qs.explain())
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute("RESET enable_seqscan")
+
+
+class HotQueryPlanTests(TestCase):
+    """
+    EXPLAIN the sorted and filtered queries behind the food log, grocery,
+    pantry and saved-recipe lists.
+    """
+
+    def setUp(self):
+        self.client, self.user = create_and_login_user(self)
+
+    def hot_queries(self):
+        """
+        (expected index, queryset) for each hot query.
+        """
+        logs = FoodLog.objects.filter(user=self.user)
+        queries = []
+        # (ordering, index, cursor value): the first page, then a keyset page.
+        for ordering, index, value in [
+            ("date_logged", "foodlog_user_date_idx", localdate()),
+            ("-date_logged", "foodlog_user_date_idx", localdate()),
+            ("food_name", "foodlog_user_name_idx", "Oats"),
+            ("-food_name", "foodlog_user_name_idx", "Oats"),
+            ("calories", "foodlog_user_calories_idx", 100.0),
+            ("-calories", "foodlog_user_calories_idx", 100.0),
+        ]:
+            field = ordering.lstrip("-")
+            tiebreak = "-pk" if ordering.startswith("-") else "pk"
+            after = "lt" if ordering.startswith("-") else "gt"
+            seek = Q(**{f"{field}__{after}": value}) | Q(**{field: value, f"pk__{after}": 1})
+            queries += [
+                (index, logs.order_by(ordering, tiebreak)[:11]),
+                (index, logs.filter(seek).order_by(ordering, tiebreak)[:11]),
+            ]
+        return queries + [
+            ("foodlog_user_cat_date_idx", logs.filter(category="fruit").order_by("-date_logged", "-pk")[:11]),
+            ("grocery_user_added_idx", GroceryItem.objects.filter(user=self.user).order_by("added_on")),
+            ("pantry_user_name_idx", PantryItem.objects.filter(user=self.user).order_by("name")),
+            ("saved_user_saved_at_idx", SavedRecipe.objects.filter(user=self.user).order_by("-saved_at")),
+        ]
+
+    @skipUnless(connection.vendor == "sqlite", "SQLite query plan")
+    def test_sqlite_hot_queries_use_indexes(self):
+        for index, qs in self.hot_queries():
+            plan = qs.explain()
+            with self.subTest(sql=str(qs.query)):
+                self.assertIn(index, plan)
+                self.assertNotRegex(plan, SQLITE_FULL_SCAN)
+                self.assertNotIn(SQLITE_SORT, plan)
+
+    @skipUnless(connection.vendor == "postgresql", "PostgreSQL query plan")
+    def test_postgresql_hot_queries_use_indexes(self):
+        with index_only_planner():
+            for index, qs in self.hot_queries():
+                plan = qs.explain()
+                with self.subTest(sql=str(qs.query)):
+                    self.assertIn(index, plan)
+                    self.assertNotIn("Seq Scan", plan)
+                    self.assertNotRegex(plan, r"\bSort\b")
@@ -3,9 +3,11 @@ Tests for the combined recipe search view, covering both general
 search mode and smart mode.
 """
 
+import threading
 from unittest.mock import patch
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
+from tracker.testing import fake_spoonacular_get
 from .test_views import create_and_login_user
 
 # Sample data for mocking API responses
@@ -23,7 +25,7 @@ class RecipeViewTests(TestCase):
         """
         self.client, _ = create_and_login_user(self)
 
-    @patch("tracker.views.requests.get")
+    @patch("tracker.spoonacular.session.get")
     def test_general_search(self, mock_get):
         """
         When mode = search and an ingredients query is provided,
@@ -41,7 +43,7 @@ class RecipeViewTests(TestCase):
         # The first result in context should match mock.
         self.assertEqual(response.context["results"][0]["id"], 42)
 
-    @patch("tracker.views.requests.get")
+    @patch("tracker.spoonacular.session.get")
     def test_smart_mode(self, mock_get):
         """
         When mode = smart, the view should
@@ -58,3 +60,25 @@ class RecipeViewTests(TestCase):
         self.assertEqual(response.status_code, 200)
         # Ensure smart_results is present.
         self.assertIn("smart_results", response.context)
+
+    @override_settings(SPOONACULAR_ENRICH_DEADLINE=0.5, SPOONACULAR_BULK_SIZE=4)
+    def test_smart_mode_drops_recipes_past_deadline(self):
+        """
+        Recipes whose nutrition lookup misses the deadline are left out
+        instead of holding up the page.
+        """
+        release = threading.Event()
+
+        def stalls_on_first_chunk(url, params=None, **kwargs):
+            if "2001" in (params or {}).get("ids", "").split(","):
+                release.wait(5)
+            return fake_spoonacular_get(url, params, **kwargs)
+
+        try:
+            with patch("tracker.spoonacular.session.get", side_effect=stalls_on_first_chunk):
+                response = self.client.get(reverse("recipe_search") + "?mode=smart&ingredients=rice")
+        finally:
+            release.set()
+        ids = [recipe["id"] for recipe in response.context["smart_results"]]
+        self.assertEqual(len(ids), 6)
+        self.assertFalse({2000, 2001, 2002, 2003} & set(ids))
@@ -0,0 +1,87 @@
+"""
+Tests for batched recipe information lookups.
+"""
+
+from unittest.mock import patch
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from tracker.models import SavedRecipe
+from tracker.recipes import chunked, recipe_information, recipe_summary
+from tracker.testing import FakeResponse, fake_spoonacular_get
+from .test_views import create_and_login_user
+
+
+def bulk_ids(mock_get):
+    return [call.kwargs["params"]["ids"] for call in mock_get.call_args_list]
+
+
+class RecipeInformationTests(TestCase):
+    """
+    Tests for chunked informationBulk calls and splitting results by id.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    def test_chunked(self):
+        self.assertEqual(chunked([1, 2, 3, 4, 5], 2), [[1, 2], [3, 4], [5]])
+
+    @override_settings(SPOONACULAR_BULK_SIZE=2)
+    @patch("tracker.spoonacular.session.get", side_effect=fake_spoonacular_get)
+    def test_ids_fetched_in_chunks(self, mock_get):
+        found = recipe_information([5, 6, 7, 5], include_nutrition=True)
+        self.assertEqual(sorted(found), [5, 6, 7])
+        self.assertEqual(sorted(bulk_ids(mock_get)), ["5,6", "7"])
+        self.assertEqual(mock_get.call_args.kwargs["params"]["includeNutrition"], "true")
+
+    @override_settings(SPOONACULAR_BULK_SIZE=2)
+    def test_failed_chunk_leaves_other_ids(self):
+        def second_chunk_fails(url, params=None, **kwargs):
+            if params["ids"] == "7,8":
+                return FakeResponse({"status": "failure"}, status_code=402)
+            return fake_spoonacular_get(url, params, **kwargs)
+
+        with patch("tracker.spoonacular.session.get", side_effect=second_chunk_fails):
+            found = recipe_information([5, 6, 7, 8, 9])
+        self.assertEqual(sorted(found), [5, 6, 9])
+
+    @patch("tracker.spoonacular.session.get")
+    def test_ids_missing_from_response_are_absent(self, mock_get):
+        mock_get.return_value = FakeResponse([{"id": 5, "title": "Soup"}])
+        self.assertEqual(list(recipe_information([5, 6])), [5])
+
+    @patch("tracker.spoonacular.session.get", side_effect=fake_spoonacular_get)
+    def test_no_ids_no_call(self, mock_get):
+        self.assertEqual(recipe_information([]), {})
+        mock_get.assert_not_called()
+
+    @patch("tracker.spoonacular.session.get", side_effect=fake_spoonacular_get)
+    def test_summary_reuses_fetched_recipes(self, mock_get):
+        recipe_information([11, 12])
+        summary = recipe_summary(12)
+        self.assertEqual(summary["title"], "Stub Recipe 12")
+        self.assertEqual(summary["source_url"], "https://example.com/recipes/12")
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch("tracker.spoonacular.session.get", return_value=FakeResponse({}, status_code=500))
+    def test_summary_none_when_unavailable(self, mock_get):
+        self.assertIsNone(recipe_summary(13))
+
+
+class SaveAfterSearchTests(TestCase):
+    """
+    Saving a recipe just shown in smart suggestions needs no extra call.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.client, self.user = create_and_login_user(self)
+
+    @patch("tracker.spoonacular.session.get", side_effect=fake_spoonacular_get)
+    def test_save_uses_cached_summary(self, mock_get):
+        self.client.get(reverse("recipe_search"), {"mode": "smart", "ingredients": "rice"})
+        calls = mock_get.call_count
+        self.client.post(reverse("save_recipe", args=[2003]))
+        self.assertEqual(mock_get.call_count, calls)
+        self.assertEqual(SavedRecipe.objects.get(user=self.user).title, "Stub Recipe 2003")
@@ -0,0 +1,212 @@
+"""
+Tests for the DailyNutrientRollup table: incremental maintenance on
+FoodLog and SupplementLog writes, and the rebuild_rollups command.
+"""
+
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import localdate
+from tracker.models import (
+    FoodLog, SupplementLog, DailyNutrientRollup, NutrientPrefixSum,
+)
+from tracker import rollups
+from tracker.aggregates import daily_averages
+from tracker.nutrients import NutrientVector
+from tracker.rollups import rollup_totals, range_totals
+from .test_views import create_and_login_user
+
+
+class RollupMaintenanceTests(TestCase):
+    """
+    Rollup rows should follow every create, edit and delete.
+    """
+
+    def setUp(self):
+        self.client, self.user = create_and_login_user(self)
+        self.today = localdate()
+
+    def make_log(self, calories, day=None):
+        return FoodLog.objects.create(
+            user=self.user,
+            food_name="Oats",
+            category="grain",
+            date_logged=day or self.today,
+            calories=calories,
+        )
+
+    def test_create_updates_rollup(self):
+        """
+        Creating logs adds their totals to the day's rollup.
+        """
+        self.make_log(100)
+        self.make_log(50)
+        rollup = DailyNutrientRollup.objects.get(date=self.today)
+        self.assertEqual(rollup.calories, 150)
+        self.assertEqual(rollup.log_count, 2)
+
+    def test_edit_through_view_moves_totals_between_days(self):
+        """
+        Changing the date in FoodLogUpdateView refreshes both days.
+        """
+        log = self.make_log(100)
+        yesterday = self.today - timedelta(days=1)
+        self.client.post(reverse("food_log_edit", args=[log.pk]), {
+            "food_name": "Oats",
+            "category": "grain",
+            "date_logged": yesterday.isoformat(),
+            "calories": 120,
+        })
+        self.assertFalse(DailyNutrientRollup.objects.filter(date=self.today).exists())
+        self.assertEqual(DailyNutrientRollup.objects.get(date=yesterday).calories, 120)
+
+    def test_delete_through_view_clears_rollup(self):
+        """
+        Deleting the only log of a day removes that day's rollup row.
+        """
+        log = self.make_log(100)
+        self.client.post(reverse("food_log_delete", args=[log.pk]))
+        self.assertFalse(DailyNutrientRollup.objects.exists())
+
+    def test_toggle_supplement_updates_rollup(self):
+        """
+        Toggling a supplement slot adds, then removes, its boosts.
+        """
+        url = reverse("toggle_supplement", args=["morning"])
+        self.client.post(url)
+        self.assertEqual(rollup_totals(self.user, self.today, self.today)["vitamin_d"], 30)
+        self.client.post(url)
+        self.assertEqual(rollup_totals(self.user, self.today, self.today)["vitamin_d"], 0)
+
+    def test_totals_combine_food_and_supplements(self):
+        """
+        A range total sums food rollups and the user's supplement rollups.
+        """
+        self.make_log(100)
+        self.make_log(200, self.today - timedelta(days=3))
+        SupplementLog.objects.create(user=self.user, date=self.today, time_of_day="evening")
+        totals = rollup_totals(self.user, self.today - timedelta(days=6), self.today)
+        self.assertEqual(totals["calories"], 300)
+        self.assertEqual(totals["zinc"], 15)
+
+
+class RebuildRollupsCommandTests(TestCase):
+    """
+    rebuild_rollups should repair the table after bulk writes.
+    """
+
+    def test_rebuild_after_bulk_create(self):
+        """
+        bulk_create bypasses save(), so the command must backfill the rows.
+        """
+        today = localdate()
+        user = User.objects.create_user("bulk")
+        FoodLog.objects.bulk_create(
+            FoodLog(user=user, food_name=f"Item {i}", date_logged=today - timedelta(days=i % 5), calories=10)
+            for i in range(20)
+        )
+        self.assertFalse(DailyNutrientRollup.objects.exists())
+
+        out = StringIO()
+        call_command("rebuild_rollups", "--chunk-days", "2", stdout=out)
+
+        self.assertEqual(DailyNutrientRollup.objects.count(), 5)
+        self.assertEqual(DailyNutrientRollup.objects.get(user=user, date=today).calories, 40)
+        self.assertIn("Rebuilt 5 rollup rows", out.getvalue())
+
+
+class PrefixSumRangeTests(TestCase):
+    """
+    range_totals should match summed rollups, touch a fixed number of rows
+    whatever the range length, and only rebuild from an edited date forward.
+    """
+
+    def setUp(self):
+        self.client, self.user = create_and_login_user(self)
+        self.today = localdate()
+        self.logs = [
+            FoodLog.objects.create(
+                user=self.user,
+                food_name=f"Day {i}",
+                date_logged=self.today - timedelta(days=i),
+                calories=10 * (i + 1),
+            )
+            for i in range(10)
+        ]
+
+    def test_matches_rollup_totals(self):
+        """
+        Every sub-range gives the same totals as summing rollup rows.
+        """
+        for start_offset, end_offset in [(0, 0), (3, 1), (9, 0), (30, 5)]:
+            start = self.today - timedelta(days=start_offset)
+            end = self.today - timedelta(days=end_offset)
+            self.assertEqual(
+                range_totals(self.user, start, end)["calories"],
+                rollup_totals(self.user, start, end)["calories"],
+            )
+
+    def test_range_ending_before_it_starts_is_empty(self):
+        self.assertEqual(range_totals(self.user, self.today, self.today - timedelta(days=1))["calories"], 0)
+        self.assertEqual(range_totals(self.user, self.today, self.today - timedelta(days=5))["calories"], 0)
+        self.assertEqual(daily_averages(NutrientVector(), self.today, self.today - timedelta(days=1))["calories"], 0)
+
+    def test_query_count_independent_of_range_length(self):
+        """
+        Once the index is warm, 1-day and 1,000-day ranges cost the same queries.
+        """
+        range_totals(self.user, self.today, self.today)
+        with self.assertNumQueries(3):
+            range_totals(self.user, self.today, self.today)
+        with self.assertNumQueries(3):
+            range_totals(self.user, self.today - timedelta(days=999), self.today)
+
+    def test_edit_invalidates_from_edited_date_forward(self):
+        """
+        Editing a log five days ago keeps earlier prefix rows and rebuilds the rest.
+        """
+        range_totals(self.user, self.today - timedelta(days=9), self.today)
+        edited_day = self.today - timedelta(days=5)
+        kept = set(
+            NutrientPrefixSum.objects.filter(date__lt=edited_day).values_list("pk", flat=True)
+        )
+
+        log = self.logs[5]
+        log.calories += 1000
+        log.save()
+
+        self.assertFalse(NutrientPrefixSum.objects.filter(date__gte=edited_day).exists())
+        self.assertEqual(
+            set(NutrientPrefixSum.objects.values_list("pk", flat=True)), kept
+        )
+        totals = range_totals(self.user, self.today - timedelta(days=9), self.today)
+        self.assertEqual(totals["calories"], sum(10 * (i + 1) for i in range(10)) + 1000)
+
+    def test_extension_is_computed_under_the_user_lock(self):
+        """
+        A write that commits while range_totals waits for the user's lock is
+        in the prefix rows it then stores, and the write took the lock too.
+        """
+        lock_prefix = rollups.lock_prefix
+        calls = []
+
+        def lock_then_write(user_ids):
+            calls.append(list(user_ids))
+            if len(calls) == 1:
+                # Stands in for another request committing before our lock is granted.
+                self.logs[0].calories += 1000
+                self.logs[0].save()
+            lock_prefix(user_ids)
+
+        with patch("tracker.rollups.lock_prefix", side_effect=lock_then_write):
+            totals = range_totals(self.user, self.today - timedelta(days=9), self.today)
+
+        self.assertEqual(calls, [[self.user.pk], [self.user.pk]])
+        self.assertEqual(totals["calories"], sum(10 * (i + 1) for i in range(10)) + 1000)
+        self.assertEqual(
+            NutrientPrefixSum.objects.get(user=self.user, date=self.today).calories, totals["calories"]
+        )
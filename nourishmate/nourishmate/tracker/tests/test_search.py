@@ -0,0 +1,118 @@
+"""
+Tests for full-text search over food log history.
+"""
+
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import localdate
+from tracker.models import FoodLog
+from tracker.search import (
+    fuzzy_expression, prefix_expression, search_foods, search_terms, trigram_share, trigrams,
+)
+from .test_views import create_and_login_user
+
+
+class SearchExpressionTests(TestCase):
+    """
+    Tests for turning a query into index match expressions.
+    """
+
+    def test_terms_are_lower_cased_words(self):
+        self.assertEqual(search_terms('Peanut "Butter"*'), ["peanut", "butter"])
+
+    def test_prefix_expression_quotes_each_term(self):
+        self.assertEqual(prefix_expression(["pea", "but"]), '"pea"* AND "but"*')
+
+    def test_fuzzy_expression_ors_distinct_trigrams(self):
+        self.assertEqual(trigrams(["aple", "ap"]), ["apl", "ple"])
+        self.assertEqual(fuzzy_expression(["aple"]), '"apl" OR "ple"')
+
+    def test_trigram_share(self):
+        self.assertEqual(trigram_share(["bananna"], "Banana"), 0.6)
+        self.assertEqual(trigram_share(["ab"], "Abc"), 0.0)
+
+
+class FoodSearchTests(TestCase):
+    """
+    Tests for ranked prefix and fuzzy matching kept in sync with FoodLog.
+    """
+
+    def setUp(self):
+        self.client, self.user = create_and_login_user(self)
+        self.today = localdate()
+
+    def log(self, name, days_ago=0, user=None):
+        return FoodLog.objects.create(
+            user=user or self.user, food_name=name, date_logged=self.today - timedelta(days=days_ago)
+        )
+
+    def names(self, query):
+        return [match.food_name for match in search_foods(self.user, query)]
+
+    def test_prefix_matches_every_term(self):
+        self.log("Peanut butter toast")
+        self.log("Peanut salad")
+        self.log("Butter chicken")
+        self.assertEqual(self.names("pea but"), ["Peanut butter toast"])
+
+    def test_fuzzy_matches_typos_when_nothing_matches_by_prefix(self):
+        self.log("Apple pie")
+        self.log("Pineapple")
+        self.log("Bread")
+        self.assertEqual(set(self.names("aple")), {"Apple pie", "Pineapple"})
+        self.assertEqual(self.names("bred"), ["Bread"])
+        # A prefix match exists, so fuzzy neighbours are left out.
+        self.assertEqual(self.names("apple"), ["Apple pie"])
+
+    def test_each_food_once_with_count_and_last_date(self):
+        self.log("Oatmeal", days_ago=30)
+        self.log("Oatmeal", days_ago=2)
+        self.log("Oat milk", days_ago=5)
+        matches = search_foods(self.user, "oat")
+        self.assertEqual(
+            [(m.food_name, m.log_count, m.last_logged) for m in matches],
+            [("Oatmeal", 2, self.today - timedelta(days=2)), ("Oat milk", 1, self.today - timedelta(days=5))],
+        )
+
+    def test_only_own_logs(self):
+        other = User.objects.create_user("other", "o@o.com", "pass")
+        self.log("Kiwi", user=other)
+        self.assertEqual(self.names("kiwi"), [])
+
+    def test_index_follows_updates_deletes_and_bulk_writes(self):
+        first = self.log("Granola", days_ago=4)
+        latest = self.log("Granola", days_ago=1)
+        latest.delete()
+        self.assertEqual(search_foods(self.user, "granola")[0].last_logged, first.date_logged)
+        self.assertEqual(search_foods(self.user, "granola")[0].log_count, 1)
+
+        first.food_name = "Muesli"
+        first.save()
+        self.assertEqual(self.names("granola"), [])
+        self.assertEqual(self.names("muesli"), ["Muesli"])
+
+        FoodLog.objects.filter(pk=first.pk).update(food_name="Porridge")
+        self.assertEqual(self.names("porr"), ["Porridge"])
+
+        FoodLog.objects.bulk_create([FoodLog(user=self.user, food_name="Quinoa bowl")])
+        self.assertEqual(self.names("quin"), ["Quinoa bowl"])
+
+        first.delete()
+        self.assertEqual(self.names("porridge"), [])
+
+    def test_empty_query_matches_nothing(self):
+        self.log("Rice")
+        self.assertEqual(self.names("  !! "), [])
+
+    def test_search_view(self):
+        self.log("Salmon fillet", days_ago=9)
+        self.log("Salmon fillet", days_ago=3)
+        response = self.client.get(reverse("food_log_search"), {"q": "salm"})
+        self.assertContains(response, "Salmon fillet", count=2)
+        self.assertContains(response, "2 times")
+        self.assertEqual(response.context["results"][0].last_logged, self.today - timedelta(days=3))
+
+        response = self.client.get(reverse("food_log_search"), {"q": "zzz"})
+        self.assertContains(response, "No logged food matches")
@@ -0,0 +1,96 @@
+"""
+Tests for the Server-Timing and profiling middleware.
+"""
+
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+from urllib.parse import parse_qsl, urlsplit
+import requests
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from tracker.autocomplete import reset_index
+from tracker.testing import fake_spoonacular_get
+from .test_views import create_and_login_user
+
+
+def fake_adapter_send(self, request, **kwargs):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = b'[{"name": "tomato", "id": 1}]'
+    response.url = request.url
+    return response
+
+
+def stub_adapter_send(self, request, **kwargs):
+    stub = fake_spoonacular_get(request.url, dict(parse_qsl(urlsplit(request.url).query)))
+    response = requests.Response()
+    response.status_code = stub.status_code
+    response._content = stub.text.encode()
+    response.url = request.url
+    return response
+
+
+class ServerTimingTests(TestCase):
+    """
+    Every response should split its time into db, template and outbound HTTP.
+    """
+
+    def setUp(self):
+        # Autocomplete must go upstream, not answer from an index built by another test.
+        cache.clear()
+        reset_index()
+        self.client, self.user = create_and_login_user(self)
+
+    def test_header_reports_db_and_template_time(self):
+        response = self.client.get(reverse("pantry_list"))
+        header = response["Server-Timing"]
+        self.assertRegex(header, r'db;dur=[\d.]+;desc="[1-9]\d* queries"')
+        self.assertIn('desc="1 templates"', header)
+        self.assertIn('desc="0 outbound"', header)
+        self.assertRegex(header, r"total;dur=[\d.]+")
+
+    @patch("requests.adapters.HTTPAdapter.send", fake_adapter_send)
+    def test_outbound_requests_are_timed(self):
+        response = self.client.get(reverse("ingredient_autocomplete"), {"q": "tom"})
+        self.assertEqual(response.json()[0]["name"], "tomato")
+        self.assertIn('desc="1 outbound"', response["Server-Timing"])
+
+    @patch("requests.adapters.HTTPAdapter.send", stub_adapter_send)
+    def test_concurrent_requests_are_timed(self):
+        # Two findByIngredients calls, then the bulk lookups on pool threads.
+        with override_settings(SPOONACULAR_BULK_SIZE=4):
+            response = self.client.get(reverse("recipe_search"), {"mode": "smart", "ingredients": "rice"})
+        self.assertIn('desc="5 outbound"', response["Server-Timing"])
+
+
+class ProfilingTests(TestCase):
+    """
+    cProfile dumps are written for staff on demand, or by sampling.
+    """
+
+    def setUp(self):
+        self.client, self.user = create_and_login_user(self)
+        self.profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profile_dir)
+
+    def test_staff_can_profile_on_demand(self):
+        self.user.is_staff = True
+        self.user.save()
+        with override_settings(PROFILE_DIR=self.profile_dir):
+            response = self.client.get(reverse("pantry_list"), {"profile": "1"})
+        self.assertTrue(response["X-Profile"].endswith("-GET-pantry.prof"))
+        self.assertEqual(os.listdir(self.profile_dir), [response["X-Profile"]])
+
+    def test_non_staff_profile_flag_is_ignored(self):
+        with override_settings(PROFILE_DIR=self.profile_dir):
+            response = self.client.get(reverse("pantry_list"), {"profile": "1"})
+        self.assertNotIn("X-Profile", response)
+        self.assertEqual(os.listdir(self.profile_dir), [])
+
+    def test_sampled_requests_are_profiled(self):
+        with override_settings(PROFILE_DIR=self.profile_dir, PROFILE_SAMPLE_RATE=1.0):
+            self.client.get(reverse("pantry_list"))
+        self.assertEqual(len(os.listdir(self.profile_dir)), 1)
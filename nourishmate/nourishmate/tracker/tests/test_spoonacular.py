@@ -0,0 +1,332 @@
+"""
+Tests for the shared Spoonacular HTTP client.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+from io import StringIO
+from unittest.mock import patch
+import requests
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from tracker import spoonacular
+from tracker.cache_backends import LRUFileBasedCache
+from tracker.testing import FakeResponse, fake_spoonacular_get
+
+
+@override_settings(SPOONACULAR_API_KEY="test-key")
+class SpoonacularClientTests(TestCase):
+    """
+    Tests for timeouts, key handling, failures and latency metrics.
+    """
+
+    def setUp(self):
+        caches["metrics"].clear()
+
+    def test_endpoint_folds_ids(self):
+        self.assertEqual(spoonacular.endpoint_for("/recipes/716429/information"), "recipes/{id}/information")
+        self.assertEqual(spoonacular.endpoint_for("recipes/complexSearch"), "recipes/complexSearch")
+        self.assertEqual(spoonacular.endpoint_for("/food/ingredients/9266/information"),
+                         "food/ingredients/{id}/information")
+
+    @patch("tracker.spoonacular.session.get", side_effect=fake_spoonacular_get)
+    def test_get_adds_key_and_timeout(self, mock_get):
+        data = spoonacular.get("/recipes/complexSearch", {"query": "soup", "number": 2})
+        self.assertEqual(len(data["results"]), 2)
+        url = mock_get.call_args.args[0]
+        kwargs = mock_get.call_args.kwargs
+        self.assertEqual(url, "https://api.spoonacular.com/recipes/complexSearch")
+        self.assertEqual(kwargs["params"]["apiKey"], "test-key")
+        self.assertEqual(kwargs["params"]["query"], "soup")
+        self.assertEqual(kwargs["timeout"], spoonacular.settings.SPOONACULAR_TIMEOUT)
+
+    @patch("tracker.spoonacular.session.get", return_value=FakeResponse({}, status_code=402))
+    def test_error_status_returns_none(self, mock_get):
+        self.assertIsNone(spoonacular.get("/recipes/complexSearch"))
+
+    @patch("tracker.spoonacular.session.get", side_effect=requests.Timeout("read timed out"))
+    def test_timeout_returns_none(self, mock_get):
+        self.assertIsNone(spoonacular.get("/recipes/1/information"))
+
+    def test_latency_recorded_per_endpoint(self):
+        with patch("tracker.spoonacular.session.get", side_effect=fake_spoonacular_get):
+            spoonacular.get("/recipes/1/information")
+            spoonacular.get("/recipes/2/information")
+        with patch("tracker.spoonacular.session.get", side_effect=requests.ConnectionError()):
+            spoonacular.get("/recipes/3/information")
+
+        stats = spoonacular.latency_stats()["recipes/{id}/information"]
+        self.assertEqual(stats["count"], 3)
+        self.assertEqual(stats["errors"], 1)
+        self.assertEqual(sum(stats["histogram"].values()), 3)
+        self.assertEqual(stats["p50_ms"], 50)
+
+    def test_percentile_open_bucket(self):
+        spoonacular.record_latency("slow", 20000, False)
+        self.assertIsNone(spoonacular.latency_stats()["slow"]["p95_ms"])
+
+    def test_stats_command_reset(self):
+        spoonacular.record_latency("recipes/complexSearch", 120, False)
+        out = StringIO()
+        call_command("spoonacular_stats", "--reset", stdout=out)
+        self.assertIn("recipes/complexSearch: 1 calls, 0 errors", out.getvalue())
+        self.assertIn("p50 <= 250 ms", out.getvalue())
+        self.assertEqual(spoonacular.latency_stats(), {})
+
+    def test_session_pools_and_retries(self):
+        adapter = spoonacular.session.get_adapter("https://api.spoonacular.com/recipes/complexSearch")
+        self.assertEqual(adapter.max_retries.total, spoonacular.settings.SPOONACULAR_RETRIES)
+        self.assertIn(503, adapter.max_retries.status_forcelist)
+        self.assertEqual(adapter._pool_maxsize, spoonacular.settings.SPOONACULAR_POOL_SIZE)
+
+
+class ConcurrentGetTests(TestCase):
+    """
+    Tests for fanning calls out over the shared thread pool.
+    """
+
+    def setUp(self):
+        caches["metrics"].clear()
+
+    def test_calls_overlap_and_keep_order(self):
+        # Each call waits for the other two; run one after another they would time out.
+        barrier = threading.Barrier(3, timeout=5)
+
+        def together(url, params=None, **kwargs):
+            barrier.wait()
+            return fake_spoonacular_get(url, params, **kwargs)
+
+        with patch("tracker.spoonacular.session.get", side_effect=together):
+            results = spoonacular.get_many(
+                [(f"/recipes/{recipe_id}/information", None) for recipe_id in (1, 2, 3)], deadline=5,
+            )
+        self.assertEqual([result["id"] for result in results], [1, 2, 3])
+
+    def test_late_calls_are_dropped_at_deadline(self):
+        release = threading.Event()
+
+        def stalls_on_two(url, params=None, **kwargs):
+            if url.endswith("/2/information"):
+                release.wait(5)
+            return fake_spoonacular_get(url, params, **kwargs)
+
+        try:
+            with patch("tracker.spoonacular.session.get", side_effect=stalls_on_two):
+                results = spoonacular.get_many(
+                    [(f"/recipes/{recipe_id}/information", None) for recipe_id in (1, 2, 3)], deadline=0.5,
+                )
+        finally:
+            release.set()
+        self.assertEqual(results[0]["id"], 1)
+        self.assertIsNone(results[1])
+        self.assertEqual(results[2]["id"], 3)
+
+
+@override_settings(
+    SPOONACULAR_API_KEY="test-key",
+    SPOONACULAR_CACHE_TTLS={"food/ingredients/autocomplete": 60, "recipes/{id}/information": 60},
+)
+class ResponseCacheTests(TestCase):
+    """
+    Tests for the shared response cache in front of Spoonacular.
+    """
+
+    def setUp(self):
+        caches["metrics"].clear()
+        caches["spoonacular"].clear()
+
+    def test_key_ignores_api_key_and_parameter_order(self):
+        self.assertEqual(
+            spoonacular.response_key("/food/ingredients/autocomplete", {"query": "tom", "number": 5, "apiKey": "a"}),
+            spoonacular.response_key("food/ingredients/autocomplete", {"number": "5", "query": "tom ", "diet": ""}),
+        )
+        self.assertNotEqual(
+            spoonacular.response_key("/food/ingredients/autocomplete", {"query": "tom"}),
+            spoonacular.response_key("/food/ingredients/autocomplete", {"query": "tomato"}),
+        )
+        self.assertNotIn("test-key", spoonacular.response_key("/recipes/1/information", {"apiKey": "test-key"}))
+
+    @patch("tracker.spoonacular.session.get", side_effect=fake_spoonacular_get)
+    def test_repeat_calls_served_from_cache(self, mock_get):
+        first = spoonacular.get("/food/ingredients/autocomplete", {"query": "tom", "number": 2})
+        second = spoonacular.get("/food/ingredients/autocomplete", {"number": 2, "query": "tom"})
+        self.assertEqual(first, second)
+        self.assertEqual(mock_get.call_count, 1)
+
+        stats = spoonacular.response_cache_stats()["food/ingredients/autocomplete"]
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["hit_ratio"], 0.5)
+        self.assertGreater(stats["bytes_saved"], 0)
+
+    @patch("tracker.spoonacular.session.get", side_effect=fake_spoonacular_get)
+    def test_endpoints_without_ttl_are_not_cached(self, mock_get):
+        spoonacular.get("/recipes/complexSearch", {"query": "soup"})
+        spoonacular.get("/recipes/complexSearch", {"query": "soup"})
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertNotIn("recipes/complexSearch", spoonacular.response_cache_stats())
+
+    @patch("tracker.spoonacular.session.get", return_value=FakeResponse({}, status_code=500))
+    def test_failures_are_not_cached(self, mock_get):
+        spoonacular.get("/recipes/1/information")
+        spoonacular.get("/recipes/1/information")
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch("tracker.spoonacular.session.get", side_effect=fake_spoonacular_get)
+    def test_stats_command_reports_cache(self, mock_get):
+        spoonacular.get("/recipes/1/information")
+        spoonacular.get("/recipes/1/information")
+        out = StringIO()
+        call_command("spoonacular_stats", stdout=out)
+        self.assertIn("recipes/{id}/information cache: 1 hits, 1 misses, hit ratio 50.0%", out.getvalue())
+
+
+@override_settings(SPOONACULAR_API_KEY="test-key")
+class CoalescingTests(TestCase):
+    """
+    Tests for sharing one upstream call between identical concurrent calls.
+    """
+
+    def setUp(self):
+        caches["metrics"].clear()
+        caches["spoonacular"].clear()
+
+    def wait_for(self, condition):
+        give_up = time.monotonic() + 5
+        while not condition():
+            self.assertLess(time.monotonic(), give_up, "timed out")
+            time.sleep(0.01)
+
+    def test_simultaneous_identical_calls_hit_upstream_once(self):
+        callers = 8
+        release = threading.Event()
+
+        def slow(url, params=None, **kwargs):
+            release.wait(5)
+            return fake_spoonacular_get(url, params, **kwargs)
+
+        def coalesced():
+            return spoonacular.coalesce_stats().get("food/ingredients/autocomplete", {}).get("coalesced", 0)
+
+        results = [None] * callers
+
+        def call(i):
+            results[i] = spoonacular.get("/food/ingredients/autocomplete", {"query": "tom", "number": 3})
+
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(callers)]
+        with patch("tracker.spoonacular.session.get", side_effect=slow) as mock_get:
+            for thread in threads:
+                thread.start()
+            # Hold the upstream call until every other caller is waiting on it.
+            self.wait_for(lambda: coalesced() == callers - 1)
+            release.set()
+            for thread in threads:
+                thread.join(5)
+
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertTrue(all(result == results[0] for result in results))
+        self.assertEqual(len({id(result) for result in results}), callers)
+        self.assertEqual(spoonacular.latency_stats()["food/ingredients/autocomplete"]["count"], 1)
+
+    @patch("tracker.spoonacular.session.get", side_effect=fake_spoonacular_get)
+    def test_different_calls_are_not_coalesced(self, mock_get):
+        results = spoonacular.get_many([("/recipes/1/information", None), ("/recipes/2/information", None)])
+        self.assertEqual([result["id"] for result in results], [1, 2])
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(spoonacular.coalesce_stats(), {})
+
+    @override_settings(
+        SPOONACULAR_CACHE_TTLS={"recipes/{id}/information": 60},
+        SPOONACULAR_COALESCE_LOCK_TTL=5,
+        SPOONACULAR_COALESCE_POLL=0.01,
+    )
+    @patch("tracker.spoonacular.session.get", side_effect=fake_spoonacular_get)
+    def test_waits_for_another_workers_call(self, mock_get):
+        # Stand in for another worker that holds the lock, then stores its result.
+        key = spoonacular.response_key("/recipes/7/information")
+        caches["spoonacular"].add(f"{key}:lock", 1, 5)
+
+        def other_worker():
+            time.sleep(0.1)
+            spoonacular.store_response("recipes/{id}/information", key, {"id": 7, "title": "Shared"})
+            caches["spoonacular"].delete(f"{key}:lock")
+
+        worker = threading.Thread(target=other_worker)
+        worker.start()
+        result = spoonacular.get("/recipes/7/information")
+        worker.join(5)
+
+        self.assertEqual(result["title"], "Shared")
+        mock_get.assert_not_called()
+        self.assertEqual(spoonacular.coalesce_stats()["recipes/{id}/information"], {"coalesced": 0, "shared": 1})
+
+        out = StringIO()
+        call_command("spoonacular_stats", stdout=out)
+        self.assertIn("recipes/{id}/information coalesced: 0 in-process, 1 across workers", out.getvalue())
+
+    @override_settings(
+        SPOONACULAR_CACHE_TTLS={"recipes/{id}/information": 60},
+        SPOONACULAR_COALESCE_LOCK_TTL=5,
+        SPOONACULAR_COALESCE_POLL=0.01,
+    )
+    @patch("tracker.spoonacular.session.get", side_effect=fake_spoonacular_get)
+    def test_fetches_itself_when_other_worker_gives_up(self, mock_get):
+        key = spoonacular.response_key("/recipes/8/information")
+        caches["spoonacular"].add(f"{key}:lock", 1, 5)
+        threading.Timer(0.1, caches["spoonacular"].delete, [f"{key}:lock"]).start()
+
+        self.assertEqual(spoonacular.get("/recipes/8/information")["id"], 8)
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertIsNone(caches["spoonacular"].get(f"{key}:lock"))
+
+
+class LRUFileBasedCacheTests(TestCase):
+    """
+    Tests for least-recently-used eviction in the file cache backend.
+    """
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def backend(self, **options):
+        return LRUFileBasedCache(self.dir, {"OPTIONS": {"CULL_FREQUENCY": 3, **options}})
+
+    def age(self, store, key, seconds):
+        path = store._key_to_file(key)
+        past = time.time() - seconds
+        os.utime(path, (past, past))
+
+    def test_evicts_least_recently_used_entries(self):
+        store = self.backend(MAX_ENTRIES=3)
+        for n, key in enumerate(["a", "b", "c"]):
+            store.set(key, key)
+            self.age(store, key, 100 - n)
+        store.get("a")  # Now the most recently used.
+        store.set("d", "d")
+        self.assertIsNone(store.get("b"))
+        self.assertEqual([store.get(key) for key in ("a", "c", "d")], ["a", "c", "d"])
+
+    def test_evicts_by_size(self):
+        # Random bytes, so the backend's compression cannot shrink them.
+        store = self.backend(MAX_ENTRIES=100, MAX_BYTES=3000)
+        for n, key in enumerate(["a", "b", "c"]):
+            store.set(key, os.urandom(1000))
+            self.age(store, key, 100 - n)
+        store.set("d", os.urandom(1000))
+        self.assertIsNone(store.get("a"))
+        self.assertIsNotNone(store.get("d"))
+
+    def test_directory_scanned_once_per_cull_worth_of_sets(self):
+        store = self.backend(MAX_ENTRIES=30)
+        with patch.object(store, "_scan_and_cull", wraps=store._scan_and_cull) as scan:
+            for n in range(30):
+                store.set(f"k{n}", n)
+            self.assertEqual(scan.call_count, 3)
+            for n in range(30, 90):
+                store.set(f"k{n}", n)
+                self.assertLessEqual(len(store._list_cache_files()), 30)
+        self.assertEqual(store.get("k89"), 89)
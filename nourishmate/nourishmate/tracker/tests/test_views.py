@@ -3,6 +3,7 @@ Tests for the FoodLog views, covering list display, creation, update, deletion,
 and pagination.
 """
 
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth.models import User
@@ -29,6 +30,7 @@ class FoodLogListViewTest(TestCase):
         self.client.login(username='testuser', password='pass')
         # Create one log to see it show up.
         self.log = FoodLog.objects.create(
+            user=self.user,
             food_name='Egg',
             quantity_amount=1,
             quantity_unit='piece',
@@ -74,6 +76,7 @@ class FoodLogDeleteQuerystringTest(TestCase):
         self.client.login(username="deleter", password="pass")
         # Create a log to delete.
         self.log = FoodLog.objects.create(
+            user=self.user,
             food_name="ToBeDeleted",
             quantity_amount=1,
             quantity_unit="unit",
@@ -98,6 +101,8 @@ class FoodLogPaginationLinksTest(TestCase):
     """
 
     def setUp(self):
+        # Facet counts cached by earlier tests may belong to a reused user id.
+        cache.clear()
         # Create/login.
         self.user = User.objects.create_user("pager", "p@p.com", "pass")
         self.client.login(username="pager", password="pass")
@@ -105,6 +110,7 @@ class FoodLogPaginationLinksTest(TestCase):
         today = timezone.localdate()
         for i in range(12):
             FoodLog.objects.create(
+                user=self.user,
                 food_name=f"Item {i}",
                 quantity_amount=1,
                 quantity_unit="unit",
@@ -123,3 +129,78 @@ class FoodLogPaginationLinksTest(TestCase):
         self.assertEqual(resp.status_code, 200)
         self.assertContains(resp, '?page=1&amp;sort=date_asc&amp;category=other')
         self.assertContains(resp, '?page=2&amp;sort=date_asc&amp;category=other')
+
+class FoodLogEditFormFragmentTest(TestCase):
+    """
+    Tests that edit forms are served on demand instead of rendered per row.
+    """
+
+    def setUp(self):
+        self.client, self.user = create_and_login_user(self)
+        for n in range(10):
+            FoodLog.objects.create(
+                user=self.user, food_name=f"Food {n}", calories=100 + n,
+                category="other", date_logged=timezone.localdate(),
+            )
+
+    def test_list_renders_no_per_row_edit_forms(self):
+        response = self.client.get(reverse("food_log_list"))
+        # Only the "add" form at the top of the page has nutrient inputs.
+        self.assertContains(response, 'name="vitamin_b12"', count=1)
+        self.assertContains(response, 'id="editModal"', count=1)
+        log = FoodLog.objects.get(food_name="Food 3")
+        self.assertContains(response, reverse("food_log_edit_form", args=[log.pk]))
+
+    def test_fragment_is_bound_to_the_log(self):
+        log = FoodLog.objects.get(food_name="Food 3")
+        response = self.client.get(reverse("food_log_edit_form", args=[log.pk]))
+        self.assertTemplateUsed(response, "tracker/food_log_edit_form.html")
+        self.assertTemplateNotUsed(response, "tracker/base.html")
+        self.assertContains(response, 'value="Food 3"')
+        self.assertContains(response, 'value="103.0"')
+
+    def test_fragment_is_limited_to_own_logs(self):
+        other = User.objects.create_user("other", "o@o.com", "pass")
+        theirs = FoodLog.objects.create(user=other, food_name="Theirs", date_logged=timezone.localdate())
+        response = self.client.get(reverse("food_log_edit_form", args=[theirs.pk]))
+        self.assertEqual(response.status_code, 404)
+
+
+class FoodLogOwnershipTest(TestCase):
+    """
+    Tests that users only see and change their own FoodLog entries.
+    """
+
+    def setUp(self):
+        self.client, self.user = create_and_login_user(self)
+        other = User.objects.create_user("other", "o@o.com", "pass")
+        self.mine = FoodLog.objects.create(
+            user=self.user, food_name="Mine", category="other", date_logged=timezone.localdate()
+        )
+        self.theirs = FoodLog.objects.create(
+            user=other, food_name="Theirs", category="other", date_logged=timezone.localdate()
+        )
+
+    def test_list_shows_only_own_logs(self):
+        response = self.client.get(reverse("food_log_list"))
+        self.assertContains(response, "Mine")
+        self.assertNotContains(response, "Theirs")
+
+    def test_new_log_is_owned_by_requester(self):
+        self.client.post(reverse("food_log_list"), {
+            "food_name": "Toast",
+            "category": "grain",
+            "date_logged": timezone.localdate().isoformat(),
+        })
+        self.assertEqual(FoodLog.objects.get(food_name="Toast").user, self.user)
+
+    def test_cannot_edit_or_delete_other_users_log(self):
+        edit = self.client.post(reverse("food_log_edit", args=[self.theirs.pk]), {
+            "food_name": "Hijacked",
+            "category": "other",
+            "date_logged": timezone.localdate().isoformat(),
+        })
+        delete = self.client.post(reverse("food_log_delete", args=[self.theirs.pk]))
+        self.assertEqual(edit.status_code, 404)
+        self.assertEqual(delete.status_code, 404)
+        self.assertEqual(FoodLog.objects.get(pk=self.theirs.pk).food_name, "Theirs")
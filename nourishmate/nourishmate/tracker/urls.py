@@ -5,10 +5,59 @@ from django.contrib.auth.views import LogoutView
 from django.contrib.auth import views as auth_views
 
 
+# Most SQL queries a single request to each URL may run, session and auth
+# lookups included, as one number or per HTTP method where writes cost more
+# than reads. Counted in autocommit, so BEGIN, COMMIT and savepoints are
+# included. Enforced by tracker.tests.test_query_budgets and logged by
+# tracker.middleware.QueryBudgetMiddleware when DEBUG is on.
+# ingredient_autocomplete allows for the three queries that build each
+# worker's in-memory index on its first (and hourly) request, and
+# ingredient_nutrition for storing an ingredient on a cold miss; warm
+# requests to either run just the session and user lookups. nutrition_summary
+# covers extending the prefix-sum index, whose pending days are checked for
+# once and then read again under the user's lock. Creating or editing a log
+# refreshes the rollup of each day it touches (two when an edit moves it).
+QUERY_BUDGETS = {
+    "register": 2,
+    "home": 4,
+    "food_log_list": {"GET": 4, "POST": 15},
+    "food_log_export": 3,
+    "food_log_search": 4,
+    "food_log_import": 12,
+    "add_to_grocery_list": 3,
+    "grocery_list": 3,
+    "toggle_purchased": 4,
+    "delete_grocery_item": 4,
+    "update_grocery_category": 4,
+    "nutrition_summary": 11,
+    "food_log_edit": {"GET": 3, "POST": 24},
+    "food_log_edit_form": 3,
+    "food_log_delete": 15,
+    "pantry_list": 3,
+    "add_pantry_item": 2,
+    "edit_pantry_item": 3,
+    "delete_pantry_item": 4,
+    "increase_quantity": 4,
+    "decrease_quantity": 4,
+    "toggle_supplement": 15,
+    "logout": 4,
+    "ingredient_autocomplete": 5,
+    "ingredient_nutrition": 7,
+    "nutrient_series": 3,
+    "save_recipe": 6,
+    "saved_recipes": 3,
+    "delete_saved_recipe": 4,
+    "recipe_search": 5,
+}
+
+
 urlpatterns = [
     path("register/", views.register, name="register"),
     path('', views.home, name='home'),
     path('logs/', views.food_log_list, name='food_log_list'),
+    path('logs/export/', views.food_log_export, name='food_log_export'),
+    path('logs/search/', views.food_log_search, name='food_log_search'),
+    path('logs/import/', views.food_log_import, name='food_log_import'),
     path('add-to-grocery/', views.add_to_grocery_list, name='add_to_grocery_list'),
     path('grocery/', views.grocery_list, name='grocery_list'),
     path('grocery/toggle/<int:item_id>/', views.toggle_purchased, name='toggle_purchased'),
@@ -16,6 +65,7 @@ urlpatterns = [
     path('grocery/update-category/<int:item_id>/', views.update_grocery_category, name='update_grocery_category'),
     path('summary/', views.nutrition_summary, name='nutrition_summary'),
     path('logs/<int:pk>/edit/', FoodLogUpdateView.as_view(), name='food_log_edit'),
+    path('logs/<int:pk>/edit/form/', views.food_log_edit_form, name='food_log_edit_form'),
     path('logs/<int:pk>/delete/', FoodLogDeleteView.as_view(), name='food_log_delete'),
     path('pantry/', views.pantry_list, name='pantry_list'),
     path('pantry/add/', views.add_pantry_item, name='add_pantry_item'),
@@ -27,6 +77,7 @@ urlpatterns = [
     path("logout/", LogoutView.as_view(next_page="home"), name="logout"),
     path("api/autocomplete/", views.ingredient_autocomplete, name="ingredient_autocomplete"),
     path("api/nutrition/", views.ingredient_nutrition, name="ingredient_nutrition"),
+    path("api/nutrients/series/", views.nutrient_series_api, name="nutrient_series"),
     path("recipes/save/<int:recipe_id>/", views.save_recipe, name="save_recipe"),
     path("recipes/saved/", views.saved_recipes, name="saved_recipes"),
     path('recipes/saved/delete/<int:recipe_id>/', views.delete_saved_recipe, name='delete_saved_recipe'),
@@ -12,11 +12,12 @@ from django.utils.timezone import localdate
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth import login
-from django.http import JsonResponse, HttpResponseRedirect, HttpResponseBadRequest
+from django.http import (
+    JsonResponse, HttpResponseRedirect, HttpResponseBadRequest, StreamingHttpResponse,
+)
 
 from collections import defaultdict, OrderedDict
 from datetime import datetime, timedelta
-import requests
 import json
 
 from .models import (
@@ -24,6 +25,23 @@ from .models import (
     PantryItem, SupplementLog, SavedRecipe
 )
 from .forms import FoodLogForm, PantryItemForm
+from .autocomplete import suggest
+from .aggregates import nutrient_totals, daily_averages
+from .nutrients import (
+    DAILY_TARGETS, NUTRIENT_FIELDS, NUTRIENT_LABELS, SUPPLEMENT_NUTRIENTS, TARGETS,
+    NutrientVector,
+)
+from .dashboard import today_snapshot
+from .exports import EXPORT_FORMATS, export_lines
+from .facets import PERIOD_CHOICES, cached_facet_rows, facet_counts, period_range
+from .filters import date_range, filter_logs
+from .ingredients import local_nutrition, nutrition_for, parse_ingredient_id
+from .imports import IMPORT_FORMATS, format_for, import_food_logs, read_rows, text_stream
+from .pagination import keyset_page
+from .recipes import recipe_information, recipe_summary
+from .rollups import rollup_totals, range_totals, nutrient_series, SERIES_BUCKETS
+from .search import search_foods
+from . import spoonacular
 
 
 # ─── Module-level constants ─────────────────────────────────────────────────────
@@ -41,23 +59,8 @@ CATEGORY_ORDER = [
     'other'
 ]
 
-# Supplements for (home page).
-SUPPLEMENT_NUTRIENTS = {
-    "morning": {
-        "vitamin_d": 30,
-        "vitamin_b12": 3.0,
-        "calcium": 1200,
-    },
-    "afternoon": {
-        "iron": 25,
-        "vitamin_c": 120,
-    },
-    "evening": {
-        "fiber": 35,
-        "magnesium": 500,
-        "zinc": 15,
-    },
-}
+# Row errors returned by food_log_import.
+IMPORT_ERROR_LIMIT = 100
 
 
 # ─── Authentication / Registration ──────────────────────────────────────────────
@@ -91,46 +94,11 @@ def home(request):
     Show today’s supplement status and a summary of
     today’s nutrient intake vs. daily targets.
     """
-    today = localdate()
-    logs = FoodLog.objects.filter(date_logged=today)
-    DAILY_TARGETS = {
-        "calories": 2000,
-        "protein": 50,
-        "fiber": 25,
-        "vitamin_c": 75,
-        "iron": 18,
-        "vitamin_d": 20,
-        "vitamin_b12": 2.4,
-        "calcium": 1000,
-        "magnesium": 400,
-        "zinc": 11,
-    }
-
-    totals = {nutrient: 0 for nutrient in DAILY_TARGETS}
-
-    for log in logs:
-        for nutrient in totals:
-            totals[nutrient] += getattr(log, nutrient, 0)
-
-    taken = {slot: False for slot in SUPPLEMENT_NUTRIENTS.keys()}
-
-    logs_today = SupplementLog.objects.filter(user=request.user, date=today)
-    for log in logs_today:
-        taken[log.time_of_day] = True
-        for nutrient, amount in SUPPLEMENT_NUTRIENTS.get(log.time_of_day, {}).items():
-            if nutrient in totals:
-                totals[nutrient] += amount
-
-    low_nutrients = [
-        nutrient for nutrient, target in DAILY_TARGETS.items()
-        if totals[nutrient] < target * 0.8
-    ]
+    snapshot = today_snapshot(request.user)
 
     return render(request, 'tracker/home.html', {
-        "low_nutrients": low_nutrients,
-        "taken_supplements": taken,
+        **snapshot,
         "slots": list(SUPPLEMENT_NUTRIENTS.keys()),
-        "totals": totals,
     })
 
 @login_required
@@ -155,10 +123,11 @@ def toggle_supplement(request, slot):
 @login_required
 def food_log_list(request):
     """
-    List AND paginate FoodLog entries.
+    List AND paginate the user's FoodLog entries.
     """
     sort = request.GET.get('sort', 'date_desc')
     category_filter = request.GET.get('category', '')
+    period_filter = request.GET.get('period', '')
 
     sort_map = {
         'date_asc': 'date_logged',
@@ -169,35 +138,125 @@ def food_log_list(request):
         'calories_desc': '-calories',
     }
 
-    qs = FoodLog.objects.order_by(sort_map.get(sort, '-date_logged'))
+    ordering = sort_map.get(sort, '-date_logged')
+    start_date, end_date = period_range(period_filter, localdate())
+    qs = filter_logs(FoodLog.objects.filter(user=request.user), start_date, end_date, category_filter)
 
-    if category_filter:
-        qs = qs.filter(category=category_filter)
+    # Counts for the filter dropdowns and the page total come from the
+    # cached facet rows, so no COUNT query runs for the list.
+    facets = facet_counts(cached_facet_rows(request.user), category_filter, period_filter)
 
-    paginator = Paginator(qs, 10)
+    # Numbered ?page= links use OFFSET pagination; everything else seeks
+    # from an opaque cursor so deep pages cost the same as the first.
     page_number = request.GET.get('page')
-    page_obj   = paginator.get_page(page_number)
+    if page_number:
+        tiebreak = '-pk' if ordering.startswith('-') else 'pk'
+        paginator = Paginator(qs.order_by(ordering, tiebreak), 10)
+        paginator.count = facets['total']
+        page_obj = paginator.get_page(page_number)
+    else:
+        page_obj = keyset_page(qs, ordering, request.GET.get('cursor'))
 
     if request.method == 'POST':
         form = FoodLogForm(request.POST)
         if form.is_valid():
-            form.save()
-            return redirect(f"{request.path}?page={page_obj.number}&sort={sort}&category={category_filter}")
+            log = form.save(commit=False)
+            log.user = request.user
+            log.save()
+            page = f"page={page_obj.number}&" if page_number else ""
+            return redirect(f"{request.path}?{page}sort={sort}&category={category_filter}&period={period_filter}")
     else:
         form = FoodLogForm()
 
-    bound_forms = {log.pk: FoodLogForm(instance=log) for log in page_obj}
-
     return render(request, 'tracker/food_log_list.html', {
         'form': form,
         'page_obj': page_obj,
-        'bound_forms': bound_forms,
+        'keyset': not page_number,
+        'facets': facets,
         'sort': sort,
         'category_filter': category_filter,
+        'period_filter': period_filter,
         'CATEGORY_CHOICES': CATEGORY_CHOICES,
+        'PERIOD_CHOICES': PERIOD_CHOICES,
+    })
+
+
+@login_required
+def food_log_edit_form(request, pk):
+    """
+    The edit form for one of the user's FoodLog entries as an HTML fragment.
+    The food log list fetches it when an Edit modal opens, so the list page
+    itself renders no edit forms.
+    """
+    log = get_object_or_404(FoodLog, pk=pk, user=request.user)
+    return render(request, 'tracker/food_log_edit_form.html', {
+        'form': FoodLogForm(instance=log),
+    })
+
+
+@login_required
+def food_log_search(request):
+    """
+    Search the foods the user has logged by name (prefix and fuzzy
+    matches), best match first, with when each was last logged and how often.
+    """
+    query = request.GET.get('q', '').strip()
+    return render(request, 'tracker/food_log_search.html', {
+        'query': query,
+        'results': search_foods(request.user, query) if query else [],
     })
 
 
+@login_required
+def food_log_export(request):
+    """
+    Stream the user's FoodLog entries as CSV (default) or NDJSON.
+    Accepts the Nutrition Summary range parameters and the list's category
+    filter; without a range the whole history is exported.
+    """
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return HttpResponseBadRequest("format must be csv or ndjson.")
+
+    start_date, end_date = date_range(request.GET, localdate(), default_preset=None)
+    logs = filter_logs(
+        FoodLog.objects.filter(user=request.user),
+        start_date, end_date, request.GET.get('category', ''),
+    )
+
+    response = StreamingHttpResponse(
+        export_lines(logs, export_format),
+        content_type=EXPORT_FORMATS[export_format],
+    )
+    response['Content-Disposition'] = f'attachment; filename="food-logs.{export_format}"'
+    return response
+
+
+@login_required
+@require_POST
+def food_log_import(request):
+    """
+    Import FoodLog entries for the user from an uploaded CSV, NDJSON or JSON
+    file (`file`). Returns the import report as JSON; at most
+    IMPORT_ERROR_LIMIT row errors are listed. A file that cannot be read
+    to the end gets an `error` alongside the report of what was imported
+    before it, and a 400 only if nothing was.
+    """
+    upload = request.FILES.get('file')
+    if upload is None:
+        return JsonResponse({"error": "Upload a file in the 'file' field."}, status=400)
+    import_format = request.POST.get('format') or format_for(upload.name)
+    if import_format not in IMPORT_FORMATS:
+        return JsonResponse({"error": "File must be .csv, .ndjson or .json."}, status=400)
+
+    report = import_food_logs(read_rows(text_stream(upload.file), import_format), request.user)
+    report["errors"] = report["errors"][:IMPORT_ERROR_LIMIT]
+    if report["read_error"]:
+        report["error"] = f"Could not read file: {report['read_error']}"
+        return JsonResponse(report, status=200 if report["created"] else 400)
+    return JsonResponse(report)
+
+
 class FoodLogUpdateView(LoginRequiredMixin, UpdateView):
     """
     Edit an existing FoodLog entry.
@@ -206,6 +265,12 @@ class FoodLogUpdateView(LoginRequiredMixin, UpdateView):
     form_class = FoodLogForm
     template_name = "tracker/food_log_edit.html"
 
+    def get_queryset(self):
+        """
+        Only the user's own entries can be edited.
+        """
+        return FoodLog.objects.filter(user=self.request.user)
+
     def get_success_url(self):
         base = reverse_lazy("food_log_list")
         qs   = self.request.GET.urlencode()
@@ -235,6 +300,12 @@ class FoodLogDeleteView(LoginRequiredMixin, DeleteView):
     model = FoodLog
     template_name = "tracker/foodlog_confirm_delete.html"
 
+    def get_queryset(self):
+        """
+        Only the user's own entries can be deleted.
+        """
+        return FoodLog.objects.filter(user=self.request.user)
+
     def get_success_url(self):
         """
         Redirect back to the list.
@@ -294,7 +365,7 @@ def grocery_list(request):
     """
     Group GroceryItem by category and render.
     """
-    items = GroceryItem.objects.all().order_by('added_on')
+    items = GroceryItem.objects.filter(user=request.user).order_by('added_on')
     grouped = defaultdict(list)
     for item in items:
         grouped[item.category].append(item)
@@ -313,7 +384,7 @@ def grocery_list(request):
 @login_required
 def toggle_purchased(request, item_id):
     """Toggle the `purchased` flag on a GroceryItem."""
-    item = get_object_or_404(GroceryItem, id=item_id)
+    item = get_object_or_404(GroceryItem, id=item_id, user=request.user)
     item.purchased = not item.purchased
     item.save()
     return redirect('grocery_list')
@@ -322,7 +393,7 @@ def toggle_purchased(request, item_id):
 @login_required
 def delete_grocery_item(request, item_id):
     """Delete a GroceryItem and redirect back to list."""
-    item = get_object_or_404(GroceryItem, id=item_id)
+    item = get_object_or_404(GroceryItem, id=item_id, user=request.user)
     item.delete()
     return redirect('grocery_list')
 
@@ -331,7 +402,7 @@ def delete_grocery_item(request, item_id):
 def update_grocery_category(request, item_id):
     """POST to update a GroceryItem’s category."""
     if request.method == "POST":
-        item = get_object_or_404(GroceryItem, id=item_id)
+        item = get_object_or_404(GroceryItem, id=item_id, user=request.user)
         new_category = request.POST.get("category")
         if new_category:
             item.category = new_category
@@ -414,7 +485,6 @@ def combined_recipe_view(request):
     For recipe search AND smart suggestions.
     Renders `tracker/recipe.html` with `results` and `smart_results`.
     """
-    api_key = settings.SPOONACULAR_API_KEY
     user        = request.user
     mode        = request.GET.get("mode")
     query       = request.GET.get("ingredients", "")
@@ -426,19 +496,17 @@ def combined_recipe_view(request):
 
     # ---------- GENERAL SEARCH ----------
     if mode != "smart" and query: 
-        url = "https://api.spoonacular.com/recipes/complexSearch"
         params = {
             "query": query,
             "diet": diet,
             "sort": sort,
             "maxReadyTime": max_time,
             "number": 6,
-            "apiKey": api_key,
         }
         params = {k: v for k, v in params.items() if v}
-        resp = requests.get(url, params=params)
-        if resp.status_code == 200:
-            results = resp.json().get("results", [])
+        data = spoonacular.get("/recipes/complexSearch", params)
+        if data is not None:
+            results = data.get("results", [])
 
     # Smart suggestions from pantry + nutrient lows.
     # ---------------------------------------------
@@ -457,35 +525,13 @@ def combined_recipe_view(request):
         ingredients_list = pantry_list
 
     ingredients = ",".join(ingredients_list)
-    
-    DAILY_TARGETS = {
-        "calories": 2000,
-        "protein": 50,
-        "fiber": 25,
-        "vitamin_c": 75,
-        "iron": 18,
-        "vitamin_d": 20,
-        "vitamin_b12": 2.4,
-        "calcium": 1000,
-        "magnesium": 400,
-        "zinc": 11,
-    }
 
     today = localdate()
-    logs = FoodLog.objects.filter(date_logged=today)
+    logs = FoodLog.objects.filter(user=user, date_logged=today)
     supplement_logs = SupplementLog.objects.filter(user=user, date=today)
 
-    totals = {k: 0 for k in DAILY_TARGETS}
-    for log in logs:
-        for k in totals:
-            totals[k] += getattr(log, k, 0)
-    for log in supplement_logs:
-        boosts = SUPPLEMENT_NUTRIENTS.get(log.time_of_day, {})
-        for k, v in boosts.items():
-            if k in totals:
-                totals[k] += v
-
-    low_nutrients = [k for k, v in DAILY_TARGETS.items() if totals[k] < v * 0.8]
+    totals = nutrient_totals(logs, supplement_logs)
+    low_nutrients = totals.lows(TARGETS)
 
     def ensure_working_image(recipe):
         url = recipe.get("image")
@@ -496,50 +542,47 @@ def combined_recipe_view(request):
 
     # Get smart recipes from pantry.
     if mode == "smart":
-        smart_url = "https://api.spoonacular.com/recipes/findByIngredients"
         smart_params = {
             "ingredients": ingredients,
             "number": 6,
             "ranking": 2,
             "ignorePantry": True,
-            "apiKey": api_key
         }
 
         if diet:
             smart_params["diet"] = diet
 
-        smart_response = requests.get(smart_url, params=smart_params)
-        if smart_response.status_code == 200:
-            data = smart_response.json()
+        data = spoonacular.get("/recipes/findByIngredients", smart_params)
+        if data is not None:
             smart_results = data.get("results", []) if isinstance(data, dict) else data
 
         # ───────── Better scoring? based on actual nutrition. ─────────
         if mode == "smart":
-            smart_url = "https://api.spoonacular.com/recipes/findByIngredients"
             smart_params = {
                 "ingredients": ingredients,
                 "diet": diet,
                 "number": 12,
                 "ignorePantry": True,
-                "apiKey": api_key
             }
 
-            smart_response = requests.get(smart_url, params=smart_params)
-            if smart_response.status_code == 200:
-                data = smart_response.json()
+            data = spoonacular.get("/recipes/findByIngredients", smart_params)
+            if data is not None:
                 smart_results = data.get("results", []) if isinstance(data, dict) else data
 
             enriched_results = []
 
-            for recipe in smart_results:
-                info_url = f"https://api.spoonacular.com/recipes/{recipe['id']}/information"
-                info = requests.get(info_url, params={"apiKey": api_key, "includeNutrition": "true"})
+            # Look the recipes up in bulk; ones that fail or miss the deadline are dropped.
+            infos = recipe_information(
+                [recipe["id"] for recipe in smart_results],
+                include_nutrition=True,
+                deadline=settings.SPOONACULAR_ENRICH_DEADLINE,
+            )
 
-                if info.status_code != 200:
+            for recipe in smart_results:
+                data = infos.get(recipe["id"])
+                if data is None:
                     continue
 
-                data = info.json()
-
                 # Filter 
                 if diet and diet.lower() not in [d.lower() for d in data.get("diets", [])]:
                     continue
@@ -552,18 +595,9 @@ def combined_recipe_view(request):
                 recipe["missedIngredientCount"] = recipe.get("missedIngredientCount", 0)
                 recipe["missedIngredients"] = recipe.get("missedIngredients", [])
 
-                # Nutrient score.
-                nutrients = {
-                    n["name"].lower().replace(" ", "_"): n["amount"]
-                    for n in data.get("nutrition", {}).get("nutrients", [])
-                }
-
-                coverage_points = [
-                    nutrients.get(n, 0) / DAILY_TARGETS[n]
-                    for n in low_nutrients
-                ] if low_nutrients else []
-
-                recipe["nutrient_score"] = round(sum(coverage_points) / len(coverage_points) * 100) if coverage_points else 0
+                # Nutrient score: average share of today's low targets covered.
+                nutrients = NutrientVector.from_spoonacular(data.get("nutrition", {}).get("nutrients", []))
+                recipe["nutrient_score"] = round(nutrients.ratios(TARGETS).mean(low_nutrients) * 100)
 
                 enriched_results.append(recipe)
 
@@ -613,23 +647,20 @@ def recipe_search(request):
         sort = request.POST.get('sort')
         max_time = request.POST.get('max_time')
 
-        api_key = os.getenv('SPOONACULAR_API_KEY')
-        if api_key and query:
-            url = "https://api.spoonacular.com/recipes/complexSearch"
+        if settings.SPOONACULAR_API_KEY and query:
             params = {
                 "query": query,
                 "diet": diet,
                 "sort": sort,
                 "maxReadyTime": max_time,
                 "number": 1,
-                "apiKey": api_key
             }
 
             params = {k: v for k, v in params.items() if v}
 
-            response = requests.get(url, params=params)
-            if response.status_code == 200:
-                results = response.json().get("results", [])
+            data = spoonacular.get("/recipes/complexSearch", params)
+            if data is not None:
+                results = data.get("results", [])
             else:
                 results = [{"title": "Error fetching recipes"}]
 
@@ -653,160 +684,33 @@ def nutrition_summary(request):
 
     today = localdate()
 
-    start_str = request.GET.get("start_date")
-    end_str   = request.GET.get("end_date")
-    start_date = end_date = None
-    if start_str and end_str:
-        try:
-            start_date = datetime.strptime(start_str, "%Y-%m-%d").date()
-            end_date   = datetime.strptime(end_str,   "%Y-%m-%d").date()
-        except ValueError:
-            start_date = end_date = None
-
-    if not (start_date and end_date):
-        if preset == "today":
-            start_date = end_date = today
-        elif preset == "30":
-            start_date = today - timedelta(days=29)
-            end_date = today
-        elif preset == "month":
-            start_date = today.replace(day=1)
-            end_date = today
-        else:
-            start_date = today - timedelta(days=6)
-            end_date = today
-
-    logs = FoodLog.objects.filter(date_logged__range=[start_date, end_date])
-
+    start_date, end_date = date_range(request.GET, today)
 
-    supplement_logs = SupplementLog.objects.filter(
-        user=request.user,
-        date__range=[start_date, end_date]
-    )
-
-    # MOCK - daily nutrient targets.
-    DAILY_NUTRIENT_TARGETS = {
-        "calories": 2000,
-        "protein": 50,
-        "fiber": 25,
-        "vitamin_c": 75,
-        "iron": 18,
-        "vitamin_d": 20,
-        "vitamin_b12": 2.4,
-        "calcium": 1000,
-        "magnesium": 400,
-        "zinc": 11,
-    }
-
-    def sum_nutrients(logs):
-        return {
-            "calories": sum(log.calories for log in logs),
-            "protein": sum(log.protein for log in logs),
-            "carbs": sum(log.carbs for log in logs),
-            "sugars": sum(log.sugars for log in logs),
-            "fiber": sum(log.fiber for log in logs),
-            "fat": sum(log.fat for log in logs),
-            "saturated_fat": sum(log.saturated_fat for log in logs),
-            "cholesterol": sum(log.cholesterol for log in logs),
-            "sodium": sum(log.sodium for log in logs),
-            "potassium": sum(log.potassium for log in logs),
-            "calcium": sum(log.calcium for log in logs),
-            "iron": sum(log.iron for log in logs),
-            "vitamin_a": sum(log.vitamin_a for log in logs),
-            "vitamin_c": sum(log.vitamin_c for log in logs),
-            "vitamin_d": sum(log.vitamin_d for log in logs),
-            "vitamin_b12": sum(log.vitamin_b12 for log in logs),
-            "magnesium": sum(log.magnesium for log in logs),
-            "zinc": sum(log.zinc for log in logs),
-        }
-
-    totals = sum_nutrients(logs)
-
-    # Calculate today nutrient levels.
-    today = localdate()
-    today_logs = FoodLog.objects.filter(date_logged=today)
-    today_totals = {nutrient: 0 for nutrient in DAILY_NUTRIENT_TARGETS}
-
-    # Add food totals for today.
-    for log in today_logs:
-        for nutrient in today_totals:
-            today_totals[nutrient] += getattr(log, nutrient, 0)
-
-    # Add supplements taken today.
-    today_supplements = SupplementLog.objects.filter(user=request.user, date=today)
-    for log in today_supplements:
-        boosts = SUPPLEMENT_NUTRIENTS.get(log.time_of_day, {})
-        for nutrient, amount in boosts.items():
-            if nutrient in today_totals:
-                today_totals[nutrient] += amount
+    # Range totals come from the prefix-sum index, supplements included.
+    totals = range_totals(request.user, start_date, end_date)
+    today_totals = rollup_totals(request.user, today, today)
 
     # Find today's lows.
-    today_lows = [
-        nutrient for nutrient, target in DAILY_NUTRIENT_TARGETS.items()
-        if today_totals[nutrient] < target * 0.8
-    ]
+    today_lows = today_totals.lows(TARGETS)
 
-    # Add supplement to totals.
-    for log in supplement_logs:
-        boosts = SUPPLEMENT_NUTRIENTS.get(log.time_of_day, {})
-        for nutrient, amount in boosts.items():
-            if nutrient in totals:
-                totals[nutrient] += amount
-
-
-    # Calculate average per day.
-    days = (end_date - start_date).days + 1
     # Compute averages for nutrients.
-    averages = {
-        nutrient: totals.get(nutrient, 0) / days
-        for nutrient in DAILY_NUTRIENT_TARGETS
-    }
+    averages = daily_averages(totals, start_date, end_date)
 
     # Determine badge state for each nutrient (Low vs Good vs High).
-    badges = {}
-    for nutrient, target in DAILY_NUTRIENT_TARGETS.items():
-        total = totals.get(nutrient)
-        if total is None:
-            continue
-        if total < target * 0.8:
-            badges[nutrient] = "Low"
-        elif total > target * 1.2:
-            badges[nutrient] = "High"
-        else:
-            badges[nutrient] = "Good"
+    badges = totals.badges(TARGETS)
 
     # Flag deficiencies.
-    deficient_nutrients = {}
-    for nutrient, target in DAILY_NUTRIENT_TARGETS.items():
-        avg = averages[nutrient]
-        if avg < target * 0.8:
-            deficient_nutrients[nutrient] = {
-                "average": round(avg, 1),
-                "target": target
-            }
+    deficient_nutrients = {
+        nutrient: {
+            "average": round(averages[nutrient], 1),
+            "target": DAILY_TARGETS[nutrient],
+        }
+        for nutrient in averages.lows(TARGETS)
+    }
 
     context = {
         "totals": totals,
-        "nutrients": {
-            "calories": "Calories",
-            "protein": "Protein (g)",
-            "carbs": "Carbohydrates (g)",
-            "sugars": "Sugars (g)",
-            "fiber": "Fiber (g)",
-            "fat": "Fat (g)",
-            "saturated_fat": "Saturated Fat (g)",
-            "cholesterol": "Cholesterol (mg)",
-            "sodium": "Sodium (mg)",
-            "potassium": "Potassium (mg)",
-            "calcium": "Calcium (mg)",
-            "iron": "Iron (mg)",
-            "vitamin_a": "Vitamin A (mcg)",
-            "vitamin_c": "Vitamin C (mg)",
-            "vitamin_d": "Vitamin D (mcg)",
-            "vitamin_b12": "Vitamin B12 (mcg)",
-            "magnesium": "Magnesium (mg)",
-            "zinc": "Zinc (mg)",
-        },
+        "nutrients": NUTRIENT_LABELS,
 
         "selected_range": preset,
         "start_date": start_date,
@@ -815,7 +719,7 @@ def nutrition_summary(request):
         "today_lows": today_lows,                    # For top alert.
         "badges": badges,                            # For low/good/high labels.
         "today_totals": today_totals,                # For today's card details.
-        "DAILY_TARGETS": DAILY_NUTRIENT_TARGETS,     # So template can show goal per nutrient.
+        "DAILY_TARGETS": DAILY_TARGETS,              # So template can show goal per nutrient.
 
     }
 
@@ -825,39 +729,57 @@ def nutrition_summary(request):
 # ─── AJAX / API endpoints ──────────────────────────────────────────────────────
 @login_required
 def ingredient_autocomplete(request):
-    """Return JSON list of ingredient suggestions from Spoonacular."""
+    """Return JSON list of ingredient suggestions, from the local index first."""
     query = request.GET.get("q")
     if not query:
         return JsonResponse([], safe=False)
 
-    api_key = settings.SPOONACULAR_API_KEY
-    url = "https://api.spoonacular.com/food/ingredients/autocomplete"
-    params = {
-        "query": query,
-        "number": 5,
-        "metaInformation": True,
-        "apiKey": api_key
-    }
-
-    response = requests.get(url, params=params)
+    suggestions = suggest(query)
+    if suggestions is None:
+        return JsonResponse([], safe=False, status=502)
 
-    # TEMP DEBUG
-    if response.status_code != 200:
-        return JsonResponse({
-            "debug_status": response.status_code,
-            "debug_body": response.text,
-            "debug_key_present": bool(api_key),
-            "debug_key_length": len(api_key) if api_key else 0,
-        }, status=200)
+    return JsonResponse(suggestions, safe=False)
 
-    results = response.json()
 
-    suggestions = [
-        {"name": item["name"], "id": item["id"]}
-        for item in results
-    ]
+@login_required
+def nutrient_series_api(request):
+    """
+    Return JSON nutrient time series for charts.
 
-    return JsonResponse(suggestions, safe=False)
+    Query parameters:
+        start, end: YYYY-MM-DD (default: the last 30 days).
+        bucket: day, week, month, quarter or year (default: day). A coarser
+            bucket is used automatically when the range would need too many points.
+        nutrients: comma-separated nutrient fields (default: all).
+    """
+    today = localdate()
+    try:
+        end_date = datetime.strptime(request.GET.get("end") or today.isoformat(), "%Y-%m-%d").date()
+        start_str = request.GET.get("start")
+        if start_str:
+            start_date = datetime.strptime(start_str, "%Y-%m-%d").date()
+        else:
+            start_date = end_date - timedelta(days=29)
+    except ValueError:
+        return JsonResponse({"error": "Dates must be YYYY-MM-DD."}, status=400)
+    if start_date > end_date:
+        return JsonResponse({"error": "start must not be after end."}, status=400)
+
+    bucket = request.GET.get("bucket", "day")
+    if bucket not in SERIES_BUCKETS:
+        return JsonResponse({"error": f"Unknown bucket '{bucket}'."}, status=400)
+
+    fields = [name for name in request.GET.get("nutrients", "").split(",") if name]
+    unknown = [name for name in fields if name not in NUTRIENT_FIELDS]
+    if unknown:
+        return JsonResponse({"error": f"Unknown nutrients: {', '.join(unknown)}."}, status=400)
+
+    series = nutrient_series(request.user, start_date, end_date, bucket, fields)
+    return JsonResponse({
+        "start": start_date.isoformat(),
+        "end": end_date.isoformat(),
+        **series,
+    })
 
 
 @login_required
@@ -871,57 +793,29 @@ def ingredient_nutrition(request):
 
     if not (ing_id and amount and unit):
         return JsonResponse({}, status=400)
+    try:
+        lookup, amount = parse_ingredient_id(ing_id), float(amount)
+    except ValueError:
+        return JsonResponse({}, status=400)
 
-    api_key = settings.SPOONACULAR_API_KEY
-    url = f"https://api.spoonacular.com/food/ingredients/{ing_id}/information"
-    params = {
-        "amount": amount,
-        "unit": unit,
-        "apiKey": api_key
-    }
-
-    response = requests.get(url, params=params)
-    if response.status_code != 200:
-        return JsonResponse({}, status=500)
-
-    info = response.json()
-    nutrition = {n['name'].lower().replace(" ", "_"): n['amount'] for n in info.get("nutrition", {}).get("nutrients", [])}
-
-    mapped = {
-        "calories": nutrition.get("calories", 0),
-        "protein": nutrition.get("protein", 0),
-        "carbs": nutrition.get("carbohydrates", 0),
-        "sugars": nutrition.get("sugar", 0),
-        "fiber": nutrition.get("fiber", 0),
-        "fat": nutrition.get("fat", 0),
-        "saturated_fat": nutrition.get("saturated_fat", 0),
-        "cholesterol": nutrition.get("cholesterol", 0),
-        "sodium": nutrition.get("sodium", 0),
-        "potassium": nutrition.get("potassium", 0),
-        "calcium": nutrition.get("calcium", 0),
-        "iron": nutrition.get("iron", 0),
-        "vitamin_c": nutrition.get("vitamin_c", 0),
-        "vitamin_d": nutrition.get("vitamin_d", 0),
-        "vitamin_b12": nutrition.get("vitamin_b12", 0),
-        "magnesium": nutrition.get("magnesium", 0),
-        "zinc": nutrition.get("zinc", 0),
-        "vitamin_a": nutrition.get("vitamin_a", 0),
-    }
+    # Scaled locally from the stored density; Spoonacular only on a cold miss,
+    # and never for loaded FoodData Central foods or when offline.
+    if "fdc_id" in lookup or settings.NUTRITION_OFFLINE:
+        nutrients = local_nutrition(amount, unit, **lookup)
+        if nutrients is None:
+            return JsonResponse({}, status=404)
+    else:
+        nutrients = nutrition_for(lookup["spoonacular_id"], amount, unit)
+        if nutrients is None:
+            return JsonResponse({}, status=500)
 
-    return JsonResponse(mapped)
+    return JsonResponse(nutrients.rounded(2).as_dict())
 
 def fetch_recipe_details(recipe_id):
-    """Helper to fetch recipe metadata from Spoonacular /information."""
-    api_key = settings.SPOONACULAR_API_KEY
-    url = f"https://api.spoonacular.com/recipes/{recipe_id}/information"
-    resp = requests.get(url, params={"apiKey": api_key})
-    if resp.status_code == 200:
-        data = resp.json()
-        return {
-            "title": data.get("title", "Unknown"),
-            "image": data.get("image"),
-            "source_url": data.get("sourceUrl"),
-        }
+    """Helper to fetch recipe metadata, reusing recently fetched recipes."""
+    summary = recipe_summary(recipe_id)
+    if summary is not None:
+        return summary
     return {"title": "Unknown", "image": "", "source_url": ""}
 
 